@@ -1,13 +1,19 @@
 # ===================== IMPORTS =====================
+import os
+import sys
+
 import streamlit as st
-import joblib
-import numpy as np
-from PIL import Image
-import tensorflow as tf
 
-# Backend modules (KEEP THEM)
-from utils.chatbot import chatbot_response
-from utils.grievance_ai import process_grievance, track_complaint
+from utils.lazy_imports import lazy_module, timing_report
+
+# Backend modules (KEEP THEM), imported by the page that needs them
+chatbot = lazy_module("utils.chatbot")
+grievance_ai = lazy_module("utils.grievance_ai")
+crop_batch = lazy_module("utils.crop_batch")
+pest_batch = lazy_module("utils.pest_batch")
+prediction_cache = lazy_module("utils.prediction_cache")
+model_bundle = lazy_module("utils.model_bundle")
+warmup = lazy_module("utils.warmup")
 
 # ===================== GLOBAL CUSTOM CSS =====================
 st.markdown("""
@@ -104,17 +110,66 @@ page = query_params.get("page", "home")
  # default: home
 
 
-# ===================== LOAD MODELS =====================
-crop_model = joblib.load("models/crop_model.pkl")
-crop_encoder = joblib.load("models/crop_encoder.pkl")
-soil_encoder = joblib.load("models/soil_encoder.pkl")
+# ===================== MODEL REGISTRY =====================
+# Streamlit re-executes this script on every widget interaction, so models
+# are loaded on first use and kept in a process-wide cache (shared by all
+# reruns and sessions). Each page only pulls in the bundle parts it needs.
+# When training publishes a new bundle version the next request switches to
+# it (see utils/model_bundle.py) - no restart needed.
+
+PAGE_PARTS = {
+    "crop": ["model", "crop_encoder", "soil_encoder"],
+    "water": ["model", "district_encoder"],
+    "market": ["model", "crop_encoder"],
+    "pest": ["model", "labels"],
+}
+
+
+@st.cache_resource
+def model_registry():
+    return model_bundle.ModelRegistry()
+
+
+def get_models(page):
+    return model_registry().load(page, PAGE_PARTS[page])
+
 
-water_model = joblib.load("models/water_model.pkl")
-water_encoder = joblib.load("models/water_encoder.pkl")
+@st.cache_resource
+def warm_models(pages=None):
+    """Load the models for some pages (default all) and run dummy batches
+    through them in a background thread, once per process. Names that are
+    not model pages are skipped with a warning."""
+    pages = tuple(PAGE_PARTS) if pages is None else pages
+    unknown = [p for p in pages if p not in PAGE_PARTS]
+    if unknown:
+        print(f"⚠️ WARM_MODELS: no models to warm for {', '.join(unknown)} "
+              f"(model pages: {', '.join(PAGE_PARTS)})")
+    return warmup.start(model_registry(), {p: PAGE_PARTS[p] for p in pages if p in PAGE_PARTS})
 
-market_model = joblib.load("models/market_model.pkl")
 
-pest_model = tf.keras.models.load_model("models/pest_model.h5")
+def invalidate_models(page=None):
+    """Drop cached models so the next request reloads them from disk."""
+    model_registry().invalidate(page)
+
+
+# Pest results keyed by the uploaded bytes + bundle version, so reruns and
+# re-uploads skip the CNN. PEST_CACHE_PERCEPTUAL=1 also matches near-identical
+# photos (re-saved / re-compressed copies).
+@st.cache_resource
+def pest_cache():
+    return prediction_cache.PredictionCache(perceptual=os.environ.get("PEST_CACHE_PERCEPTUAL") == "1")
+
+
+# Opt-in warm-up at worker start, so the first request of a page is as fast
+# as later ones: WARM_MODELS=pest (or a list like "crop,pest", or "all")
+# loads those pages' models and runs dummy batches through them in the
+# background. Unset or "none", every page loads its own models on first use
+# and workers that never serve the pest page never load TensorFlow.
+warm_pages = os.environ.get("WARM_MODELS", "").strip().lower()
+warm_enabled = warm_pages not in ("", "none")
+if warm_enabled:
+    warm_models(None if warm_pages == "all" else tuple(p.strip() for p in warm_pages.split(",") if p.strip()))
+
 pest_classes = [
     'ants', 'bees', 'beetle', 'catterpillar',
     'earthworms', 'earwig', 'grasshopper',
@@ -136,6 +191,11 @@ def crop_ui():
     st.markdown("<div class='feature-card'>", unsafe_allow_html=True)
     st.header("🌾 Crop Recommendation")
 
+    models = get_models("crop")
+    crop_model = models["model"]
+    crop_encoder = models["crop_encoder"]
+    soil_encoder = models["soil_encoder"]
+
     temperature = st.slider("🌡 Temperature (°C)", 10, 45, 25)
     humidity = st.slider("💧 Humidity (%)", 20, 100, 60)
     moisture = st.slider("🌱 Soil Moisture (%)", 0, 100, 50)
@@ -156,6 +216,23 @@ def crop_ui():
 
         st.success(f"🌱 **Recommended Crop: {crop_name}**")
 
+    st.subheader("📄 Batch Recommendation (CSV)")
+    st.caption("Upload a soil-test sheet in the crop_data.csv column layout.")
+
+    batch_file = st.file_uploader("📤 Upload Soil Test CSV", type=["csv"])
+    top_k = st.slider("Top crops per farm", 1, len(crop_model.classes_), 3)
+
+    if batch_file and st.button("Predict for All Farms"):
+        try:
+            with st.spinner("Predicting..."):
+                result_csv = "".join(crop_batch.predict_csv(
+                    batch_file, crop_model, crop_encoder, soil_encoder, top_k=top_k))
+        except ValueError as e:
+            st.error(f"Could not read the sheet: {e}")
+        else:
+            st.download_button("⬇ Download Recommendations", result_csv,
+                               file_name="crop_recommendations.csv", mime="text/csv")
+
     st.markdown("</div>", unsafe_allow_html=True)
 
 
@@ -167,7 +244,7 @@ def chatbot_ui():
     query = st.text_input("Ask your question:")
 
     if query:
-        response = chatbot_response(query)
+        response = chatbot.chatbot_response(query)
         st.info(response)
 
     st.markdown("</div>", unsafe_allow_html=True)
@@ -182,14 +259,15 @@ def grievance_ui():
     complaint = st.text_area("Describe your issue")
 
     if st.button("Submit Complaint"):
-        out = process_grievance(complaint)
+        out = grievance_ai.process_grievance(complaint)
 
         st.success(f"🏷 Department: {out['department']}")
         st.warning(f"⚡ Priority: {out['priority']}")
         st.info(f"🎫 Ticket ID: {out['ticket']}")
 
         if out["duplicate"]:
-            st.error("⚠ Duplicate complaint detected!")
+            st.error("⚠ Duplicate complaint detected! Similar to: "
+                     + ", ".join(f"{t} ({score:.0%})" for t, score in out["duplicates"]))
 
         st.write(out["forward"])
 
@@ -197,7 +275,7 @@ def grievance_ui():
     ticket = st.text_input("Enter Ticket ID")
 
     if st.button("Track Status"):
-        st.info(track_complaint(ticket))
+        st.info(grievance_ai.track_complaint(ticket))
 
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -208,6 +286,10 @@ def water_ui():
     st.markdown("<div class='feature-card'>", unsafe_allow_html=True)
     st.header("💧 Water Availability Prediction")
 
+    models = get_models("water")
+    water_model = models["model"]
+    water_encoder = models["district_encoder"]
+
     district = st.text_input("🏡 Enter District Name")
 
     if st.button("Predict Water Level"):
@@ -226,6 +308,10 @@ def market_ui():
     st.markdown("<div class='feature-card'>", unsafe_allow_html=True)
     st.header("📈 Crop Yield Prediction")
 
+    models = get_models("market")
+    market_model = models["model"]
+    crop_encoder = models["crop_encoder"]
+
     N = st.number_input("Nitrogen (N)")
     P = st.number_input("Phosphorus (P)")
     K = st.number_input("Potassium (K)")
@@ -256,22 +342,43 @@ def pest_ui():
     uploaded_file = st.file_uploader("📤 Upload Pest Image", type=["jpg", "jpeg", "png"])
 
     if uploaded_file:
-        img = Image.open(uploaded_file).convert("RGB")
-        img = img.resize((150,150))
-
-        st.image(img, caption="Uploaded Image", width=250)
-
-        img_arr = np.array(img)/255.0
-        img_arr = img_arr.reshape(1,150,150,3)
-
-        prediction = pest_model.predict(img_arr)
-        idx = np.argmax(prediction)
-        confidence = np.max(prediction)*100
-
-        pest_name = pest_classes[idx]
-
-        st.success(f"🪲 Detected Pest: **{pest_name}**")
-        st.info(f"📊 Confidence: {confidence:.2f}%")
+        data = uploaded_file.getvalue()
+        st.image(data, caption="Uploaded Image", width=250)
+
+        models = get_models("pest")
+        labels = models["labels"] or pest_classes
+        result = pest_cache().lookup(
+            data, model_registry().version("pest"),
+            lambda d: next(pest_batch.predict_images([(uploaded_file.name, d)], models["model"], labels)))
+
+        if result["error"]:
+            st.error(result["error"])
+        else:
+            st.success(f"🪲 Detected Pest: **{result['pest']}**")
+            st.info(f"📊 Confidence: {result['confidence']:.2f}%")
+
+    st.subheader("📦 Batch Detection (many photos or a ZIP)")
+    uploads = st.file_uploader("📤 Upload Trap Photos", type=["jpg", "jpeg", "png", "zip"],
+                               accept_multiple_files=True)
+
+    if uploads and st.button("Detect Pests in All Images"):
+        models = get_models("pest")
+        labels = models["labels"] or pest_classes
+        with st.spinner("Detecting..."):
+            rows = pest_batch.cached_predict_images(
+                pest_batch.upload_images(uploads), models["model"], labels,
+                pest_cache(), model_registry().version("pest"))
+
+        if rows:
+            st.dataframe(rows, use_container_width=True)
+            st.download_button("⬇ Download Results", pest_batch.to_csv(rows),
+                               file_name="pest_detections.csv", mime="text/csv")
+        else:
+            st.warning("No images found in the upload.")
+
+    stats = pest_cache().stats()
+    st.caption(f"Cache: {stats['entries']} results, hit rate {stats['hit_rate']:.0%} "
+               f"({stats['hits']} hits, {stats['near_hits']} near, {stats['misses']} misses)")
 
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -298,3 +405,21 @@ elif page == "pest":
 
 else:
     home_ui()
+
+
+# ===================== READINESS =====================
+if warm_enabled:
+    if warmup.ready():
+        st.sidebar.caption("✅ Models ready")
+    else:
+        st.sidebar.caption("⏳ Warming up models...")
+
+
+# ===================== STARTUP PROFILE =====================
+# streamlit run app.py -- --profile-startup
+if "--profile-startup" in sys.argv:
+    st.sidebar.subheader("⏱ Deferred import / init times")
+    st.sidebar.code(timing_report())
+    if warm_enabled and warmup.ready():
+        st.sidebar.subheader("🔥 Warm-up")
+        st.sidebar.json(warmup.report)
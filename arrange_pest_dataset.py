@@ -1,39 +1,79 @@
+import argparse
 import os
 import shutil
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
 base_dir = "data/pest_images/"
 train_img_dir = os.path.join(base_dir, "train")
 train_csv_path = os.path.join(base_dir, "train.csv")
 
-df = pd.read_csv(train_csv_path)
+# -----------------------------------------------------------
+# Sort the Kaggle images (train/ + train.csv) into one folder per pest.
+# Sources are left in place: each image is hard-linked (or copied, on
+# filesystems without links) into its class folder, so the script can be
+# interrupted and rerun at any time. Afterwards the arranged images are
+# packed into pre-decoded shards (see pest_shards.py).
+# -----------------------------------------------------------
+
+
+def place(src, dst):
+    """Link/copy src to dst unless it is already there."""
+    if os.path.exists(dst) and (not os.path.exists(src) or os.path.getsize(dst) == os.path.getsize(src)):
+        return "already arranged"
+    if not os.path.exists(src):
+        return "missing"
 
-file_col = df.columns[0]   # image path
-label_col = df.columns[1]  # pest label
+    tmp = f"{dst}.tmp-{os.getpid()}"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+    return "arranged"
 
-moved = 0
-missing = 0
 
-for _, row in df.iterrows():
-    full_path = str(row[file_col])
-    label = str(row[label_col]).strip()
+def arrange(workers=None):
+    df = pd.read_csv(train_csv_path)
+
+    file_col = df.columns[0]   # image path
+    label_col = df.columns[1]  # pest label
 
     # ✅ extract only filename from kaggle path
-    filename = os.path.basename(full_path)
+    filenames = df[file_col].astype(str).map(os.path.basename)
+    labels = df[label_col].astype(str).str.strip()
+
+    for label in labels.unique():
+        os.makedirs(os.path.join(base_dir, label), exist_ok=True)
+
+    src = [os.path.join(train_img_dir, f) for f in filenames]
+    dst = [os.path.join(base_dir, l, f) for l, f in zip(labels, filenames)]
+
+    with ThreadPoolExecutor(max_workers=workers or min(32, 4 * (os.cpu_count() or 1))) as pool:
+        return Counter(pool.map(place, src, dst))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arrange the pest images into class folders")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--no-shards", action="store_true", help="skip building the decoded shards")
+    args = parser.parse_args()
 
-    src = os.path.join(train_img_dir, filename)
-    dst_dir = os.path.join(base_dir, label)
-    dst = os.path.join(dst_dir, filename)
+    counts = arrange(args.workers)
 
-    os.makedirs(dst_dir, exist_ok=True)
+    print("===================================")
+    print(f"✅ Images arranged: {counts['arranged']}")
+    print(f"✅ Already in place: {counts['already arranged']}")
+    print(f"⚠️ Images not found locally: {counts['missing']}")
+    print("Dataset arrangement completed.")
 
-    if os.path.exists(src):
-        shutil.move(src, dst)
-        moved += 1
-    else:
-        missing += 1
+    if not args.no_shards:
+        from utils.pest_shards import SHARD_DIR, build_shards
 
-print("===================================")
-print(f"✅ Images moved successfully: {moved}")
-print(f"⚠️ Images not found locally: {missing}")
-print("Dataset arrangement completed.")
+        manifest, built = build_shards(base_dir, workers=args.workers)
+        print(f"✅ {manifest['rows']} images in {len(manifest['shards'])} shards "
+              f"({built} rebuilt) -> {SHARD_DIR}")
@@ -0,0 +1,91 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from utils.datasets import DATASETS, load_dataset
+
+# -----------------------------------------------------------
+# pd.read_csv vs the columnar cache at 10x / 100x synthetic scale
+# python -m utils.benchmarks.bench_datasets [scale ...]
+# -----------------------------------------------------------
+# Synthetic datasets resample the real rows with replacement, so value
+# distributions (and therefore downcasting) match the shipped CSVs.
+# The cached load must leave the numeric columns memory-mapped: reading
+# every value of them may not grow the private (anonymous) resident memory
+# of a fresh process by anywhere near their size.
+
+PAGE = os.sysconf("SC_PAGE_SIZE")
+
+
+def synthesize(name, scale, folder):
+    spec = DATASETS[name]
+    df = pd.read_csv(spec["path"])
+    rng = np.random.default_rng(scale)
+    big = df.iloc[rng.integers(0, len(df), size=len(df) * scale)]
+    path = os.path.join(folder, f"{name}_x{scale}.csv")
+    big.to_csv(path, index=False)
+    return path
+
+
+def private_bytes():
+    """Resident memory not backed by a file (Linux), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            _, resident, shared = (int(v) for v in f.read().split()[:3])
+    except OSError:
+        return None
+    return (resident - shared) * PAGE
+
+
+def private_growth(path, cache_dir):
+    """(private bytes gained, numeric column bytes) for a cached load that
+    reads every numeric value. Run in a fresh process: memory freed by the
+    cache build would otherwise be reused and hide a copy."""
+    before = private_bytes()
+    numeric = load_dataset(path, cache_dir=cache_dir).select_dtypes("number")
+    numeric.sum()
+    return private_bytes() - before, numeric.memory_usage(index=False).sum()
+
+
+def timed(func):
+    start = time.perf_counter()
+    out = func()
+    return out, time.perf_counter() - start
+
+
+def run(name, scale, folder):
+    path = synthesize(name, scale, folder)
+    cache_dir = os.path.join(folder, "cache")
+
+    csv_df, csv_t = timed(lambda: pd.read_csv(path))
+    _, build_t = timed(lambda: load_dataset(path, cache_dir=cache_dir))    # first load builds
+    cached_df, load_t = timed(lambda: load_dataset(path, cache_dir=cache_dir))
+    if private_bytes() is not None:
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            grown, data = pool.submit(private_growth, path, cache_dir).result()
+        assert grown < data / 2, f"{name} x{scale}: cached load copied {grown / 1e6:.1f} of {data / 1e6:.1f} MB"
+
+    csv_mb = csv_df.memory_usage(deep=True).sum() / 1e6
+    cached_mb = cached_df.memory_usage(deep=True).sum() / 1e6
+
+    print(f"{name:<12} x{scale:<4} {len(csv_df):>9,} rows | read_csv {csv_t * 1000:8.1f} ms {csv_mb:8.2f} MB"
+          f" | cache build {build_t * 1000:8.1f} ms | cached load {load_t * 1000:7.1f} ms {cached_mb:8.2f} MB"
+          f" | {csv_t / load_t:6.1f}x faster, {csv_mb / cached_mb:4.1f}x smaller")
+
+
+if __name__ == "__main__":
+    scales = [int(s) for s in sys.argv[1:]] or [10, 100]
+    folder = tempfile.mkdtemp(prefix="bench_datasets_")
+    try:
+        for scale in scales:
+            for name in DATASETS:
+                run(name, scale, folder)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
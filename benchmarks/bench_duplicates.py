@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.duplicate_index import THRESHOLD, DuplicateIndex
+from utils.grievance_store import GrievanceStore
+
+# -----------------------------------------------------------
+# Duplicate check: re-vectorise the whole history vs the persistent index
+# python -m utils.benchmarks.bench_duplicates [rows ...]
+# -----------------------------------------------------------
+# History and queries are synthetic complaints built from the words of
+# data/grievances.csv; half of the queries repeat a stored complaint with one
+# word changed. The brute-force check is what is_duplicate() did before and is
+# only timed up to BRUTE_MAX_ROWS.
+
+QUERIES = 100
+BRUTE_MAX_ROWS = 100_000
+TRAINING = "data/grievances.csv"
+
+
+def make_texts(n, words, rng):
+    lengths = rng.integers(5, 12, size=n)
+    picks = rng.integers(len(words), size=lengths.sum())
+    out, pos = [], 0
+    for length in lengths:
+        out.append(" ".join(words[i] for i in picks[pos:pos + length]))
+        pos += length
+    return out
+
+
+def brute_force(vectorizer, texts, query):
+    from sklearn.metrics.pairwise import cosine_similarity
+    sim = cosine_similarity(vectorizer.transform([query]), vectorizer.transform(texts)).ravel()
+    return sim.max() > THRESHOLD, sim.max()
+
+
+def p50_ms(func, args):
+    times = []
+    for a in args:
+        start = time.perf_counter()
+        func(a)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50)
+
+
+def run(n, vectorizer, words, tmp):
+    rng = np.random.default_rng(0)
+    texts = make_texts(n, words, rng)
+    queries = make_texts(QUERIES // 2, words, rng)
+    for i in rng.integers(n, size=QUERIES - len(queries)):
+        tokens = texts[i].split()
+        tokens[rng.integers(len(tokens))] = words[rng.integers(len(words))]
+        queries.append(" ".join(tokens))
+
+    store = GrievanceStore(os.path.join(tmp, f"dup-{n}.db"), csv_path=None)
+    store.append_many((f"GRV-{i}", t, "Water", "🟢 LOW PRIORITY (Normal Case)") for i, t in enumerate(texts))
+
+    start = time.perf_counter()
+    DuplicateIndex(store, vectorizer)       # vectorises the history once
+    first_s = time.perf_counter() - start
+    start = time.perf_counter()
+    index = DuplicateIndex(store, vectorizer)
+    reload_s = time.perf_counter() - start
+
+    print(f"{n:>9} complaints (first build {first_s:5.1f} s, reload {reload_s:5.1f} s)")
+    print(f"  index        p50 {p50_ms(index.search, queries):9.2f} ms")
+
+    if n <= BRUTE_MAX_ROWS:
+        ops = queries[:10] + queries[-10:]
+        print(f"  brute force  p50 {p50_ms(lambda q: brute_force(vectorizer, texts, q), ops):9.2f} ms")
+        agree = 0
+        for q in ops:
+            dup, best = brute_force(vectorizer, texts, q)
+            found = index.search(q, k=1)
+            agree += dup == bool(found) and (not found or abs(found[0][1] - min(best, 1.0)) < 1e-3)
+        print(f"  same decision and best score on {agree}/{len(ops)} queries")
+    store.close()
+
+
+if __name__ == "__main__":
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    training = pd.read_csv(TRAINING)["complaint"]
+    vectorizer = TfidfVectorizer().fit(training)
+    words = sorted(vectorizer.vocabulary_) + [f"village{i}" for i in range(200)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(r) for r in sys.argv[1:]] or [10_000, 100_000, 1_000_000]:
+            run(n, vectorizer, words, tmp)
@@ -0,0 +1,71 @@
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from utils.forest_compiler import FOREST_MODELS, compile_forest, CompiledForest
+from utils.model_bundle import forest_pickles
+
+# -----------------------------------------------------------
+# sklearn vs compiled forest: single-row latency + batch throughput
+# python -m utils.benchmarks.bench_forest [model.pkl ...]
+# -----------------------------------------------------------
+
+SINGLE_ROWS = 500
+BATCH_ROWS = 100000
+
+
+def sample_rows(forest, n, seed=0):
+    """Random rows spanning every split threshold the forest uses."""
+    rng = np.random.default_rng(seed)
+    lo = np.zeros(forest.n_features_in_)
+    hi = np.ones(forest.n_features_in_)
+    for est in forest.estimators_:
+        t = est.tree_
+        for j in range(forest.n_features_in_):
+            thr = t.threshold[t.feature == j]
+            if len(thr):
+                lo[j] = min(lo[j], thr.min())
+                hi[j] = max(hi[j], thr.max())
+    return rng.uniform(lo - 1, hi + 1, size=(n, forest.n_features_in_))
+
+
+def latency(predict, X):
+    times = []
+    for row in X:
+        start = time.perf_counter()
+        predict(row.reshape(1, -1))
+        times.append(time.perf_counter() - start)
+    times = np.array(times) * 1000
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+def throughput(predict, X):
+    start = time.perf_counter()
+    predict(X)
+    return len(X) / (time.perf_counter() - start)
+
+
+def run(pkl):
+    forest = joblib.load(pkl)
+    compiled = CompiledForest(compile_forest(forest))
+
+    X_single = sample_rows(forest, SINGLE_ROWS)
+    X_batch = sample_rows(forest, BATCH_ROWS, seed=1)
+
+    identical = np.array_equal(forest.predict(X_batch), compiled.predict(X_batch))
+
+    print(f"\n{pkl}  ({len(forest.estimators_)} trees, {len(compiled.feature)} nodes, depth {compiled.depth})")
+    print(f"  bit-identical predictions: {identical}")
+    for name, model in [("sklearn", forest), ("compiled", compiled)]:
+        p50, p99 = latency(model.predict, X_single)
+        rps = throughput(model.predict, X_batch)
+        print(f"  {name:<9} single-row p50 {p50:8.3f} ms   p99 {p99:8.3f} ms   batch {rps:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    for pkl in sys.argv[1:] or forest_pickles() or FOREST_MODELS:
+        run(pkl)
@@ -0,0 +1,102 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------
+# Bulk import of a grievance backlog vs one process_grievance() per row
+# python -m utils.benchmarks.bench_grievance_bulk [rows ...]
+# -----------------------------------------------------------
+# Runs in a scratch copy of data/ (fresh grievance database). The backlog is
+# synthetic call-centre text: department phrases, villages and filler, with
+# about a fifth of the rows re-reported. The first VERIFY rows are checked
+# against classify_department(), priority_score() and a brute-force
+# duplicate scan over everything stored before them.
+
+VERIFY = 2000
+PER_ROW_SAMPLE = 200
+PHRASES = [
+    "no power supply", "transformer burst", "street light not working", "low voltage at night",
+    "drinking water not coming", "pipeline leakage near school", "borewell dried up",
+    "pothole on main road", "bridge damaged after rain", "old age pension not received",
+    "ration card pending", "scholarship not credited", "crop insurance delay",
+    "seeds not supplied", "subsidy pending for farmer", "garbage not collected",
+    "hospital has no doctor", "school building unsafe", "mobile tower signal weak",
+]
+FILLER = ["please", "help", "since", "two", "weeks", "in", "our", "ward", "urgent", "kindly",
+          "sir", "again", "many", "families", "are", "suffering", "the", "village", "near", "temple"]
+
+
+def make_backlog(n, seed=0):
+    rng = np.random.default_rng(seed)
+    texts = []
+    for i in range(n):
+        if texts and rng.random() < 0.2:
+            texts.append(texts[rng.integers(len(texts))])
+            continue
+        words = [PHRASES[rng.integers(len(PHRASES))]]
+        words += [FILLER[k] for k in rng.integers(len(FILLER), size=rng.integers(2, 8))]
+        words.insert(int(rng.integers(len(words))), f"village{rng.integers(5000)}")
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+    return pd.DataFrame({"complaint": texts})
+
+
+def verify(result, history_texts):
+    from sklearn.metrics.pairwise import cosine_similarity
+    from utils.grievance_ai import classify_department, priority_score, grievance_model
+
+    vectorizer, _ = grievance_model()
+    sample = result.head(VERIFY)
+    same_dept = sum(classify_department(t) == d for t, d in zip(sample["complaint"], sample["department"]))
+    same_prio = sum(priority_score(t) == p for t, p in zip(sample["complaint"], sample["priority"]))
+
+    texts = list(history_texts) + list(sample["complaint"])
+    sim = cosine_similarity(vectorizer.transform(sample["complaint"]), vectorizer.transform(texts))
+    offset = len(history_texts)
+    found = sample["duplicate_of"].notna().to_numpy()
+    same_dup = 0
+    for r in range(len(sample)):
+        expected = (sim[r, :offset + r] > 0.85).any() if offset + r else False
+        same_dup += expected == found[r]
+    print(f"  verified on {len(sample)} rows: department {same_dept}, priority {same_prio}, "
+          f"duplicate {same_dup}")
+
+
+def run(n, root):
+    from utils import grievance_ai
+    from utils.grievance_bulk import ingest
+
+    backlog = make_backlog(n, seed=n)
+    path = os.path.join(root, f"backlog-{n}.csv")
+    backlog.to_csv(path, index=False)
+    history = grievance_ai.open_store().complaints()["complaint"]
+
+    print(f"{n:>8} rows, {len(history)} already stored")
+    start = time.perf_counter()
+    result = ingest(path)
+    bulk_s = time.perf_counter() - start
+    verify(result, history)
+
+    sample = make_backlog(PER_ROW_SAMPLE, seed=n + 1)["complaint"]
+    start = time.perf_counter()
+    for text in sample:
+        grievance_ai.process_grievance(text)
+    grievance_ai.writer().flush()
+    per_row = (time.perf_counter() - start) / PER_ROW_SAMPLE
+    print(f"  bulk {n / bulk_s:9,.0f} complaints/s   process_grievance per row {1 / per_row:7,.0f} complaints/s")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+    source = os.path.abspath("data/grievances.csv")
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "data"))
+        shutil.copy(source, os.path.join(root, "data", "grievances.csv"))
+        os.chdir(root)
+        for n in sizes:
+            run(n, root)
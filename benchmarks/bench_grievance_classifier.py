@@ -0,0 +1,86 @@
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.grievance_classifier import fit_classifier
+
+# -----------------------------------------------------------
+# Department fallback: brute-force argmax over training rows vs centroids
+# python -m utils.benchmarks.bench_grievance_classifier [rows ...]
+# -----------------------------------------------------------
+# Synthetic labelled complaints: every department has its own vocabulary,
+# complaints mix in words of other departments, shared filler and rare
+# words, and LABEL_NOISE of the training labels are wrong. Both sides use
+# the same fitted TfidfVectorizer and are scored on the same held-out set;
+# the brute-force latency is the old nearest_department() (cosine_similarity
+# with every training row, department of the argmax).
+
+DEPARTMENTS = 12
+WORDS_PER_DEPARTMENT = 60
+RARE_WORDS = 20_000
+TEST_ROWS = 2000
+BRUTE_QUERIES = 200
+SINGLE_QUERIES = 2000
+LABEL_NOISE = 0.05
+FILLER = ["please", "help", "since", "two", "weeks", "in", "our", "ward", "urgent", "kindly",
+          "sir", "again", "many", "families", "are", "suffering", "the", "village", "near", "temple"]
+
+
+def make_complaints(n, rng):
+    own = rng.integers(WORDS_PER_DEPARTMENT, size=(n, 3))
+    labels = rng.integers(DEPARTMENTS, size=n)
+    texts = []
+    for i in range(n):
+        words = [f"d{labels[i]}w{w}" for w in own[i, :rng.integers(1, 4)]]
+        words += [f"d{rng.integers(DEPARTMENTS)}w{rng.integers(WORDS_PER_DEPARTMENT)}"
+                  for _ in range(rng.integers(0, 3))]
+        words += [FILLER[k] for k in rng.integers(len(FILLER), size=rng.integers(2, 8))]
+        words.append(f"village{rng.integers(RARE_WORDS)}")
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+    return texts, np.array([f"Department {d}" for d in labels], dtype=object)
+
+
+def run(n):
+    rng = np.random.default_rng(n)
+    texts, labels = make_complaints(n + TEST_ROWS, rng)
+    train_texts, test_texts = texts[:n], texts[n:]
+    train_labels, test_labels = labels[:n].copy(), labels[n:]
+    noisy = rng.random(n) < LABEL_NOISE
+    train_labels[noisy] = [f"Department {d}" for d in rng.integers(DEPARTMENTS, size=noisy.sum())]
+
+    start = time.perf_counter()
+    vectorizer, centroids = fit_classifier(train_texts, train_labels)
+    fit_s = time.perf_counter() - start
+    X = vectorizer.transform(train_texts)
+    Q = vectorizer.transform(test_texts)
+
+    # brute force, batched for accuracy and one query at a time for latency
+    brute = np.empty(TEST_ROWS, dtype=object)
+    Xt = X.T.tocsr()
+    for lo in range(0, TEST_ROWS, 200):
+        brute[lo:lo + 200] = train_labels[(Q[lo:lo + 200] @ Xt).toarray().argmax(axis=1)]
+    start = time.perf_counter()
+    for i in range(BRUTE_QUERIES):
+        train_labels[cosine_similarity(Q[i], X).argmax()]
+    brute_us = (time.perf_counter() - start) / BRUTE_QUERIES * 1e6
+
+    predicted, confidence = centroids.top(Q, k=3)
+    start = time.perf_counter()
+    for i in range(SINGLE_QUERIES):
+        centroids.top(Q[i % TEST_ROWS], k=3)
+    centroid_us = (time.perf_counter() - start) / SINGLE_QUERIES * 1e6
+
+    right = predicted[:, 0] == test_labels
+    print(f"{n:>8} training rows, {len(vectorizer.vocabulary_)} terms (fit {fit_s:.1f} s)")
+    print(f"  brute-force argmax {brute_us:10.1f} us/complaint   accuracy {np.mean(brute == test_labels):.3f}")
+    print(f"  centroids          {centroid_us:10.1f} us/complaint   accuracy {right.mean():.3f}   "
+          f"top-3 {np.mean((predicted == test_labels[:, None]).any(axis=1)):.3f}   "
+          f"confidence right {confidence[right, 0].mean():.2f} / wrong {confidence[~right, 0].mean():.2f}")
+
+
+if __name__ == "__main__":
+    for n in [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 500_000]:
+        run(n)
@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.grievance_store import GrievanceStore
+
+# -----------------------------------------------------------
+# Grievances: CSV rewrite per request vs the SQLite store
+# python -m utils.benchmarks.bench_grievance_store [rows ...]
+# -----------------------------------------------------------
+# "submit" stores one complaint, "track" looks one ticket up. The CSV
+# functions are what grievance_ai.py did before; they are only timed up to
+# CSV_MAX_ROWS because every call reads (and rewrites) the whole file.
+
+OPS = 200
+CSV_MAX_ROWS = 100_000
+DEPARTMENTS = ["Electricity", "Water", "Infrastructure", "Social Welfare", "Agriculture"]
+
+
+def make_rows(n, rng):
+    for start in range(0, n, 100_000):
+        size = min(100_000, n - start)
+        tickets = rng.integers(10**11, 10**12, size=size)
+        depts = rng.integers(len(DEPARTMENTS), size=size)
+        for i in range(size):
+            yield (f"GRV-{tickets[i]}", f"synthetic complaint {start + i} about village {i % 997}",
+                   DEPARTMENTS[depts[i]], "🟢 LOW PRIORITY (Normal Case)")
+
+
+def csv_submit(path, row):
+    db = pd.read_csv(path)
+    new = dict(zip(["ticket", "complaint", "department", "priority"], row), status="Submitted")
+    db = pd.concat([db, pd.DataFrame([new])], ignore_index=True)
+    db.to_csv(path, index=False)
+
+
+def csv_track(path, ticket):
+    db = pd.read_csv(path)
+    match = db[db["ticket"] == ticket]
+    return None if match.empty else match.iloc[0]
+
+
+def p50_ms(func, args):
+    times = []
+    for a in args:
+        start = time.perf_counter()
+        func(a)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50)
+
+
+def run(n, tmp):
+    rng = np.random.default_rng(0)
+    rows = list(make_rows(n, rng))
+    new = list(make_rows(OPS, np.random.default_rng(1)))
+    known = [rows[i][0] for i in rng.integers(n, size=OPS)]
+
+    store = GrievanceStore(os.path.join(tmp, f"grievance-{n}.db"), csv_path=None)
+    start = time.perf_counter()
+    for i in range(0, n, 50_000):
+        store.append_many(rows[i:i + 50_000])
+    load_s = time.perf_counter() - start
+
+    print(f"{n:>9} complaints (store loaded in {load_s:5.1f} s)")
+    print(f"  sqlite  submit p50 {p50_ms(lambda r: store.append(*r), new):9.2f} ms"
+          f"   track p50 {p50_ms(store.lookup, known):9.3f} ms")
+
+    if n <= CSV_MAX_ROWS:
+        path = os.path.join(tmp, f"grievance-{n}.csv")
+        pd.DataFrame(rows, columns=["ticket", "complaint", "department", "priority"]) \
+            .assign(status="Submitted").to_csv(path, index=False)
+        ops = max(OPS // 10, 5)
+        print(f"  csv     submit p50 {p50_ms(lambda r: csv_submit(path, r), new[:ops]):9.2f} ms"
+              f"   track p50 {p50_ms(lambda t: csv_track(path, t), known[:ops]):9.3f} ms")
+    store.close()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(r) for r in sys.argv[1:]] or [10_000, 100_000, 1_000_000]:
+            run(n, tmp)
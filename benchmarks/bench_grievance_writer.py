@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from utils.duplicate_index import DuplicateIndex
+from utils.grievance_store import GrievanceStore
+from utils.grievance_writer import GrievanceWriter
+
+# -----------------------------------------------------------
+# Grievance submissions under load: commit per request vs group commit
+# python -m utils.benchmarks.bench_grievance_writer [submitters] [per submitter]
+# -----------------------------------------------------------
+# Every submitter thread runs the request path of process_grievance()
+# (duplicate check, then store the complaint) back to back. Afterwards every
+# ticket must be in the database, each submitter's rows in submission order.
+
+SUBMITTERS = 50
+PER_SUBMITTER = 100
+TRAINING = "data/grievances.csv"
+
+
+def load(name, submit, index, submitters, per_submitter):
+    errors = []
+
+    def submitter(s):
+        try:
+            for i in range(per_submitter):
+                text = f"no water supply in ward {s} street {i} since morning"
+                index.search(text)
+                submit(f"LOAD-{name}-{s:03d}-{i:05d}", text)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=submitter, args=(s,)) for s in range(submitters)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, errors
+
+
+def check(store, name, submitters, per_submitter):
+    rows = store.conn().execute(
+        "SELECT ticket FROM complaints WHERE ticket LIKE ? ORDER BY id", (f"LOAD-{name}-%",)).fetchall()
+    tickets = [r[0] for r in rows]
+    lost = submitters * per_submitter - len(set(tickets))
+    ordered = all(
+        sorted(t) == t
+        for t in ([x for x in tickets if x.startswith(f"LOAD-{name}-{s:03d}-")] for s in range(submitters)))
+    return lost, ordered
+
+
+def run(submitters, per_submitter, tmp):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer().fit(pd.read_csv(TRAINING)["complaint"])
+    store = GrievanceStore(os.path.join(tmp, "load.db"), csv_path=None)
+    index = DuplicateIndex(store, vectorizer)
+    total = submitters * per_submitter
+
+    def direct(ticket, text):
+        created = time.time()
+        row_id = store.append(ticket, text, "Water", "🟢 LOW PRIORITY (Normal Case)", created=created)
+        index.add(row_id, text, ticket, "Water", created)
+
+    seconds, errors = load("direct", direct, index, submitters, per_submitter)
+    lost, ordered = check(store, "direct", submitters, per_submitter)
+    print(f"  commit per request  {total / seconds:8.0f} submissions/s   lost {lost}   ordered {ordered}"
+          f"   errors {len(errors)}")
+
+    writer = GrievanceWriter(store, index)
+    seconds, errors = load("queued", lambda t, text: writer.submit(t, text, "Water", "🟢 LOW PRIORITY (Normal Case)"),
+                           index, submitters, per_submitter)
+    start = time.perf_counter()
+    writer.close()
+    drain = time.perf_counter() - start
+    lost, ordered = check(store, "queued", submitters, per_submitter)
+    print(f"  group commit        {total / seconds:8.0f} submissions/s   lost {lost}   ordered {ordered}"
+          f"   errors {len(errors)}   ({writer.stats['commits']} commits, {drain * 1000:.0f} ms to drain on close)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    submitters = args[0] if args else SUBMITTERS
+    per_submitter = args[1] if len(args) > 1 else PER_SUBMITTER
+    print(f"{submitters} submitters x {per_submitter} complaints")
+    with tempfile.TemporaryDirectory() as tmp:
+        run(submitters, per_submitter, tmp)
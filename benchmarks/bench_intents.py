@@ -0,0 +1,91 @@
+import sys
+import time
+
+import numpy as np
+
+from utils.chatbot import (build_intents, crop_info, detect_intent, fertilizer_advice,
+                           fertilizer_keywords, scheme_keywords, season_keywords, soil_keywords)
+
+# -----------------------------------------------------------
+# Chatbot intents: if-chain of `in` checks vs the compiled matcher
+# python -m utils.benchmarks.bench_intents [crops ...]
+# -----------------------------------------------------------
+# The knowledge base is scaled up with synthetic crops (English and Telugu
+# names). Both detectors must pick the same intent for every message.
+
+MESSAGES = 2000
+SYLLABLES = ["ka", "ra", "ma", "pa", "ta", "la", "va", "sa", "na", "ja", "ga", "da"]
+TELUGU = ["క", "ర", "మ", "ప", "ట", "ల", "వ", "స", "న", "జ"]
+WORDS = ["what", "is", "the", "best", "price", "for", "my", "field", "crop", "details",
+         "fertilizer", "soil", "n 40 p 20 k 10", "insurance", "kisan", "rainy", "ఎరువు", "ఎలా"]
+
+
+def chain(user, crops, fertilizers):
+    # the original chatbot_response() checks, in order
+    for season, words in season_keywords.items():
+        if any(w in user for w in words):
+            return "season", season
+    for crop in crops:
+        if crop in user:
+            return "crop", crop
+    if any(w in user for w in fertilizer_keywords):
+        for crop in fertilizers:
+            if crop in user:
+                return "fertilizer", crop
+    if any(w in user for w in soil_keywords):
+        return "soil", None
+    for scheme, words in scheme_keywords.items():
+        if any(w in user for w in words):
+            return "scheme", scheme
+    return None, None
+
+
+def make_crops(n, rng):
+    crops = dict(crop_info)
+    while len(crops) < n:
+        if rng.random() < 0.3:
+            name = "".join(TELUGU[i] for i in rng.integers(len(TELUGU), size=5))
+        else:
+            name = "".join(SYLLABLES[i] for i in rng.integers(len(SYLLABLES), size=5))
+        crops[name] = "synthetic"
+    return crops
+
+
+def make_messages(crops, rng):
+    names = list(crops)
+    messages = []
+    for _ in range(MESSAGES):
+        words = [WORDS[i] for i in rng.integers(len(WORDS), size=6)]
+        if rng.random() < 0.5:
+            words.insert(int(rng.integers(len(words))), names[rng.integers(len(names))])
+        messages.append(" ".join(words))
+    return messages
+
+
+def run(n):
+    rng = np.random.default_rng(0)
+    crops = make_crops(n, rng)
+    fertilizers = {**fertilizer_advice, **{c: "synthetic" for c in list(crops)[::2]}}
+    messages = make_messages(crops, rng)
+
+    start = time.perf_counter()
+    matcher = build_intents(crops, fertilizers)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    def measure(func):
+        start = time.perf_counter()
+        out = [func(m) for m in messages]
+        return (time.perf_counter() - start) / len(messages) * 1e6, out
+
+    chain_us, expected = measure(lambda m: chain(m, crops, fertilizers))
+    match_us, got = measure(lambda m: detect_intent(m, matcher))
+    same = sum(a == b for a, b in zip(expected, got))
+
+    print(f"{len(crops):>7} crops ({matcher.size:>7} keywords, compiled in {build_ms:7.1f} ms)")
+    print(f"  if-chain         {chain_us:9.1f} us/message")
+    print(f"  matcher          {match_us:9.1f} us/message   same intent {same}/{len(messages)}")
+
+
+if __name__ == "__main__":
+    for n in [int(c) for c in sys.argv[1:]] or [len(crop_info), 1000, 10000, 50000]:
+        run(n)
@@ -0,0 +1,96 @@
+import multiprocessing as mp
+import sys
+
+import numpy as np
+
+from utils.forest_compiler import FOREST_MODELS, compiled_path, load_compiled
+from utils.model_bundle import forest_pickles
+
+# -----------------------------------------------------------
+# Per-worker memory: unpickled sklearn forests vs memory-mapped arrays
+# python -m utils.benchmarks.bench_memory [n_workers]
+# -----------------------------------------------------------
+# Each worker loads the crop/water/market forests, predicts on a few
+# thousand rows (so the pages are actually touched) and waits for the
+# others before reading /proc/self/smaps_rollup (Linux only).
+#   RSS - resident pages, shared ones counted in every worker
+#   PSS - shared pages split between the workers mapping them
+#   USS - pages private to the worker
+
+ROWS = 2000
+
+
+def memory_kb():
+    out = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                out[parts[0][:-1]] = int(parts[1])
+    return {"rss": out["Rss"], "pss": out["Pss"],
+            "uss": out["Private_Clean"] + out["Private_Dirty"]}
+
+
+def sample_rows(forest, n, seed=0):
+    rng = np.random.default_rng(seed)
+    lo = np.zeros(forest.n_features_in_)
+    hi = np.ones(forest.n_features_in_)
+    for j in range(forest.n_features_in_):
+        thr = forest.threshold[forest.feature == j]
+        if len(thr):
+            lo[j], hi[j] = thr.min(), thr.max()
+    return rng.uniform(lo - 1, hi + 1, size=(n, forest.n_features_in_))
+
+
+def worker(mode, pickles, inputs, barrier, results):
+    import warnings
+    import joblib
+
+    warnings.filterwarnings("ignore")
+    before = memory_kb()
+
+    models = []
+    for pkl in pickles:
+        if mode == "pickle":
+            models.append(joblib.load(pkl))
+        else:
+            models.append(load_compiled(compiled_path(pkl)))
+
+    for model, X in zip(models, inputs):
+        model.predict(X)
+
+    barrier.wait()
+    after = memory_kb()
+    results.put({k: after[k] - before[k] for k in after})
+    barrier.wait()
+
+
+def run(mode, n_workers, pickles, inputs):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(n_workers)
+    results = ctx.Queue()
+
+    procs = [ctx.Process(target=worker, args=(mode, pickles, inputs, barrier, results)) for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    stats = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    avg = {k: sum(s[k] for s in stats) / len(stats) / 1024 for k in stats[0]}
+    print(f"  {mode:<7} per worker: RSS {avg['rss']:8.1f} MB   PSS {avg['pss']:8.1f} MB   USS {avg['uss']:8.1f} MB")
+    return avg
+
+
+if __name__ == "__main__":
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    pickles = forest_pickles() or FOREST_MODELS
+    inputs = [sample_rows(load_compiled(compiled_path(pkl)), ROWS, seed=i)
+              for i, pkl in enumerate(pickles)]
+
+    print(f"Memory added by loading {len(pickles)} forests, {n_workers} workers:")
+    pickled = run("pickle", n_workers, pickles, inputs)
+    mapped = run("mmap", n_workers, pickles, inputs)
+    print(f"  PSS reduction: {pickled['pss'] / max(mapped['pss'], 0.1):.1f}x   "
+          f"USS reduction: {pickled['uss'] / max(mapped['uss'], 0.1):.1f}x")
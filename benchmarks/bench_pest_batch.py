@@ -0,0 +1,62 @@
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from utils.model_bundle import ModelRegistry
+from utils.pest_batch import folder_images, predict_images
+from utils.pest_shards import read_shards
+
+# -----------------------------------------------------------
+# Pest detection: one image at a time vs pipelined batches
+# python -m utils.benchmarks.bench_pest_batch [image folder]
+# -----------------------------------------------------------
+# The one-at-a-time loop is what pest_ui did per upload: PIL decode,
+# float64 /255.0, predict on a batch of 1. The last line reads pre-decoded
+# pixels from the pest shards (python -m utils.arrange_pest_dataset), if built.
+
+FOLDER = "data/pest_images"
+
+
+def one_at_a_time(items, model):
+    for _, data in items:
+        img = Image.open(io.BytesIO(data)).convert("RGB").resize((150, 150))
+        arr = (np.array(img) / 255.0).reshape(1, 150, 150, 3)
+        model.predict(arr, verbose=0)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else FOLDER
+    items = list(folder_images(folder))
+    models = ModelRegistry().load("pest", ["model", "labels"])
+    model = models["model"]
+    labels = models["labels"] or sorted(os.listdir(FOLDER))
+    print(f"{len(items)} images from {folder}, model {type(model).__name__}")
+
+    secs = timed(lambda: one_at_a_time(items, model))
+    print(f"  one at a time        {len(items) / secs:8.1f} images/s")
+
+    workers = 1
+    while workers <= os.cpu_count():
+        secs = timed(lambda: list(predict_images(items, model, labels, workers=workers)))
+        print(f"  batched, {workers:>2} threads  {len(items) / secs:8.1f} images/s")
+        workers *= 2
+
+    shards = read_shards()
+    if shards is not None:
+        def from_shards():
+            for images, _ in shards.views():
+                for i in range(0, len(images), 32):
+                    model.predict(np.divide(images[i:i + 32], np.float32(255)), verbose=0)
+
+        secs = timed(from_shards)
+        print(f"  batched, from shards {len(shards) / secs:8.1f} images/s ({len(shards)} images)")
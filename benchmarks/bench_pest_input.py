@@ -0,0 +1,66 @@
+import argparse
+import os
+import time
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import tensorflow as tf
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+from utils.train_pest_model import CONFIG, DATA_PATH, build_model, class_names, datasets
+
+# -----------------------------------------------------------
+# Pest training input: ImageDataGenerator vs the tf.data pipeline
+# python -m utils.benchmarks.bench_pest_input [--epochs 3] [--fit]
+# -----------------------------------------------------------
+# Without --fit only the input pipeline is iterated (images/sec it can
+# feed); with --fit whole training epochs are timed with the real model.
+
+
+def generators(data_path):
+    datagen = ImageDataGenerator(rescale=1/255.0, validation_split=CONFIG["validation_split"])
+    kwargs = dict(target_size=tuple(CONFIG["img_size"]), batch_size=CONFIG["batch_size"],
+                  class_mode="categorical", classes=class_names(data_path))
+    return (datagen.flow_from_directory(data_path, subset="training", **kwargs),
+            datagen.flow_from_directory(data_path, subset="validation", **kwargs))
+
+
+def iterate(name, train, epochs, n_images):
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        if isinstance(train, tf.data.Dataset):
+            for _ in train:
+                pass
+        else:
+            for _ in range(len(train)):
+                next(train)
+        secs = time.perf_counter() - start
+        print(f"  {name:<20} epoch {epoch + 1}: {secs:6.2f} s  {n_images / secs:8.1f} images/s")
+
+
+def fit(name, train, val, num_classes, epochs):
+    model = build_model(num_classes)
+    start = time.perf_counter()
+    model.fit(train, validation_data=val, epochs=epochs, verbose=0)
+    secs = time.perf_counter() - start
+    print(f"  {name:<20} {epochs} training epochs: {secs:7.2f} s ({secs / epochs:.2f} s/epoch)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--fit", action="store_true")
+    args = parser.parse_args()
+
+    gen_train, gen_val = generators(args.data)
+    ds_train, ds_val, labels = datasets(args.data)
+    n = gen_train.samples
+    print(f"{n} training images, {len(labels)} classes, cache={CONFIG['cache']}")
+
+    if args.fit:
+        fit("ImageDataGenerator", gen_train, gen_val, len(labels), args.epochs)
+        fit("tf.data", ds_train, ds_val, len(labels), args.epochs)
+    else:
+        iterate("ImageDataGenerator", gen_train, args.epochs, n)
+        iterate("tf.data", ds_train, args.epochs, n)
@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# -----------------------------------------------------------
+# Pest CNN: TensorFlow vs the NumPy runtime
+# python -m utils.benchmarks.bench_pest_runtime [model.h5]
+# -----------------------------------------------------------
+# Each backend runs in a fresh interpreter so import time and resident
+# memory are measured from a cold start, the same way a worker starts.
+
+RUNS = 30
+BATCH = 32
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def worker(backend, h5):
+    start = time.perf_counter()
+    if backend == "tensorflow":
+        import tensorflow as tf
+        model = tf.keras.models.load_model(h5)
+        predict = lambda x: model.predict(x, verbose=0)
+    else:
+        from utils.pest_runtime import cnn_path, load_cnn
+        model = load_cnn(cnn_path(h5))
+        predict = model.predict
+    load_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    single = rng.random((1, 150, 150, 3), dtype=np.float32)
+    batch = rng.random((BATCH, 150, 150, 3), dtype=np.float32)
+
+    start = time.perf_counter()
+    predict(single)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        predict(single)
+        times.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for _ in range(3):
+        out = predict(batch)
+    batch_ips = 3 * BATCH / (time.perf_counter() - start)
+
+    np.save(f"/tmp/bench_pest_{backend}.npy", out)
+    return {
+        "load_s": load_s,
+        "first_ms": first_ms,
+        "p50_ms": float(np.percentile(times, 50)),
+        "p99_ms": float(np.percentile(times, 99)),
+        "images_per_s": batch_ips,
+        "rss_mb": rss_mb(),
+    }
+
+
+def run(backend, h5):
+    proc = subprocess.run(
+        [sys.executable, "-m", "utils.benchmarks.bench_pest_runtime", "--worker", backend, h5],
+        capture_output=True, text=True,
+        env={**os.environ, "TF_CPP_MIN_LOG_LEVEL": "3"},
+    )
+    if proc.returncode != 0:
+        print(f"  {backend:<11} FAILED\n{proc.stderr[-2000:]}")
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        i = sys.argv.index("--worker")
+        print(json.dumps(worker(sys.argv[i + 1], sys.argv[i + 2])))
+        sys.exit(0)
+
+    from utils.model_bundle import part_path
+
+    h5 = sys.argv[1] if len(sys.argv) > 1 else part_path("pest", "model")
+    print(f"Pest model: {h5}")
+    results = {b: run(b, h5) for b in ("tensorflow", "numpy")}
+
+    for backend, r in results.items():
+        if r:
+            print(f"  {backend:<11} import+load {r['load_s']:6.2f} s | first call {r['first_ms']:8.1f} ms"
+                  f" | single p50 {r['p50_ms']:7.1f} ms p99 {r['p99_ms']:7.1f} ms"
+                  f" | batch {r['images_per_s']:7.1f} img/s | RSS {r['rss_mb']:7.1f} MB")
+
+    if all(results.values()):
+        diff = np.abs(np.load("/tmp/bench_pest_tensorflow.npy") - np.load("/tmp/bench_pest_numpy.npy")).max()
+        print(f"  max |tf - numpy| on a {BATCH}-image batch: {diff:.2e}")
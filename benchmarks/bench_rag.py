@@ -0,0 +1,76 @@
+import sys
+import time
+
+import numpy as np
+
+from utils.rag_index import build_index
+
+# -----------------------------------------------------------
+# Chatbot RAG: substring scan vs the BM25 index
+# python -m utils.benchmarks.bench_rag [pages ...]
+# -----------------------------------------------------------
+# rag_docs/ is scaled up with synthetic scheme pages. Every page states one
+# fact per (scheme, district); each query asks for one of them in natural
+# wording, and counts as a hit when that fact is among the top 3 passages.
+
+SCHEMES = ["pm kisan", "rythu bharosa", "pmfby", "kisan credit card", "soil health card",
+           "pm krishi sinchayee", "national food security mission", "paramparagat krishi vikas"]
+GROUPS = ["small", "marginal", "tenant", "women", "tribal", "landless"]
+SENTENCES_PER_PAGE = 40
+QUERIES = 200
+
+
+def make_corpus(pages, seed=0):
+    rng = np.random.default_rng(seed)
+    facts, text = [], []
+    for page in range(pages):
+        for i in range(SENTENCES_PER_PAGE):
+            scheme = SCHEMES[rng.integers(len(SCHEMES))]
+            group = GROUPS[rng.integers(len(GROUPS))]
+            district = f"district{page}x{i}"
+            amount = int(rng.integers(1, 100)) * 500
+            fact = (f"under the {scheme} scheme, {group} farmers of {district} receive "
+                    f"rs {amount} per season after e-kyc verification at the mandal office")
+            facts.append((scheme, group, district, fact))
+            text.append(fact + ".")
+        text.append("\n")
+    return " ".join(text), facts
+
+
+def scan(pdf_data, query):
+    # the original rag_answer()
+    sentences = pdf_data.split(".")
+    results = [s.strip() for s in sentences if query in s]
+    return results[:3] if results else None
+
+
+def run(pages):
+    text, facts = make_corpus(pages)
+    rng = np.random.default_rng(1)
+    picks = [facts[i] for i in rng.integers(len(facts), size=QUERIES)]
+    queries = [(f"how much do {g} farmers in {d} get from {s}?", fact) for s, g, d, fact in picks]
+
+    start = time.perf_counter()
+    index = build_index(text)
+    build_s = time.perf_counter() - start
+
+    def measure(func):
+        times, hits = [], 0
+        for query, fact in queries:
+            start = time.perf_counter()
+            out = func(query) or []
+            times.append((time.perf_counter() - start) * 1e6)
+            hits += any(fact in passage for passage in out)
+        return np.percentile(times, 50), hits / len(queries)
+
+    scan_us, scan_hit = measure(lambda q: scan(text, q))
+    bm25_us, bm25_hit = measure(lambda q: [p for p, _ in index.search(q)])
+
+    print(f"{pages:>6} pages ({len(index):>7} passages, index built in {build_s:5.2f} s)")
+    print(f"  substring scan   p50 {scan_us:10.0f} us   hit rate {scan_hit:6.1%}")
+    print(f"  BM25 index       p50 {bm25_us:10.0f} us   hit rate {bm25_hit:6.1%}")
+
+
+if __name__ == "__main__":
+    for pages in [int(p) for p in sys.argv[1:]] or [100, 1000, 5000]:
+        run(pages)
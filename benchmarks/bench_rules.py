@@ -0,0 +1,97 @@
+import sys
+import time
+
+import numpy as np
+
+from utils.grievance_rules import DEFAULT_RULES, RuleEngine
+
+# -----------------------------------------------------------
+# Grievance rules: keyword loops vs the compiled rule engine
+# python -m utils.benchmarks.bench_rules [keywords ...]
+# -----------------------------------------------------------
+# DEFAULT_RULES is grown with synthetic English and Telugu keywords spread
+# over extra departments and priority levels. Both sides must return the
+# same (department, priority) for every complaint.
+
+COMPLAINTS = 2000
+DEPARTMENTS = 12
+SYLLABLES = ["ka", "ra", "ma", "pa", "ta", "la", "va", "sa", "na", "ja", "ga", "da"]
+TELUGU = ["క", "ర", "మ", "ప", "ట", "ల", "వ", "స", "న", "జ", "గ", "ద", "ం", "ి", "ు"]
+FILLER = ["no", "water", "since", "two", "weeks", "in", "our", "ward", "please", "help",
+          "పని", "చేయడం", "లేదు", "గ్రామం", "road", "not", "working", "pending"]
+
+
+def legacy(text, rules):
+    # classify_department() + priority_score() before the rule engine
+    t = text.lower()
+    department = None
+    for entry in rules["departments"]:
+        if any(w in t for w in entry["keywords"]):
+            department = entry["name"]
+            break
+    priority = rules["default_priority"]
+    for entry in rules["priorities"]:
+        if any(w in t for w in entry["keywords"]):
+            priority = entry["name"]
+            break
+    return department, priority
+
+
+def make_rules(n, rng):
+    rules = {
+        "departments": [dict(e, keywords=list(e["keywords"])) for e in DEFAULT_RULES["departments"]],
+        "priorities": [dict(e, keywords=list(e["keywords"])) for e in DEFAULT_RULES["priorities"]],
+        "default_priority": DEFAULT_RULES["default_priority"],
+    }
+    rules["departments"] += [{"name": f"Department {i}", "keywords": []} for i in range(DEPARTMENTS)]
+    seen = {w for e in rules["departments"] + rules["priorities"] for w in e["keywords"]}
+    while len(seen) < n:
+        if rng.random() < 0.4:
+            word = "".join(TELUGU[i] for i in rng.integers(len(TELUGU), size=rng.integers(3, 6)))
+        else:
+            word = "".join(SYLLABLES[i] for i in rng.integers(len(SYLLABLES), size=rng.integers(3, 5)))
+        if word in seen:
+            continue
+        seen.add(word)
+        group = rules["priorities"] if rng.random() < 0.2 else rules["departments"]
+        group[rng.integers(len(group))]["keywords"].append(word)
+    return rules
+
+
+def make_complaints(rules, rng):
+    words = [w for e in rules["departments"] + rules["priorities"] for w in e["keywords"]]
+    out = []
+    for _ in range(COMPLAINTS):
+        parts = [FILLER[i] for i in rng.integers(len(FILLER), size=8)]
+        for _ in range(rng.integers(0, 3)):
+            parts.insert(int(rng.integers(len(parts))), words[rng.integers(len(words))])
+        out.append(" ".join(parts))
+    return out
+
+
+def run(n):
+    rng = np.random.default_rng(0)
+    rules = make_rules(n, rng)
+    complaints = make_complaints(rules, rng)
+
+    start = time.perf_counter()
+    engine = RuleEngine(rules)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    def measure(func):
+        start = time.perf_counter()
+        out = [func(c) for c in complaints]
+        return (time.perf_counter() - start) / len(complaints) * 1e6, out
+
+    loop_us, expected = measure(lambda c: legacy(c, rules))
+    engine_us, got = measure(engine.match)
+    same = sum(a == b for a, b in zip(expected, got))
+
+    print(f"{engine.matcher.size:>7} keywords (compiled in {compile_ms:7.1f} ms)")
+    print(f"  keyword loops    {loop_us:9.1f} us/complaint")
+    print(f"  rule engine      {engine_us:9.1f} us/complaint   same answer {same}/{len(complaints)}")
+
+
+if __name__ == "__main__":
+    for n in [int(k) for k in sys.argv[1:]] or [50, 1000, 5000, 20000]:
+        run(n)
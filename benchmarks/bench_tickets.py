@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from utils.grievance_store import GrievanceStore
+from utils.ticket_ids import TicketGenerator
+
+# -----------------------------------------------------------
+# Ticket ids: random 6-digit tickets vs ticket_ids.py
+# python -m utils.benchmarks.bench_tickets [rows]
+# -----------------------------------------------------------
+# 1. duplicate tickets among N issued (the old generate_ticket())
+# 2. ids issued by PROCESSES forked workers at full speed: all unique?
+# 3. track latency in a store of `rows` complaints, by id vs by text
+
+PROCESSES = 8
+PER_PROCESS = 100_000
+LOOKUPS = 2000
+
+
+def old_ticket():
+    return "GRV-" + str(random.randint(100000, 999999))
+
+
+def worker(args):
+    db, n = args
+    store = GrievanceStore(db, csv_path=None)
+    gen = TicketGenerator(lease=store.lease_node)
+    start = time.perf_counter()
+    ids = [gen.next_id() for _ in range(n)]
+    return ids, time.perf_counter() - start
+
+
+def p50_us(func, args):
+    times = []
+    for a in args:
+        start = time.perf_counter()
+        func(a)
+        times.append((time.perf_counter() - start) * 1e6)
+    return np.percentile(times, 50)
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    random.seed(0)
+    for n in (1_000, 10_000, 100_000):
+        tickets = [old_ticket() for _ in range(n)]
+        print(f"random tickets: {n - len(set(tickets)):>6} duplicates among {n:>7}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "tickets.db")
+        GrievanceStore(db, csv_path=None)
+        with multiprocessing.get_context("fork").Pool(PROCESSES) as pool:
+            results = pool.map(worker, [(db, PER_PROCESS)] * PROCESSES)
+        ids = [i for r, _ in results for i in r]
+        increasing = all(all(a < b for a, b in zip(r, r[1:])) for r, _ in results)
+        rate = PER_PROCESS / np.mean([s for _, s in results])
+        print(f"ticket_ids: {len(ids) - len(set(ids))} duplicates among {len(ids)} from {PROCESSES} processes, "
+              f"increasing per process {increasing}, {rate:,.0f} ids/s per process")
+
+        # half legacy tickets, half new ones
+        gen = TicketGenerator(node=1)
+        store = GrievanceStore(os.path.join(tmp, "lookup.db"), csv_path=None)
+        batch = []
+        for i in range(rows):
+            ticket = f"GRV-{i:06d}" if i % 2 else gen.next_ticket()
+            batch.append((ticket, f"complaint {i}", "Water", "🟢 LOW PRIORITY (Normal Case)"))
+            if len(batch) == 50_000:
+                store.append_many(batch)
+                batch = []
+        store.append_many(batch)
+
+        picks = np.random.default_rng(0).integers(rows // 2, size=LOOKUPS) * 2
+        new = [store.conn().execute("SELECT ticket FROM complaints WHERE id = ?", (int(i) + 1,)).fetchone()[0]
+               for i in picks]
+        legacy = [f"GRV-{int(i) + 1:06d}" for i in picks]
+        print(f"{rows} complaints: track by id p50 {p50_us(store.lookup, new):6.1f} us, "
+              f"by legacy text p50 {p50_us(store.lookup, legacy):6.1f} us")
@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# -----------------------------------------------------------
+# First-request latency with and without warm-up
+# python -m utils.benchmarks.bench_warmup
+# -----------------------------------------------------------
+# Every case runs in a fresh interpreter (like a worker after a deploy). The
+# "request" is one pest image plus one crop row; "first" is the first request
+# the process serves, "steady" the median of the next RUNS.
+
+RUNS = 20
+TASKS = {"pest": ["model"], "crop": ["model"]}
+
+
+def request(registry, rng):
+    pest = registry.get("pest", "model")
+    crop = registry.get("crop", "model")
+    start = time.perf_counter()
+    pest.predict(rng.random((1, *pest.input_shape[-3:]), dtype=np.float32))
+    crop.predict_proba(rng.random((1, crop.n_features_in_)) * 100)
+    return (time.perf_counter() - start) * 1000
+
+
+def worker(warm):
+    from utils.model_bundle import ModelRegistry
+    from utils.warmup import warm_up
+
+    registry = ModelRegistry()
+    rng = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    if warm:
+        warm_up(registry, TASKS)
+    startup_s = time.perf_counter() - start
+
+    # cold: loading the models is part of the first request
+    start = time.perf_counter()
+    request(registry, rng)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    steady = [request(registry, rng) for _ in range(RUNS)]
+    return {"startup_s": startup_s, "first_ms": first_ms, "steady_ms": float(np.median(steady))}
+
+
+def run(backend, warm):
+    proc = subprocess.run(
+        [sys.executable, "-m", "utils.benchmarks.bench_warmup", "--worker", "warm" if warm else "cold"],
+        capture_output=True, text=True,
+        env={**os.environ, "PEST_BACKEND": backend, "TF_CPP_MIN_LOG_LEVEL": "3"},
+    )
+    if proc.returncode != 0:
+        print(f"  {backend:<11} FAILED\n{proc.stderr[-2000:]}")
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        print(json.dumps(worker(sys.argv[sys.argv.index("--worker") + 1] == "warm")))
+        sys.exit(0)
+
+    for backend in ("numpy", "tensorflow"):
+        for warm in (False, True):
+            r = run(backend, warm)
+            if r:
+                print(f"  {backend:<11} {'warm' if warm else 'cold':<5} startup {r['startup_s']:6.2f} s"
+                      f" | first request {r['first_ms']:8.1f} ms | steady {r['steady_ms']:6.1f} ms")
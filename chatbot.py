@@ -1,42 +1,37 @@
-import os
 import re
-import pdfplumber
+
+from utils.keyword_matcher import KeywordMatcher
+from utils.lazy_imports import lazy_init, lazy_module
+from utils.rag_index import build_index
+
+pdf_ingest = lazy_module("utils.pdf_ingest")
 
 # -----------------------------------------------------------
 # LOAD GOVERNMENT PDF KNOWLEDGE BASE (RAG)
 # -----------------------------------------------------------
 
 def load_pdf_knowledge():
-    text = ""
-    folder = "rag_docs"
-    if not os.path.exists(folder):
-        return ""
-
-    for file in os.listdir(folder):
-        if file.endswith(".pdf"):
-            try:
-                with pdfplumber.open(os.path.join(folder, file)) as pdf:
-                    for page in pdf.pages:
-                        content = page.extract_text()
-                        if content:
-                            text += content.lower() + "\n"
-            except:
-                pass
-    return text
-
-pdf_data = load_pdf_knowledge()
+    # parsed in parallel and cached per PDF, see pdf_ingest.py
+    return pdf_ingest.load_text("rag_docs")
+
+# Parsed on the first chatbot query instead of at import time
+get_pdf_data = lazy_init(load_pdf_knowledge)
+
+
+@lazy_init
+def get_pdf_index():
+    """BM25 index over the PDF sentences, built once (see rag_index.py)."""
+    return build_index(get_pdf_data())
 
 
 def rag_answer(query):
     """Return sentences from government PDFs if relevant."""
-    if not pdf_data:
+    index = get_pdf_index()
+    if not len(index):
         return None
 
-    query = query.lower()
-    sentences = pdf_data.split(".")
-    results = [s.strip() for s in sentences if query in s]
-
-    return results[:3] if results else None
+    results = [passage for passage, _ in index.search(query, k=3)]
+    return results if results else None
 
 
 # -----------------------------------------------------------
@@ -111,6 +106,99 @@ def soil_test(n, p, k):
     return reply
 
 
+# -----------------------------------------------------------
+# INTENT KEYWORDS
+# -----------------------------------------------------------
+# Every keyword table is compiled into one matcher (keyword_matcher.py), so
+# a message is scanned once however many crops and synonyms there are.
+# detect_intent() then applies the fixed priority order:
+#   season > crop details > fertilizer (with a crop) > soil test > scheme
+# Within a group the first entry of the table wins, like the old if-chains.
+
+season_keywords = {
+    "rainy": ["rainy", "monsoon", "వర్షాకాలం"],
+    "summer": ["summer", "గ్రీష్మం"],
+    "winter": ["winter", "చలికాలం"],
+}
+
+fertilizer_keywords = ["fertilizer", "ఎరువు"]
+
+soil_keywords = ["soil", "npk", "n ", "p ", "k "]
+
+scheme_keywords = {
+    "pmfby": ["pmbfy", "pmfby", "insurance", "బీమా"],
+    "rythu": ["rythu", "bharosa", "రైతు"],
+    "kisan": ["pm kisan", "kisan"],
+}
+
+
+def build_intents(crops=crop_info, fertilizers=fertilizer_advice,
+                  seasons=season_keywords, schemes=scheme_keywords):
+    keywords = []
+    for rank, (season, words) in enumerate(seasons.items()):
+        keywords += [(w, ("season", rank, season)) for w in words]
+    for rank, crop in enumerate(crops):
+        keywords.append((crop, ("crop", rank, crop)))
+    for rank, crop in enumerate(fertilizers):
+        keywords.append((crop, ("fertilizer_crop", rank, crop)))
+    keywords += [(w, ("fertilizer", 0, None)) for w in fertilizer_keywords]
+    keywords += [(w, ("soil", 0, None)) for w in soil_keywords]
+    for rank, (scheme, words) in enumerate(schemes.items()):
+        keywords += [(w, ("scheme", rank, scheme)) for w in words]
+    return KeywordMatcher(keywords)
+
+
+def detect_intent(user, matcher):
+    """(intent, key) by priority, or (None, None)."""
+    best = {}
+    for kind, rank, key in matcher.labels(user):
+        if kind not in best or rank < best[kind][0]:
+            best[kind] = (rank, key)
+
+    if "season" in best:
+        return "season", best["season"][1]
+    if "crop" in best:
+        return "crop", best["crop"][1]
+    if "fertilizer" in best and "fertilizer_crop" in best:
+        return "fertilizer", best["fertilizer_crop"][1]
+    if "soil" in best:
+        return "soil", None
+    if "scheme" in best:
+        return "scheme", best["scheme"][1]
+    return None, None
+
+
+intents = build_intents()
+
+season_replies = {
+    "rainy": "🌧️ **Rainy Season Best Crops:**\n- Paddy\n- Cotton\n- Maize\n- Turmeric\n- Soybean\n- Groundnut",
+    "summer": "☀️ **Summer Season Crops:**\n- Millets\n- Sunflower\n- Vegetables",
+    "winter": "❄️ **Winter (Rabi) Crops:**\n- Wheat\n- Mustard\n- Barley",
+}
+
+scheme_replies = {
+    "pmfby": (
+        "🏛️ **PMFBY Crop Insurance:**\n"
+        "- Farmers with land ownership are eligible\n"
+        "- Premium: 2% Kharif, 1.5% Rabi\n"
+        "- Covers natural calamity losses\n"
+        "- Enrollment before sowing season"
+    ),
+    "rythu": (
+        "💰 **YSR Rythu Bharosa:**\n"
+        "- ₹13,500 yearly assistance\n"
+        "- Paid in 3 installments\n"
+        "- Land-owning farmers eligible"
+    ),
+    "kisan": (
+        "🌿 **PM-KISAN Scheme:**\n"
+        "- ₹6000/year\n"
+        "- Direct bank transfer\n"
+        "- All small & marginal farmers eligible"
+    ),
+}
+
+
 # -----------------------------------------------------------
 # MAIN CHATBOT FUNCTION
 # -----------------------------------------------------------
@@ -125,37 +213,30 @@ def chatbot_response(text):
     if rag:
         return "📘 **Government Scheme Information:**\n" + "\n".join(rag)
 
+    intent, key = detect_intent(user, intents)
+
     # -------------------------------------
     # 2. SEASONAL CROP QUESTIONS
     # -------------------------------------
-    if "rainy" in user or "monsoon" in user or "వర్షాకాలం" in user:
-        return "🌧️ **Rainy Season Best Crops:**\n- Paddy\n- Cotton\n- Maize\n- Turmeric\n- Soybean\n- Groundnut"
-
-    if "summer" in user or "గ్రీష్మం" in user:
-        return "☀️ **Summer Season Crops:**\n- Millets\n- Sunflower\n- Vegetables"
-
-    if "winter" in user or "చలికాలం" in user:
-        return "❄️ **Winter (Rabi) Crops:**\n- Wheat\n- Mustard\n- Barley"
+    if intent == "season":
+        return season_replies[key]
 
     # -------------------------------------
     # 3. CROP DETAILS
     # -------------------------------------
-    for crop in crop_info:
-        if crop in user:
-            return f"🌾 **{crop.capitalize()} Information:**\n{crop_info[crop]}\n\n💡 Fertilizer: {fertilizer_advice.get(crop, 'Data available')}"
+    if intent == "crop":
+        return f"🌾 **{key.capitalize()} Information:**\n{crop_info[key]}\n\n💡 Fertilizer: {fertilizer_advice.get(key, 'Data available')}"
 
     # -------------------------------------
     # 4. FERTILIZER ADVICE
     # -------------------------------------
-    if "fertilizer" in user or "ఎరువు" in user:
-        for crop in fertilizer_advice:
-            if crop in user:
-                return f"🌱 Fertilizer for {crop.capitalize()}:\n{fertilizer_advice[crop]}"
+    if intent == "fertilizer":
+        return f"🌱 Fertilizer for {key.capitalize()}:\n{fertilizer_advice[key]}"
 
     # -------------------------------------
     # 5. SOIL TEST (NPK)
     # -------------------------------------
-    if any(word in user for word in ["soil", "npk", "n ", "p ", "k "]):
+    if intent == "soil":
         nums = re.findall(r"\d+", user)
         if len(nums) >= 3:
             n, p, k = map(int, nums[:3])
@@ -165,30 +246,8 @@ def chatbot_response(text):
     # -------------------------------------
     # 6. SCHEME QUESTIONS (BUILT-IN ANSWERS)
     # -------------------------------------
-    if "pmbfy" in user or "pmfby" in user or "insurance" in user or "బీమా" in user:
-        return (
-            "🏛️ **PMFBY Crop Insurance:**\n"
-            "- Farmers with land ownership are eligible\n"
-            "- Premium: 2% Kharif, 1.5% Rabi\n"
-            "- Covers natural calamity losses\n"
-            "- Enrollment before sowing season"
-        )
-
-    if "rythu" in user or "bharosa" in user or "రైతు" in user:
-        return (
-            "💰 **YSR Rythu Bharosa:**\n"
-            "- ₹13,500 yearly assistance\n"
-            "- Paid in 3 installments\n"
-            "- Land-owning farmers eligible"
-        )
-
-    if "pm kisan" in user or "kisan" in user:
-        return (
-            "🌿 **PM-KISAN Scheme:**\n"
-            "- ₹6000/year\n"
-            "- Direct bank transfer\n"
-            "- All small & marginal farmers eligible"
-        )
+    if intent == "scheme":
+        return scheme_replies[key]
 
     # -------------------------------------
     # 7. FALLBACK: BASIC ASSISTANCE
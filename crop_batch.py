@@ -0,0 +1,125 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------
+# BATCH CROP RECOMMENDATION (CSV IN -> CSV OUT)
+# -----------------------------------------------------------
+# Accepts soil-test sheets in the crop_data.csv layout, encodes the soil
+# column in one vectorized pass and runs a single predict_proba call per
+# chunk instead of one predict call per farm.
+
+# Same order as the training features in train_models.py
+FEATURES = [
+    "Temperature",
+    "Humidity",
+    "Moisture",
+    "Soil Type",
+    "Nitrogen",
+    "Potassium",
+    "Phosphorus"
+]
+
+# crop_data.csv spellings -> training names
+COLUMN_FIXES = {
+    "Temparature": "Temperature",
+    "Phosphorous": "Phosphorus"
+}
+
+CHUNK_SIZE = 20000
+
+
+def encode_soil(soil_encoder, soil):
+    """Vectorized LabelEncoder.transform that flags unknown soil types instead of raising."""
+    # compare as Python strings: casting to a fixed-width classes_ dtype
+    # (e.g. <U5) would truncate longer unknown values into real classes
+    classes = soil_encoder.classes_.astype(object)
+    values = pd.Series(soil).astype(str).str.strip().to_numpy(dtype=object, na_value="")
+
+    codes = np.searchsorted(classes, values)
+    codes = np.clip(codes, 0, len(classes) - 1)
+    known = classes[codes] == values
+    return codes, known
+
+
+def predict_chunk(chunk, model, crop_encoder, soil_encoder, top_k=3):
+    chunk = chunk.rename(columns=COLUMN_FIXES)
+
+    missing = [c for c in FEATURES if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    soil_codes, known = encode_soil(soil_encoder, chunk["Soil Type"])
+
+    X = np.empty((len(chunk), len(FEATURES)), dtype=np.float32)
+    for j, col in enumerate(FEATURES):
+        if col == "Soil Type":
+            X[:, j] = soil_codes
+        else:
+            X[:, j] = pd.to_numeric(chunk[col], errors="coerce")
+
+    valid = known & ~np.isnan(X).any(axis=1)
+
+    top_k = max(1, min(int(top_k), len(model.classes_)))
+    crops = np.full((len(chunk), top_k), "", dtype=object)
+    probs = np.full((len(chunk), top_k), np.nan)
+
+    if valid.any():
+        X_valid = X[valid]
+        if hasattr(model, "feature_names_in_"):
+            X_valid = pd.DataFrame(X_valid, columns=model.feature_names_in_)
+
+        proba = model.predict_proba(X_valid)
+        # stable sort keeps predict()'s tie-breaking (first max wins)
+        top = np.argsort(-proba, axis=1, kind="stable")[:, :top_k]
+
+        crops[valid] = crop_encoder.classes_[model.classes_[top]]
+        probs[valid] = np.take_along_axis(proba, top, axis=1)
+
+    out = chunk.copy()
+    out["Recommended Crop"] = np.where(valid, crops[:, 0], "")
+    for i in range(top_k):
+        out[f"Crop {i + 1}"] = crops[:, i]
+        out[f"Probability {i + 1}"] = probs[:, i].round(4)
+    out["Error"] = np.where(known, np.where(valid, "", "Invalid numeric value"), "Unknown soil type")
+    return out
+
+
+def predict_csv(source, model, crop_encoder, soil_encoder, top_k=3, chunk_size=CHUNK_SIZE):
+    """Yield the result CSV piece by piece (header first) so large sheets stream."""
+    header = True
+    for chunk in pd.read_csv(source, chunksize=chunk_size):
+        out = predict_chunk(chunk, model, crop_encoder, soil_encoder, top_k)
+        yield out.to_csv(index=False, header=header)
+        header = False
+
+
+# -----------------------------------------------------------
+# COMMAND LINE: python -m utils.crop_batch farms.csv out.csv [top_k]
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    import time
+
+    from utils.model_bundle import ModelRegistry
+
+    if len(sys.argv) < 3:
+        print("Usage: python -m utils.crop_batch <input.csv> <output.csv> [top_k]")
+        sys.exit(1)
+
+    top_k = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    try:
+        models = ModelRegistry().load("crop", ["model", "crop_encoder", "soil_encoder"])
+    except FileNotFoundError:
+        print("❌ No crop model found. Train it first: python -m utils.train crop")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    with open(sys.argv[2], "w", newline="") as f:
+        for part in predict_csv(sys.argv[1], models["model"], models["crop_encoder"],
+                                models["soil_encoder"], top_k):
+            f.write(part)
+
+    print(f"✅ Recommendations written to {sys.argv[2]} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,195 @@
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.model_bundle import file_hash
+
+# -----------------------------------------------------------
+# DATA LAYER: CSV -> COLUMNAR BINARY CACHE
+# -----------------------------------------------------------
+# Each dataset is parsed from text once and stored as one .npy file per
+# column (numeric columns downcast, text columns as categorical codes +
+# categories). Later loads memory-map the columns as long as the source
+# CSV is unchanged (same size and mtime, or failing that the same hash).
+#
+#   data/.cache/<name>/manifest.json
+#   data/.cache/<name>/<i>.npy              column values / category codes
+#   data/.cache/<name>/<i>.categories.json  category labels
+
+CACHE_DIR = "data/.cache"
+FORMAT_VERSION = 1
+
+DATASETS = {
+    "crop": {
+        "path": "data/crop_data.csv",
+        "categorical": ["Soil Type", "Crop Type", "Fertilizer Name"],
+    },
+    "market": {
+        "path": "data/market_prices.csv",
+        "categorical": ["Crop"],
+    },
+    "groundwater": {
+        "path": "data/groundwater.csv",
+        "categorical": ["Name of State", "Name of District"],
+    },
+}
+
+
+# -----------------------------------------
+# DOWNCASTING
+# -----------------------------------------
+
+def downcast(series):
+    """Smallest dtype that holds the column exactly (floats only if lossless)."""
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return pd.to_numeric(series, downcast="integer")
+
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy()
+        if not np.isnan(values).any() and np.array_equal(values, np.trunc(values)):
+            return pd.to_numeric(series, downcast="integer")     # whole numbers
+        if np.array_equal(values.astype(np.float32), values, equal_nan=True):
+            return series.astype(np.float32)
+    return series
+
+
+def optimize(df, categorical=()):
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in categorical or s.dtype == object or pd.api.types.is_string_dtype(s):
+            out[col] = s.astype("category")
+        else:
+            out[col] = downcast(s)
+    return pd.DataFrame(out)
+
+
+# -----------------------------------------
+# CACHE WRITE / READ
+# -----------------------------------------
+
+def _source_state(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def build_cache(path, cache_path, categorical=()):
+    df = optimize(pd.read_csv(path), categorical)
+
+    tmp = f"{cache_path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        entry = {"name": col, "file": f"{i}.npy"}
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tmp, entry["file"]), s.cat.codes.to_numpy())
+            entry["categories"] = f"{i}.categories.json"
+            with open(os.path.join(tmp, entry["categories"]), "w") as f:
+                json.dump(s.cat.categories.tolist(), f, ensure_ascii=False)
+        else:
+            np.save(os.path.join(tmp, entry["file"]), s.to_numpy(), allow_pickle=False)
+        columns.append(entry)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "source": os.path.abspath(path),
+        **_source_state(path),
+        "sha256": file_hash(path),
+        "rows": len(df),
+        "columns": columns,
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    old = f"{cache_path}.old-{os.getpid()}"
+    if os.path.exists(cache_path):
+        os.replace(cache_path, old)
+    os.replace(tmp, cache_path)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def _fresh_manifest(path, cache_path):
+    """Manifest of a cache that still matches the source CSV, else None."""
+    try:
+        with open(os.path.join(cache_path, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+
+    state = _source_state(path)
+    if state["size"] != manifest["size"]:
+        return None
+    if state["mtime_ns"] != manifest["mtime_ns"] and file_hash(path) != manifest["sha256"]:
+        return None
+    return manifest
+
+
+def _shares(df, data, names):
+    return all(np.shares_memory(df[n].to_numpy(), data[n]) for n in names)
+
+
+def _frame(data, mapped):
+    """DataFrame over `data` ({name: array}) that still reads the `mapped`
+    columns from their memory maps. pandas may consolidate same-dtype
+    columns into one 2-D block, which copies them into RAM; if that
+    happened, the frame is rebuilt from one Series per column."""
+    df = pd.DataFrame(data, copy=False)
+    if _shares(df, data, mapped):
+        return df
+    df = pd.concat([pd.Series(values, name=name, copy=False) for name, values in data.items()], axis=1)
+    if not _shares(df, data, mapped):
+        print("⚠️ This pandas version copies memory-mapped columns; the dataset is loaded into RAM")
+    return df
+
+
+def read_cache(cache_path, manifest, mmap=True):
+    data = {}
+    mapped = []
+    for entry in manifest["columns"]:
+        values = np.load(os.path.join(cache_path, entry["file"]),
+                         mmap_mode="r" if mmap else None, allow_pickle=False)
+        if "categories" in entry:
+            with open(os.path.join(cache_path, entry["categories"])) as f:
+                categories = json.load(f)
+            data[entry["name"]] = pd.Categorical.from_codes(values, categories)
+        else:
+            data[entry["name"]] = values
+            if mmap:
+                mapped.append(entry["name"])
+    return _frame(data, mapped)
+
+
+def load_dataset(name, mmap=True, cache_dir=CACHE_DIR):
+    """Load a dataset by name (see DATASETS) or CSV path through the cache."""
+    spec = DATASETS.get(name, {"path": name, "categorical": []})
+    path = spec["path"]
+    key = name if name in DATASETS else os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, key)
+
+    manifest = _fresh_manifest(path, cache_path)
+    if manifest is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest = build_cache(path, cache_path, spec["categorical"])
+    return read_cache(cache_path, manifest, mmap=mmap)
+
+
+# -----------------------------------------------------------
+# COMMAND LINE: python -m utils.datasets [name ...]
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or DATASETS:
+        df = load_dataset(name)
+        mb = df.memory_usage(deep=True).sum() / 1e6
+        print(f"✅ {name}: {len(df)} rows, {df.shape[1]} columns, {mb:.2f} MB in memory")
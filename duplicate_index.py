@@ -0,0 +1,297 @@
+import hashlib
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+
+# -----------------------------------------------------------
+# DUPLICATE COMPLAINT INDEX
+# -----------------------------------------------------------
+# Every stored complaint is vectorised once, when it is saved, and its TF-IDF
+# row is kept in the grievance database next to it:
+#
+#   complaint_vectors(id -> complaints.id, terms int32[], weights float32[])
+#
+# In memory the rows form a column-major (CSC) matrix, i.e. an inverted index
+# from term to complaints. TF-IDF rows are L2-normalised, so the cosine of a
+# new complaint with every stored one is a dot product, and only the postings
+# of the complaint's own terms are read. New rows go to a small tail that is
+# merged into the main matrix every MERGE_EVERY rows.
+#
+# The vectors are tied to the vectorizer that produced them; with a different
+# vectorizer they are recomputed once on load.
+
+THRESHOLD = 0.85
+TOP_K = 5
+MERGE_EVERY = 4096
+CHUNK = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS complaint_vectors (
+    id      INTEGER PRIMARY KEY REFERENCES complaints (id),
+    terms   BLOB NOT NULL,
+    weights BLOB NOT NULL
+);
+"""
+
+
+def vectorizer_key(vectorizer):
+    """Fingerprint of a fitted TfidfVectorizer (vocabulary + idf weights)."""
+    h = hashlib.sha256()
+    for term, i in sorted(vectorizer.vocabulary_.items()):
+        h.update(f"{term}:{i}\n".encode())
+    h.update(np.asarray(vectorizer.idf_, dtype=np.float64).tobytes())
+    return h.hexdigest()[:16]
+
+
+def _blobs(X):
+    """(terms, weights) blobs for every row of a CSR matrix."""
+    X = X.tocsr()
+    for i in range(X.shape[0]):
+        lo, hi = X.indptr[i], X.indptr[i + 1]
+        yield (X.indices[lo:hi].astype(np.int32).tobytes(),
+               X.data[lo:hi].astype(np.float32).tobytes())
+
+
+def write_vectors(conn, ids, X):
+    """Store the rows of X for complaints `ids` (inside the caller's transaction)."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO complaint_vectors (id, terms, weights) VALUES (?, ?, ?)",
+        [(i, *blob) for i, blob in zip(ids, _blobs(X))])
+
+
+class DuplicateIndex:
+    def __init__(self, store, vectorizer):
+        self.store = store
+        self.vectorizer = vectorizer
+        self.key = vectorizer_key(vectorizer)
+        self.width = len(vectorizer.vocabulary_)
+        self._lock = threading.RLock()
+
+        conn = store.conn()
+        with conn:
+            conn.executescript(SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'vectorizer'").fetchone()
+            if row is None or row[0] != self.key:
+                conn.execute("DELETE FROM complaint_vectors")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('vectorizer', ?)",
+                             (self.key,))
+
+        self._main = _Segment(sp.csc_matrix((0, self.width), dtype=np.float32))
+        self._tail = _Segment(sp.csr_matrix((0, self.width), dtype=np.float32))
+        self.sync()
+
+    def __len__(self):
+        return len(self._main) + len(self._tail)
+
+    def _last_id(self):
+        for seg in (self._tail, self._main):
+            if len(seg):
+                return int(seg.ids[-1])
+        return 0
+
+    # -----------------------------------------
+    # KEEPING UP WITH THE STORE
+    # -----------------------------------------
+
+    def sync(self):
+        """Pick up complaints saved since the last sync (also by other
+        processes), vectorising any that have no stored vector yet."""
+        with self._lock:
+            conn = self.store.conn()
+            last = self._last_id()
+
+            missing = conn.execute(
+                "SELECT c.id, c.complaint FROM complaints c "
+                "LEFT JOIN complaint_vectors v ON v.id = c.id "
+                "WHERE c.id > ? AND v.id IS NULL ORDER BY c.id", (last,)).fetchall()
+            for start in range(0, len(missing), CHUNK):
+                chunk = missing[start:start + CHUNK]
+                X = self.vectorizer.transform([r[1] for r in chunk])
+                with conn:
+                    write_vectors(conn, [r[0] for r in chunk], X)
+
+            rows = conn.execute(
+                "SELECT v.id, v.terms, v.weights, c.ticket, c.department, c.created "
+                "FROM complaint_vectors v JOIN complaints c ON c.id = v.id "
+                "WHERE v.id > ? ORDER BY v.id", (last,)).fetchall()
+            if not rows:
+                return 0
+
+            lengths = np.array([len(r[1]) // 4 for r in rows])
+            X = sp.csr_matrix(
+                (np.frombuffer(b"".join(r[2] for r in rows), dtype=np.float32),
+                 np.frombuffer(b"".join(r[1] for r in rows), dtype=np.int32),
+                 np.concatenate([[0], np.cumsum(lengths)])),
+                shape=(len(rows), self.width))
+            self._tail.append(X, [(r[0], r[3], r[4], r[5]) for r in rows])
+            self._maybe_merge()
+            return len(rows)
+
+    def _maybe_merge(self):
+        if len(self._tail) >= MERGE_EVERY:
+            self._main.append(self._tail.X, self._tail)
+            self._tail = _Segment(sp.csr_matrix((0, self.width), dtype=np.float32))
+
+    def add(self, row_id, text, ticket, department=None, created=None):
+        """Index a complaint the store has just saved under row_id."""
+        self.add_many([(row_id, text, ticket, department, created)])
+
+    def add_many(self, rows, vectors=None):
+        """rows: (row id, text, ticket, department, created); `vectors` may be
+        passed when the caller has already transformed the texts."""
+        rows = list(rows)
+        if not rows:
+            return
+        X = (vectors if vectors is not None
+             else self.vectorizer.transform([r[1] for r in rows])).tocsr().astype(np.float32)
+
+        conn = self.store.conn()
+        with conn:
+            write_vectors(conn, [r[0] for r in rows], X)
+
+        with self._lock:
+            last = self._last_id()
+            if [r[0] for r in rows] != list(range(last + 1, last + 1 + len(rows))):
+                self.sync()                 # other writers in between: read them from the store
+                return
+            self._tail.append(X, [(r[0], r[2], r[3], r[4]) for r in rows])
+            self._maybe_merge()
+
+    # -----------------------------------------
+    # QUERIES
+    # -----------------------------------------
+
+    def vectors(self):
+        """(CSR matrix, tickets) of everything indexed, oldest first."""
+        with self._lock:
+            X = sp.vstack([self._main.X.tocsr(), self._tail.X], format="csr")
+            return X, np.concatenate([self._main.tickets, self._tail.tickets])
+
+    def search(self, text, k=TOP_K, threshold=THRESHOLD, department=None, since=None, vector=None):
+        """[(ticket, score)] of the most similar earlier complaints, best first.
+        Optionally only within one department and/or created at or after `since`."""
+        q = (vector if vector is not None else self.vectorizer.transform([text])).tocsr()
+        if not q.nnz:
+            return []
+
+        with self._lock:
+            found = [seg.matches(q, threshold, department, since) for seg in (self._main, self._tail)]
+        tickets = np.concatenate([f[0] for f in found])
+        scores = np.concatenate([f[1] for f in found])
+
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(tickets[i], round(float(min(scores[i], 1.0)), 4)) for i in order]
+
+
+class _Segment:
+    """Sparse rows plus their ticket metadata. The main segment is CSC (read
+    by term), the tail CSR; both only ever grow by appending."""
+
+    def __init__(self, X):
+        self.X = X
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.tickets = np.zeros(0, dtype=object)
+        self.departments = np.zeros(0, dtype=object)
+        self.created = np.zeros(0, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, X, meta):
+        """meta: (id, ticket, department, created) per row, or another segment."""
+        if isinstance(meta, _Segment):
+            ids, tickets, departments, created = meta.ids, meta.tickets, meta.departments, meta.created
+        else:
+            ids = np.array([m[0] for m in meta], dtype=np.int64)
+            tickets = np.array([m[1] for m in meta], dtype=object)
+            departments = np.array([m[2] for m in meta], dtype=object)
+            created = np.array([np.nan if m[3] is None else m[3] for m in meta], dtype=np.float64)
+        self.X = sp.vstack([self.X, X], format=self.X.format, dtype=np.float32)
+        self.ids = np.concatenate([self.ids, ids])
+        self.tickets = np.concatenate([self.tickets, tickets])
+        self.departments = np.concatenate([self.departments, departments])
+        self.created = np.concatenate([self.created, created])
+
+    def matches(self, q, threshold, department=None, since=None):
+        """(tickets, cosine) of the rows above threshold."""
+        if not len(self):
+            return self.tickets, np.zeros(0)
+        if self.X.format == "csc":
+            # only the postings of the query's terms
+            sub = self.X[:, q.indices]
+            rows, inverse = np.unique(sub.indices, return_inverse=True)
+            scores = np.bincount(inverse, weights=sub.data * np.repeat(q.data, np.diff(sub.indptr)),
+                                 minlength=len(rows))
+        else:
+            scores = self.X @ q.T.toarray().ravel()
+            rows = np.flatnonzero(scores)
+            scores = scores[rows]
+
+        keep = scores > threshold
+        if department is not None:
+            keep &= self.departments[rows] == department
+        if since is not None:
+            keep &= self.created[rows] >= since
+        return self.tickets[rows[keep]], scores[keep]
+
+
+# -----------------------------------------
+# ALL PAIRS ABOVE A THRESHOLD (BATCHES)
+# -----------------------------------------
+# Prefix filtering: with terms in one global order (rarest first), each row
+# keeps the shortest run of its rarest terms after which the rest of the row
+# has norm below the threshold. Two unit rows with cosine above the threshold
+# always share a term from those prefixes, so only rows sharing a prefix
+# term are compared, and the prefixes consist of rare terms.
+
+def _prefixes(X, rank, threshold):
+    X = X.tocsr()
+    counts = np.diff(X.indptr)
+    row = np.repeat(np.arange(X.shape[0]), counts)
+    order = np.lexsort((rank[X.indices], row))
+    terms = X.indices[order]
+    sq = X.data[order].astype(np.float64) ** 2
+
+    csum = np.concatenate([[0.0], np.cumsum(sq)])
+    start, end = X.indptr[:-1], X.indptr[1:]
+    # norm^2 of the row from this term (inclusive) to its end
+    rest = np.repeat(csum[end], counts) - csum[:-1]
+    keep = rest >= threshold ** 2 * (1 - 1e-6)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(row[keep], minlength=X.shape[0]))])
+    return sp.csr_matrix((np.ones(keep.sum(), dtype=np.float32), terms[keep], indptr), shape=X.shape)
+
+
+def similar_pairs(A, B=None, threshold=THRESHOLD, chunk=CHUNK):
+    """(i, j, cosine) for all rows A[i], B[j] with cosine above threshold.
+    Without B, pairs within A with j < i. Rows must be L2-normalised."""
+    same = B is None
+    A = A.tocsr().astype(np.float32)
+    B = A if same else B.tocsr().astype(np.float32)
+
+    df = np.bincount(A.indices, minlength=A.shape[1])
+    if not same:
+        df += np.bincount(B.indices, minlength=A.shape[1])
+    rank = np.empty(A.shape[1], dtype=np.int64)
+    rank[np.argsort(df, kind="stable")] = np.arange(A.shape[1])
+
+    PA = _prefixes(A, rank, threshold)
+    PBt = (PA if same else _prefixes(B, rank, threshold)).T.tocsr()
+
+    out_i, out_j, out_s = [], [], []
+    for start in range(0, A.shape[0], chunk):
+        C = (PA[start:start + chunk] @ PBt).tocoo()
+        i, j = C.row + start, C.col
+        if same:
+            i, j = i[j < i], j[j < i]
+        if not len(i):
+            continue
+        scores = np.asarray(A[i].multiply(B[j]).sum(axis=1)).ravel()
+        keep = scores > threshold
+        out_i.append(i[keep])
+        out_j.append(j[keep])
+        out_s.append(scores[keep])
+
+    if not out_i:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    return np.concatenate(out_i), np.concatenate(out_j), np.concatenate(out_s)
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# -----------------------------------------------------------
+# RANDOM FOREST -> FLAT NODE ARRAYS
+# -----------------------------------------------------------
+# sklearn's predict() on a single row spends most of its time in input
+# validation, joblib dispatch and a Python loop over 100 trees. Compiling a
+# fitted forest into contiguous node arrays lets us walk every tree for every
+# row at once with a handful of NumPy gathers per depth level.
+#
+# Leaves point to themselves, so a walk that has finished simply stays put;
+# finished (tree, row) walkers are dropped each level. Per-tree outputs are summed
+# tree by tree in float64 and divided by the tree count, exactly like
+# sklearn, so predictions are bit-identical.
+
+BATCH_ROWS = 4096
+SMALL_BATCH = 64
+
+
+def compile_forest(forest):
+    """Flatten a fitted RandomForestClassifier/Regressor into plain arrays."""
+    trees = [est.tree_ for est in forest.estimators_]
+    is_classifier = hasattr(forest, "classes_")
+
+    if forest.n_outputs_ != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+    sizes = np.array([t.node_count for t in trees])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    total = int(sizes.sum())
+
+    feature = np.zeros(total, dtype=np.int32)
+    threshold = np.zeros(total, dtype=np.float64)
+    # children[2 * node + go_right], so one gather picks the next node
+    children = np.zeros((total, 2), dtype=np.int32)
+
+    if is_classifier:
+        n_classes = int(forest.n_classes_)
+        value = np.zeros((total, n_classes), dtype=np.float64)
+    else:
+        value = np.zeros(total, dtype=np.float64)
+
+    for t, off in zip(trees, offsets):
+        end = off + t.node_count
+        nodes = np.arange(off, end, dtype=np.int32)
+        leaf = t.children_left == -1
+
+        feature[off:end] = np.where(leaf, 0, t.feature)
+        threshold[off:end] = t.threshold
+        children[off:end, 0] = np.where(leaf, nodes, t.children_left + off)
+        children[off:end, 1] = np.where(leaf, nodes, t.children_right + off)
+
+        if is_classifier:
+            # same normalisation as DecisionTreeClassifier.predict_proba
+            proba = t.value[:, 0, :n_classes].copy()
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+            value[off:end] = proba
+        else:
+            value[off:end] = t.value[:, 0, 0]
+
+    arrays = {
+        "feature": feature,
+        "threshold": threshold,
+        "children": children.ravel(),
+        "value": value,
+        "roots": offsets.astype(np.int32),
+        "depth": np.array(max(t.max_depth for t in trees), dtype=np.int32),
+        "n_features": np.array(forest.n_features_in_, dtype=np.int32),
+    }
+    if is_classifier:
+        arrays["classes"] = np.asarray(forest.classes_)
+    if hasattr(forest, "feature_names_in_"):
+        arrays["feature_names"] = np.asarray(forest.feature_names_in_, dtype=str)
+    return arrays
+
+
+class CompiledForest:
+    """Drop-in predict/predict_proba over the arrays from compile_forest()."""
+
+    def __init__(self, arrays):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children = arrays["children"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.depth = int(arrays["depth"])
+        self.n_features_in_ = int(arrays["n_features"])
+
+        if "classes" in arrays:
+            self.classes_ = np.asarray(arrays["classes"])
+        if "feature_names" in arrays:
+            self.feature_names_in_ = np.asarray(arrays["feature_names"], dtype=object)
+
+    @property
+    def is_classifier(self):
+        return hasattr(self, "classes_")
+
+    def _check(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {X.shape[1]}")
+        if np.isnan(X).any():
+            raise ValueError("Input contains NaN")
+        return np.ascontiguousarray(X)
+
+    def _leaves(self, X):
+        # one (tree, row) walker per pair; a walker whose node stops changing
+        # is sitting on a leaf and drops out of the active set
+        n_rows = X.shape[0]
+        flat = X.ravel()
+        row_base = np.tile(np.arange(n_rows, dtype=np.int64) * self.n_features_in_, len(self.roots))
+
+        nodes = np.repeat(self.roots, n_rows)
+        active = np.arange(len(nodes))
+        for _ in range(self.depth + 1):
+            if not active.size:
+                break
+            cur = nodes[active]
+            go_right = flat[row_base[active] + self.feature[cur]] > self.threshold[cur]
+            nxt = self.children[2 * cur + go_right]
+            nodes[active] = nxt
+            active = active[nxt != cur]
+        return nodes.reshape(len(self.roots), n_rows)
+
+    def _accumulate(self, X):
+        out = []
+        for start in range(0, X.shape[0], BATCH_ROWS):
+            leaves = self._leaves(X[start:start + BATCH_ROWS])
+            # add tree by tree in float64 (same order as sklearn) so the
+            # result is bit-identical; np.sum could switch to pairwise summation
+            if leaves.shape[1] <= SMALL_BATCH:
+                total = np.add.accumulate(self.value[leaves], axis=0)[-1]
+            else:
+                total = np.zeros((leaves.shape[1],) + self.value.shape[1:])
+                for tree_leaves in leaves:
+                    total += self.value[tree_leaves]
+            out.append(total / len(self.roots))
+        return np.concatenate(out) if len(out) > 1 else out[0]
+
+    def predict_proba(self, X):
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._accumulate(self._check(X))
+
+    def predict(self, X):
+        X = self._check(X)
+        if self.is_classifier:
+            return self.classes_.take(np.argmax(self._accumulate(X), axis=1), axis=0)
+        return self._accumulate(X)
+
+
+# -----------------------------------------------------------
+# SAVE / LOAD (MEMORY-MAPPED)
+# -----------------------------------------------------------
+# A compiled forest is a directory of raw .npy arrays plus manifest.json.
+# Arrays are opened with mmap_mode="r", so every worker process maps the
+# same page-cache copy instead of holding its own unpickled forest.
+#
+# manifest.json: {"format": "forest", "format_version": 1, "version": <hash>,
+#                 "kind": ..., "source": ..., "arrays": {name: {...}}}
+
+FORMAT_VERSION = 1
+
+
+def compiled_path(pkl_path):
+    return os.path.splitext(pkl_path)[0] + ".forest"
+
+
+def save_compiled(arrays, path, source=None):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    digest = hashlib.sha256()
+    entries = {}
+    for name in sorted(arrays):
+        arr = np.asarray(arrays[name], order="C")
+        np.save(os.path.join(tmp, f"{name}.npy"), arr, allow_pickle=False)
+        digest.update(name.encode())
+        digest.update(arr.tobytes())
+        entries[name] = {"file": f"{name}.npy", "dtype": arr.dtype.str, "shape": list(arr.shape)}
+
+    manifest = {
+        "format": "forest",
+        "format_version": FORMAT_VERSION,
+        "version": digest.hexdigest()[:16],
+        "kind": "classifier" if "classes" in arrays else "regressor",
+        "source": source,
+        "arrays": entries,
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # swap the finished directory in so readers never see half an artifact
+    old = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(path):
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != "forest" or manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported compiled forest format")
+    return manifest
+
+
+def load_compiled(path, mmap=True):
+    manifest = read_manifest(path)
+    arrays = {
+        name: np.load(os.path.join(path, entry["file"]),
+                      mmap_mode="r" if mmap and entry["shape"] else None,
+                      allow_pickle=False)
+        for name, entry in manifest["arrays"].items()
+    }
+    forest = CompiledForest(arrays)
+    forest.version = manifest["version"]
+    return forest
+
+
+def export_forest(forest, pkl_path):
+    """Write the compiled copy next to a pickled forest."""
+    out = compiled_path(pkl_path)
+    save_compiled(compile_forest(forest), out, source=os.path.basename(pkl_path))
+    return out
+
+
+def compile_file(pkl_path):
+    import joblib
+
+    return export_forest(joblib.load(pkl_path), pkl_path)
+
+
+def load_predictor(pkl_path, mmap=True):
+    """Compiled forest if one has been built next to the pickle, else the sklearn model."""
+    path = compiled_path(pkl_path)
+    manifest = os.path.join(path, "manifest.json")
+    if os.path.exists(manifest) and os.path.getmtime(manifest) >= os.path.getmtime(pkl_path):
+        return load_compiled(path, mmap=mmap)
+
+    import joblib
+    return joblib.load(pkl_path)
+
+
+# -----------------------------------------------------------
+# COMMAND LINE: python -m utils.forest_compiler [model.pkl ...]
+# -----------------------------------------------------------
+
+FOREST_MODELS = [
+    "models/crop_model.pkl",
+    "models/water_model.pkl",
+    "models/market_model.pkl",
+]
+
+if __name__ == "__main__":
+    for pkl in sys.argv[1:] or FOREST_MODELS:
+        if not os.path.exists(pkl):
+            print(f"⚠️ {pkl} not found, skipping")
+            continue
+        print(f"✅ {pkl} -> {compile_file(pkl)}")
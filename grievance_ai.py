@@ -1,57 +1,58 @@
 import pandas as pd
-import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import random
-import time
-import os
+import atexit
+
+from utils.grievance_rules import rule_engine
+from utils.grievance_store import open_store
+from utils.grievance_writer import GrievanceWriter
+from utils.lazy_imports import lazy_init, import_module
+from utils.ticket_ids import TicketGenerator, normalize_ticket
 
 # -----------------------------------------
-# LOAD TRAINING DATA
+# LOAD THE GRIEVANCE MODEL
 # -----------------------------------------
-df = pd.read_csv("data/grievances.csv")
+# The TF-IDF vectorizer and department centroids come from the "grievance"
+# model bundle (`python -m utils.train grievance`), loaded on first use so
+# opening the grievance page does not pay for scikit-learn. Without a bundle
+# they are fitted from data/grievances.csv. The duplicate index is keyed to
+# the vectorizer, so a new bundle is picked up on the next start.
 
-vectorizer = TfidfVectorizer()
-X = vectorizer.fit_transform(df["complaint"])
+@lazy_init
+def grievance_model():
+    """(vectorizer, DepartmentCentroids)"""
+    models = import_module("utils.model_bundle").ModelRegistry().load("grievance", ["vectorizer", "centroids"])
+    if models["vectorizer"] is None or models["centroids"] is None:
+        df = pd.read_csv("data/grievances.csv")
+        return import_module("utils.grievance_classifier").fit_classifier(df["complaint"], df["department"])
+    return models["vectorizer"], models["centroids"]
 
 # -----------------------------------------
 # 1. DEPARTMENT CLASSIFICATION
 # -----------------------------------------
-def classify_department(text):
-    t = text.lower()
+# HARD KEYWORDS (always correct) and the priority keywords come from one
+# compiled rule set (see grievance_rules.py), so both are found in one scan.
 
-    # HARD KEYWORDS (always correct)
-    electricity_words = ["power", "electricity", "transformer", "street light", "voltage"]
-    water_words = ["water", "pipeline", "borewell", "drinking water", "tank"]
-    road_words = ["road", "pothole", "accident", "bridge", "damaged road"]
-    welfare_words = ["pension", "ration", "widow", "scholarship", "old age"]
-    agriculture_words = ["crop", "farmer", "insurance", "subsidy", "seeds"]
+def nearest_departments(text, k=3):
+    """[(department, confidence)] best first, from the department centroids."""
+    vectorizer, centroids = grievance_model()
+    departments, confidence = centroids.top(vectorizer.transform([text]), k)
+    return [(d, float(c)) for d, c in zip(departments[0], confidence[0])]
 
-    for w in electricity_words:
-        if w in t:
-            return "Electricity"
 
-    for w in water_words:
-        if w in t:
-            return "Water"
+def nearest_department(text):
+    # FALLBACK: most similar department centroid
+    vectorizer, centroids = grievance_model()
+    return centroids.predict(vectorizer.transform([text]))[0]
 
-    for w in road_words:
-        if w in t:
-            return "Infrastructure"
 
-    for w in welfare_words:
-        if w in t:
-            return "Social Welfare"
+def classify(text):
+    """(department, priority) of a complaint."""
+    department, priority = rule_engine().match(text)
+    return department or nearest_department(text), priority
 
-    for w in agriculture_words:
-        if w in t:
-            return "Agriculture"
 
-    # FALLBACK: machine similarity
-    vec = vectorizer.transform([text])
-    sim = cosine_similarity(vec, X)
-    index = sim.argmax()
-    return df.iloc[index]["department"]
+def classify_department(text):
+    department, _ = rule_engine().match(text)
+    return department or nearest_department(text)
 
 
 # -----------------------------------------
@@ -59,57 +60,54 @@ def classify_department(text):
 # -----------------------------------------
 
 def priority_score(text):
-    text = text.lower()
-
-    urgent_words = [
-        "no power", "power cut", "transformer",
-        "leakage", "burst", "accident", "danger",
-        "injury", "death", "light not working",
-        "water not coming", "pipeline damage"
-    ]
-
-    medium_words = [
-        "delay", "not received", "pending", "slow",
-        "not credited", "not working", "complaint"
-    ]
-
-    if any(w in text for w in urgent_words):
-        return "🔴 HIGH PRIORITY (Immediate Action Required)"
-
-    if any(w in text for w in medium_words):
-        return "🟡 MEDIUM PRIORITY (Resolve Soon)"
-
-    return "🟢 LOW PRIORITY (Normal Case)"
+    return rule_engine().match(text)[1]
 
 # -----------------------------------------
 # 3. DUPLICATE COMPLAINT DETECTION
 # -----------------------------------------
 
-def is_duplicate(text, db_path="data/grievance_db.csv"):
-    if not os.path.exists(db_path):
-        return False
-
-    db = pd.read_csv(db_path)
+# Every saved complaint is vectorised once into a persistent index (see
+# duplicate_index.py); a check reads only the postings of its own terms.
+# Complaints still queued in the writer are checked as well, so a repeat
+# submitted within the same flush window is caught.
 
-    if db.empty:
-        return False
+@lazy_init
+def duplicate_index():
+    vectorizer, _ = grievance_model()
+    return import_module("utils.duplicate_index").DuplicateIndex(open_store(), vectorizer)
 
-    vec = vectorizer.transform([text])
-    old_vec = vectorizer.transform(db["complaint"])
 
-    sim = cosine_similarity(vec, old_vec).max()
+def find_duplicates(text, department=None, since=None, k=5):
+    """[(ticket, similarity)] of earlier complaints above the duplicate threshold,
+    optionally only in one department / since a unix timestamp."""
+    index = duplicate_index()
+    vector = index.vectorizer.transform([text])
+    # queued rows first: a row leaves the queue only once it is in the index
+    queued = writer().similar(vector, department=department, since=since)
+    index.sync()        # complaints saved by other processes
+    found = dict(index.search(text, k=k, department=department, since=since, vector=vector))
+    for ticket, score in queued:
+        found.setdefault(ticket, score)
+    return sorted(found.items(), key=lambda ts: -ts[1])[:k]
 
-    if sim > 0.85:
-        return True
 
-    return False
+def is_duplicate(text):
+    return bool(find_duplicates(text, k=1))
 
 # -----------------------------------------
 # 4. TICKET ID GENERATION
 # -----------------------------------------
 
+# Time-sortable, collision-free ids (see ticket_ids.py); the node number
+# is leased from the grievance store.
+
+@lazy_init
+def ticket_generator():
+    return TicketGenerator(lease=open_store().lease_node)
+
+
 def generate_ticket():
-    return "GRV-" + str(random.randint(100000, 999999))
+    return ticket_generator().next_ticket()
 
 # -----------------------------------------
 # 5. FORWARD TO DEPARTMENT (SIMULATION)
@@ -122,43 +120,30 @@ def forward_to_department(dept):
 # 6. SAVE COMPLAINT TO DATABASE
 # -----------------------------------------
 
-def save_complaint(text, dept, priority, ticket):
-    path = "data/grievance_db.csv"
+# Submissions are committed in batches by a background thread (see
+# grievance_writer.py); everything queued is written before the process exits.
 
-    if os.path.exists(path):
-        db = pd.read_csv(path)
-    else:
-        db = pd.DataFrame(columns=["ticket", "complaint", "department", "priority", "status"])
+@lazy_init
+def writer():
+    w = GrievanceWriter(open_store(), duplicate_index())
+    atexit.register(w.close)
+    return w
 
-    new_row = {
-        "ticket": ticket,
-        "complaint": text,
-        "department": dept,
-        "priority": priority,
-        "status": "Submitted"
-    }
 
-    db = pd.concat([db, pd.DataFrame([new_row])], ignore_index=True)
-    db.to_csv(path, index=False)
+def save_complaint(text, dept, priority, ticket):
+    return writer().submit(ticket, text, dept, priority)
 
 # -----------------------------------------
 # 7. TRACK STATUS OF A COMPLAINT
 # -----------------------------------------
 
 def track_complaint(ticket):
-    path = "data/grievance_db.csv"
+    ticket = normalize_ticket(ticket)
+    row = writer().pending(ticket) or open_store().lookup(ticket)
 
-    if not os.path.exists(path):
-        return "No records found."
-
-    db = pd.read_csv(path)
-
-    match = db[db["ticket"] == ticket]
-
-    if match.empty:
+    if row is None:
         return "❌ Ticket ID not found. Please check again."
 
-    row = match.iloc[0]
     return f"""
 🧾 **Grievance Status**
 
@@ -168,16 +153,20 @@ def track_complaint(ticket):
 🔹 Status: {row['status']}
 """
 
+
+def update_status(ticket, status):
+    writer().flush()
+    return open_store().update_status(ticket, status)
+
 # -----------------------------------------
 # 8. MAIN FUNCTION CALLED BY STREAMLIT
 # -----------------------------------------
 
 def process_grievance(user_text):
     # Duplicate check
-    duplicate = is_duplicate(user_text)
+    duplicates = find_duplicates(user_text)
 
-    department = classify_department(user_text)
-    priority = priority_score(user_text)
+    department, priority = classify(user_text)
     ticket_id = generate_ticket()
 
     save_complaint(user_text, department, priority, ticket_id)
@@ -187,7 +176,8 @@ def process_grievance(user_text):
     return {
         "department": department,
         "priority": priority,
-        "duplicate": duplicate,
+        "duplicate": bool(duplicates),
+        "duplicates": duplicates,
         "ticket": ticket_id,
         "forward": forward_msg
     }
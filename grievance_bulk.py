@@ -0,0 +1,184 @@
+import argparse
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.duplicate_index import THRESHOLD, similar_pairs, write_vectors
+from utils.grievance_ai import duplicate_index, open_store, ticket_generator, grievance_model
+from utils.grievance_rules import rule_engine
+
+# -----------------------------------------------------------
+# BULK GRIEVANCE IMPORT
+# -----------------------------------------------------------
+# python -m utils.grievance_bulk backlog.csv [--column complaint] [--out tickets.csv]
+#
+# Gives every row of a call-centre backlog the same department, priority and
+# duplicate verdict process_grievance() would, but column-at-a-time:
+#   - the keyword rules (grievance_rules.py) as one regex per rule over the
+#     whole column
+#   - the TF-IDF fallback as chunked products with the department centroids
+#   - duplicates (within the file and against everything stored) from
+#     similar_pairs() over distinct vectors only
+# and stores all rows plus their duplicate-index vectors in one transaction.
+
+CHUNK = 10_000
+
+
+def _matches(lower, words):
+    return lower.str.contains("|".join(re.escape(w) for w in words), regex=True).to_numpy()
+
+
+def classify_departments(texts, vectors, chunk=CHUNK, rules=None):
+    rules = rules or rule_engine()
+    lower = texts.str.lower()
+    departments = np.select([_matches(lower, words) for _, words in rules.departments],
+                            [name for name, _ in rules.departments], default=None).astype(object)
+
+    # FALLBACK: most similar department centroid (like classify_department)
+    rest = np.flatnonzero(departments == None)  # noqa: E711
+    _, centroids = grievance_model()
+    for start in range(0, len(rest), chunk):
+        rows = rest[start:start + chunk]
+        departments[rows] = centroids.predict(vectors[rows])
+    return departments
+
+
+def priority_scores(texts, rules=None):
+    rules = rules or rule_engine()
+    lower = texts.str.lower()
+    return np.select([_matches(lower, words) for _, words in rules.priorities],
+                     [name for name, _ in rules.priorities], default=rules.default_priority).astype(object)
+
+
+def _distinct(X):
+    """Group identical rows: (group per row, first row of each group)."""
+    X.sort_indices()
+    keys = [X.indices[lo:hi].tobytes() + X.data[lo:hi].tobytes()
+            for lo, hi in zip(X.indptr[:-1], X.indptr[1:])]
+    codes, _ = pd.factorize(pd.Series(keys, dtype=object))
+    first = np.unique(codes, return_index=True)[1]
+    return codes, first
+
+
+def _best(i, j, s, size):
+    """Best j (highest score, then lowest j) for every i; -1 where none."""
+    best_j, best_s = np.full(size, -1), np.zeros(size)
+    if len(i):
+        order = np.lexsort((j, -s, i))
+        i, j, s = i[order], j[order], s[order]
+        lead = np.unique(i, return_index=True)[1]
+        best_j[i[lead]], best_s[i[lead]] = j[lead], s[lead]
+    return best_j, best_s
+
+
+def find_duplicates(vectors, tickets, history, history_tickets, threshold=THRESHOLD):
+    """(duplicate_of ticket or None, similarity) per row: the most similar
+    earlier row of the batch or stored complaint above threshold."""
+    vectors = vectors.tocsr().astype(np.float32)
+    codes, first = _distinct(vectors)
+    unique = vectors[first]
+    nonzero = np.diff(vectors.indptr) > 0
+
+    # 1. against history (distinct stored vectors, earliest ticket each)
+    _, hist_first = _distinct(history.tocsr().astype(np.float32))
+    hist_j, hist_s = _best(*similar_pairs(unique, history[hist_first], threshold), len(first))
+
+    # 2. within the batch: a repeated vector duplicates its first occurrence,
+    #    a first occurrence may duplicate an earlier distinct vector
+    batch_j, batch_s = _best(*similar_pairs(unique, None, threshold), len(first))
+    rows = np.arange(len(codes))
+    repeat = (rows != first[codes]) & nonzero
+
+    dup_of = np.full(len(codes), None, dtype=object)
+    score = np.zeros(len(codes))
+
+    earlier = batch_j[codes] >= 0
+    dup_of[earlier] = tickets[first[batch_j[codes][earlier]]]
+    score[earlier] = batch_s[codes][earlier]
+
+    dup_of[repeat] = tickets[first[codes]][repeat]
+    score[repeat] = 1.0
+
+    stored = (hist_j[codes] >= 0) & (hist_s[codes] >= score)
+    dup_of[stored] = history_tickets[hist_first[hist_j[codes][stored]]]
+    score[stored] = hist_s[codes][stored]
+    return dup_of, np.minimum(score, 1.0)
+
+
+def ingest(path, column="complaint", dry_run=False, out=None, chunk=CHUNK):
+    timings = {}
+    clock = time.perf_counter()
+
+    def lap(name):
+        nonlocal clock
+        now = time.perf_counter()
+        timings[name] = now - clock
+        clock = now
+
+    data = pd.read_csv(path, dtype=str, keep_default_na=False)
+    texts = data[column].str.strip()
+    skipped = int((texts == "").sum())
+    texts = texts[texts != ""].reset_index(drop=True)
+    lap("read")
+
+    vectorizer, _ = grievance_model()
+    vectors = vectorizer.transform(texts).tocsr()
+    lap("vectorise")
+
+    rules = rule_engine()
+    departments = classify_departments(texts, vectors, chunk, rules)
+    priorities = priority_scores(texts, rules)
+    lap("classify")
+
+    gen = ticket_generator()
+    tickets = np.array([gen.next_ticket() for _ in range(len(texts))], dtype=object)
+    history, history_tickets = duplicate_index().vectors()
+    dup_of, similarity = find_duplicates(vectors, tickets, history, history_tickets)
+    lap("duplicates")
+
+    if not dry_run:
+        created = time.time()
+        rows = [(t, text, d, p, "Submitted", created)
+                for t, text, d, p in zip(tickets, texts, departments, priorities)]
+        open_store().append_bulk(rows, extra=lambda conn, ids: write_vectors(conn, ids, vectors))
+        duplicate_index().sync()
+        lap("store")
+
+    result = pd.DataFrame({
+        "ticket": tickets, "complaint": texts, "department": departments, "priority": priorities,
+        "duplicate_of": dup_of, "similarity": np.round(similarity, 4),
+    })
+    if out:
+        result.to_csv(out, index=False)
+        lap("write report")
+
+    total = sum(timings.values())
+    print(f"{'🔎 Checked' if dry_run else '✅ Ingested'} {len(texts)} complaints in {total:.1f} s "
+          f"({len(texts) / max(total, 1e-9):,.0f} complaints/s)"
+          + (f", skipped {skipped} empty rows" if skipped else ""))
+    print("   " + " | ".join(f"{name} {secs:.2f} s" for name, secs in timings.items()))
+    print(f"   duplicates: {int((dup_of != None).sum())}")  # noqa: E711
+    for department, count in pd.Series(departments).value_counts().items():
+        print(f"   {department:<16} {count}")
+    return result
+
+
+# -----------------------------------------------------------
+# COMMAND LINE
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a CSV backlog of grievances.")
+    parser.add_argument("csv")
+    parser.add_argument("--column", default="complaint", help="column holding the complaint text")
+    parser.add_argument("--out", help="write tickets, departments and duplicates to this CSV")
+    parser.add_argument("--dry-run", action="store_true", help="classify and check, store nothing")
+    parser.add_argument("--chunk", type=int, default=CHUNK)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        parser.error(f"{args.csv} not found")
+    ingest(args.csv, args.column, args.dry_run, args.out, args.chunk)
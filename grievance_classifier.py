@@ -0,0 +1,70 @@
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+# -----------------------------------------------------------
+# DEPARTMENT FALLBACK CLASSIFIER
+# -----------------------------------------------------------
+# Complaints that match no department keyword are given the department whose
+# centroid (mean of its L2-normalised TF-IDF training rows, re-normalised) is
+# most cosine-similar. Training is one sparse product; a prediction costs one
+# product with a (departments x terms) matrix, however many rows were used
+# for training. Fitted by `python -m utils.train grievance` and served from
+# the "grievance" model bundle.
+
+CALIBRATION_ROWS = 20_000
+TEMPERATURES = np.geomspace(0.002, 1.0, 28)
+
+
+def _softmax(z):
+    e = np.exp(z - z.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class DepartmentCentroids:
+    def __init__(self, departments, centroids, temperature=TEMPERATURES[-1]):
+        self.departments = np.asarray(departments, dtype=object)
+        # one column per department, so a product with a CSR batch needs no copy
+        self.centroids = np.ascontiguousarray(np.asarray(centroids, dtype=np.float32).T)
+        self.temperature = float(temperature)
+
+    @classmethod
+    def fit(cls, X, labels, seed=0):
+        departments, codes = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+        X = normalize(sparse.csr_matrix(X))
+        members = sparse.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))),
+                                    shape=(len(departments), X.shape[0]))
+        model = cls(departments, normalize(members @ X).toarray())
+
+        # softmax temperature with the best log-likelihood on (a sample of) the training rows
+        rows = np.random.default_rng(seed).permutation(X.shape[0])[:CALIBRATION_ROWS]
+        s = model.scores(X[rows])
+        nll = [-np.log(_softmax(s / t)[np.arange(len(rows)), codes[rows]] + 1e-12).mean()
+               for t in TEMPERATURES]
+        model.temperature = float(TEMPERATURES[int(np.argmin(nll))])
+        return model
+
+    def scores(self, X):
+        """Cosine similarity of every row with every department centroid."""
+        # float32 query: a float64 one would upcast a copy of every centroid
+        return np.asarray(X.astype(np.float32, copy=False) @ self.centroids)
+
+    def top(self, X, k=3):
+        """(departments, confidences), both (rows x k), best first. The
+        confidences are a softmax of the centroid similarities, with the
+        temperature calibrated on the training rows."""
+        p = _softmax(self.scores(X) / self.temperature)
+        k = min(k, len(self.departments))
+        order = np.argsort(-p, axis=1, kind="stable")[:, :k]
+        return self.departments[order], np.take_along_axis(p, order, axis=1)
+
+    def predict(self, X):
+        return self.departments[self.scores(X).argmax(axis=1)]
+
+
+def fit_classifier(texts, labels, config=None):
+    """(fitted TfidfVectorizer, DepartmentCentroids) for labelled complaints."""
+    vectorizer = TfidfVectorizer(**(config or {}))
+    X = vectorizer.fit_transform(texts)
+    return vectorizer, DepartmentCentroids.fit(X, labels)
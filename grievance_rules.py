@@ -0,0 +1,155 @@
+import json
+import os
+import sys
+import threading
+import time
+
+from utils.keyword_matcher import KeywordMatcher
+
+# -----------------------------------------------------------
+# GRIEVANCE RULES (DEPARTMENT + PRIORITY)
+# -----------------------------------------------------------
+# The keyword rules live in data/grievance_rules.json when it exists (write
+# the built-in defaults there with `python -m utils.grievance_rules --init`
+# and edit them), else in DEFAULT_RULES below:
+#
+#   {"departments": [{"name": "Electricity", "keywords": ["power", ...]}, ...],
+#    "priorities":  [{"name": "🔴 HIGH PRIORITY ...", "keywords": [...]}, ...],
+#    "default_priority": "🟢 LOW PRIORITY (Normal Case)"}
+#
+# Earlier entries win, within departments and within priorities. All
+# keywords are compiled into one KeywordMatcher, so a complaint is scanned
+# once for both answers however many keywords there are. The file is checked
+# for changes at most every RELOAD_INTERVAL seconds and recompiled when it
+# changes; a broken file is reported and the previous rules stay in use.
+
+RULES_PATH = "data/grievance_rules.json"
+RELOAD_INTERVAL = 2.0
+
+HIGH_PRIORITY = "🔴 HIGH PRIORITY (Immediate Action Required)"
+MEDIUM_PRIORITY = "🟡 MEDIUM PRIORITY (Resolve Soon)"
+LOW_PRIORITY = "🟢 LOW PRIORITY (Normal Case)"
+
+DEFAULT_RULES = {
+    "departments": [
+        {"name": "Electricity", "keywords": ["power", "electricity", "transformer", "street light", "voltage"]},
+        {"name": "Water", "keywords": ["water", "pipeline", "borewell", "drinking water", "tank"]},
+        {"name": "Infrastructure", "keywords": ["road", "pothole", "accident", "bridge", "damaged road"]},
+        {"name": "Social Welfare", "keywords": ["pension", "ration", "widow", "scholarship", "old age"]},
+        {"name": "Agriculture", "keywords": ["crop", "farmer", "insurance", "subsidy", "seeds"]},
+    ],
+    "priorities": [
+        {"name": HIGH_PRIORITY, "keywords": [
+            "no power", "power cut", "transformer",
+            "leakage", "burst", "accident", "danger",
+            "injury", "death", "light not working",
+            "water not coming", "pipeline damage"]},
+        {"name": MEDIUM_PRIORITY, "keywords": [
+            "delay", "not received", "pending", "slow",
+            "not credited", "not working", "complaint"]},
+    ],
+    "default_priority": LOW_PRIORITY,
+}
+
+
+def _entries(rules, group):
+    entries = rules.get(group, [])
+    if not isinstance(entries, list):
+        raise ValueError(f"'{group}' must be a list")
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get("name"), str) \
+                or not isinstance(entry.get("keywords"), list):
+            raise ValueError(f"every entry of '{group}' needs a name and a keywords list")
+        if not all(isinstance(k, str) and k.strip() for k in entry["keywords"]):
+            raise ValueError(f"'{entry['name']}' has an empty or non-text keyword")
+    return entries
+
+
+class RuleEngine:
+    def __init__(self, rules=DEFAULT_RULES):
+        self.departments = [(e["name"], [k.lower() for k in e["keywords"]])
+                            for e in _entries(rules, "departments")]
+        self.priorities = [(e["name"], [k.lower() for k in e["keywords"]])
+                           for e in _entries(rules, "priorities")]
+        self.default_priority = rules.get("default_priority", LOW_PRIORITY)
+
+        keywords = []
+        for rank, (name, words) in enumerate(self.departments):
+            keywords += [(w, (0, rank, name)) for w in words]
+        for rank, (name, words) in enumerate(self.priorities):
+            keywords += [(w, (1, rank, name)) for w in words]
+        self.matcher = KeywordMatcher(keywords)
+
+    def match(self, text):
+        """(department or None, priority) of a complaint, from one scan."""
+        best = [None, None]
+        for group, rank, name in self.matcher.labels(text.lower()):
+            if best[group] is None or rank < best[group][0]:
+                best[group] = (rank, name)
+        department = best[0][1] if best[0] else None
+        priority = best[1][1] if best[1] else self.default_priority
+        return department, priority
+
+
+def load_rules(path=RULES_PATH):
+    if not os.path.exists(path):
+        return RuleEngine(DEFAULT_RULES)
+    with open(path, encoding="utf-8") as f:
+        return RuleEngine(json.load(f))
+
+
+# -----------------------------------------
+# PROCESS-WIDE, RELOADED ON CHANGE
+# -----------------------------------------
+
+_state = {"engine": None, "stamp": None, "checked": 0.0}
+_lock = threading.Lock()
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except FileNotFoundError:
+        return None
+
+
+def rule_engine(path=RULES_PATH):
+    """Current rules; recompiled when the rules file has changed."""
+    now = time.monotonic()
+    if _state["engine"] is not None and now - _state["checked"] < RELOAD_INTERVAL:
+        return _state["engine"]
+
+    with _lock:
+        stamp = _stamp(path)
+        if _state["engine"] is None or stamp != _state["stamp"]:
+            try:
+                _state["engine"] = load_rules(path)
+            except (ValueError, OSError) as e:
+                print(f"⚠️ Could not load {path}, keeping the previous rules: {e}")
+                if _state["engine"] is None:
+                    _state["engine"] = RuleEngine(DEFAULT_RULES)
+            _state["stamp"] = stamp
+        _state["checked"] = now
+        return _state["engine"]
+
+
+# -----------------------------------------------------------
+# COMMAND LINE: python -m utils.grievance_rules [--init]
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    if "--init" in sys.argv:
+        if os.path.exists(RULES_PATH):
+            sys.exit(f"{RULES_PATH} already exists")
+        os.makedirs(os.path.dirname(RULES_PATH), exist_ok=True)
+        with open(RULES_PATH, "w", encoding="utf-8") as f:
+            json.dump(DEFAULT_RULES, f, indent=2, ensure_ascii=False)
+        print(f"✅ Wrote the default rules to {RULES_PATH}")
+
+    engine = load_rules()
+    print(f"{len(engine.departments)} departments, {len(engine.priorities)} priority levels, "
+          f"{engine.matcher.size} keywords")
+    for text in sys.argv[1:]:
+        if text != "--init":
+            print(f"{text!r}: {engine.match(text)}")
@@ -0,0 +1,250 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from utils.ticket_ids import NODE_BITS, parse_ticket
+
+# -----------------------------------------------------------
+# GRIEVANCE STORE (SQLITE)
+# -----------------------------------------------------------
+# Complaints live in one SQLite database in WAL mode: a submission is a
+# single-row INSERT, tracking a ticket is an index lookup, and readers never
+# block the writer. SQLite serialises writers itself, so two submissions at
+# once can no longer overwrite each other the way the CSV rewrite could.
+#
+# The old data/grievance_db.csv is imported once, the first time the store
+# is opened, and left in place.
+#
+# Tickets issued by ticket_ids.py carry a unique integer id (ticket_id,
+# unique index); they are looked up by it. Older tickets are looked up by
+# their text. The node numbers in those ids are leased to processes through
+# the ticket_nodes table (see lease_node).
+
+DB_PATH = "data/grievance.db"
+CSV_PATH = "data/grievance_db.csv"
+COLUMNS = ["ticket", "complaint", "department", "priority", "status", "created"]
+BUSY_TIMEOUT_MS = 10000
+NODE_LEASE_SECONDS = 600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS complaints (
+    id         INTEGER PRIMARY KEY,
+    ticket     TEXT NOT NULL,
+    ticket_id  INTEGER,
+    complaint  TEXT NOT NULL,
+    department TEXT,
+    priority   TEXT,
+    status     TEXT NOT NULL DEFAULT 'Submitted',
+    created    REAL
+);
+CREATE INDEX IF NOT EXISTS complaints_ticket ON complaints (ticket);
+CREATE INDEX IF NOT EXISTS complaints_department ON complaints (department, status);
+CREATE INDEX IF NOT EXISTS complaints_status ON complaints (status);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS ticket_nodes (
+    node    INTEGER PRIMARY KEY,
+    holder  TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+# after the ticket_id column is added to databases created without it
+TICKET_ID_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS complaints_ticket_id ON complaints (ticket_id)"
+
+
+def _by_ticket(ticket):
+    """WHERE clause and argument that find a ticket."""
+    ticket_id = parse_ticket(ticket)
+    if ticket_id is not None:
+        return "ticket_id = ?", ticket_id
+    return "ticket = ?", ticket.strip()
+
+
+class GrievanceStore:
+    """One connection per thread; safe to share across Streamlit sessions."""
+
+    def __init__(self, path=DB_PATH, csv_path=CSV_PATH):
+        self.path = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        conn = self.conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.executescript(SCHEMA)
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(complaints)")}
+            if "ticket_id" not in columns:
+                conn.execute("ALTER TABLE complaints ADD COLUMN ticket_id INTEGER")
+            conn.execute(TICKET_ID_INDEX)
+        if csv_path:
+            self.migrate_csv(csv_path)
+
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # -----------------------------------------
+    # ONE-TIME CSV MIGRATION
+    # -----------------------------------------
+
+    def migrate_csv(self, csv_path=CSV_PATH):
+        """Import the legacy CSV once; returns the number of rows imported."""
+        conn = self.conn()
+        if not os.path.exists(csv_path):
+            return 0
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_csv'").fetchone():
+            return 0
+
+        db = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        rows = [
+            (r["ticket"], parse_ticket(r["ticket"]), r["complaint"], r.get("department"),
+             r.get("priority"), r.get("status") or "Submitted", None)
+            for r in db.to_dict("records")
+        ]
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")      # take the write lock before re-checking
+            # another process may have imported it while we read the CSV
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_csv'").fetchone():
+                return 0
+            conn.executemany(
+                "INSERT INTO complaints (ticket, ticket_id, complaint, department, priority, status, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_csv', ?)",
+                         (f"{os.path.abspath(csv_path)} ({len(rows)} rows)",))
+        print(f"✅ Imported {len(rows)} complaints from {csv_path} into {self.path}")
+        return len(rows)
+
+    # -----------------------------------------
+    # WRITES
+    # -----------------------------------------
+
+    def append(self, ticket, complaint, department, priority, status="Submitted", created=None):
+        """Store one complaint; returns its row id."""
+        return self.append_many([(ticket, complaint, department, priority, status, created)])[0]
+
+    def append_many(self, rows):
+        """Store (ticket, complaint, department, priority[, status[, created]]) rows
+        in one transaction; returns their row ids in order."""
+        now = time.time()
+        conn = self.conn()
+        ids = []
+        with conn:
+            for row in rows:
+                ticket, complaint, department, priority, *rest = row
+                status = rest[0] if rest and rest[0] else "Submitted"
+                created = rest[1] if len(rest) > 1 and rest[1] is not None else now
+                cur = conn.execute(
+                    "INSERT INTO complaints (ticket, ticket_id, complaint, department, priority, status, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (ticket, parse_ticket(ticket), complaint, department, priority, status, created))
+                ids.append(cur.lastrowid)
+        return ids
+
+    def append_bulk(self, rows, extra=None):
+        """Store (ticket, complaint, department, priority, status, created) rows
+        in one transaction under consecutive row ids, which are returned.
+        extra(conn, ids) runs inside the same transaction."""
+        rows = list(rows)
+        conn = self.conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")      # take the write lock before reading MAX(id)
+            first = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM complaints").fetchone()[0]
+            ids = range(first, first + len(rows))
+            conn.executemany(
+                "INSERT INTO complaints (id, ticket, ticket_id, complaint, department, priority, status, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((i, r[0], parse_ticket(r[0]), *r[1:]) for i, r in zip(ids, rows)))
+            if extra is not None:
+                extra(conn, ids)
+        return ids
+
+    def update_status(self, ticket, status):
+        """Set the status of a ticket; False if there is no such ticket."""
+        where, arg = _by_ticket(ticket)
+        conn = self.conn()
+        with conn:
+            cur = conn.execute(
+                "UPDATE complaints SET status = ? WHERE id = "
+                f"(SELECT id FROM complaints WHERE {where} ORDER BY id LIMIT 1)",
+                (status, arg))
+        return cur.rowcount > 0
+
+    def lease_node(self, holder, node=None, ttl=NODE_LEASE_SECONDS):
+        """(node, expires): a ticket_ids node number leased to `holder` until
+        `expires` (unix time). Renews `node` if `holder` still holds it, else
+        leases the lowest node that is free or whose lease has expired."""
+        now = time.time()
+        conn = self.conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if node is not None:
+                cur = conn.execute("UPDATE ticket_nodes SET expires = ? WHERE node = ? AND holder = ?",
+                                   (now + ttl, node, holder))
+                if cur.rowcount:
+                    return node, now + ttl
+
+            taken = {r[0] for r in conn.execute("SELECT node FROM ticket_nodes WHERE expires > ?", (now,))}
+            free = next((n for n in range(1 << NODE_BITS) if n not in taken), None)
+            if free is None:
+                raise RuntimeError(f"All {1 << NODE_BITS} ticket nodes are leased")
+            conn.execute("INSERT OR REPLACE INTO ticket_nodes (node, holder, expires) VALUES (?, ?, ?)",
+                         (free, holder, now + ttl))
+            return free, now + ttl
+
+    # -----------------------------------------
+    # READS
+    # -----------------------------------------
+
+    def lookup(self, ticket):
+        """The complaint stored under a ticket as a dict, or None."""
+        where, arg = _by_ticket(ticket)
+        row = self.conn().execute(
+            f"SELECT id, {', '.join(COLUMNS)} FROM complaints WHERE {where} ORDER BY id LIMIT 1",
+            (arg,)).fetchone()
+        return dict(row) if row else None
+
+    def complaints(self, department=None, status=None, since=None):
+        """All matching complaints, oldest first, as a DataFrame."""
+        where, args = [], []
+        for column, value in (("department", department), ("status", status)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        if since is not None:
+            where.append("created >= ?")
+            args.append(since)
+        sql = f"SELECT id, {', '.join(COLUMNS)} FROM complaints"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return pd.read_sql_query(sql + " ORDER BY id", self.conn(), params=args)
+
+    def count(self):
+        return self.conn().execute("SELECT COUNT(*) FROM complaints").fetchone()[0]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path=DB_PATH, csv_path=CSV_PATH):
+    """Process-wide store for a database file (created and migrated on first use)."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = GrievanceStore(path, csv_path)
+        return _stores[key]
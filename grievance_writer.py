@@ -0,0 +1,199 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from utils.duplicate_index import THRESHOLD
+
+# -----------------------------------------------------------
+# GROUP-COMMIT WRITER FOR GRIEVANCES
+# -----------------------------------------------------------
+# Submissions are put on a queue and the request returns its ticket right
+# away. One background thread takes whatever has queued up (at most
+# MAX_BATCH rows, waiting at most FLUSH_INTERVAL for more) and stores it in a
+# single transaction, then adds the rows to the duplicate index. A burst of
+# N submissions therefore costs a handful of commits instead of N. Queued
+# rows keep their TF-IDF vector, so similar() can check a new complaint
+# against them before they reach the index.
+#
+# Rows are written in submission order. close() (registered with atexit by
+# grievance_ai) stops accepting rows and waits up to CLOSE_TIMEOUT for
+# everything queued to be committed. A commit that fails because the
+# database is locked or busy is retried; on any other error the batch is
+# stored row by row and the rows that still fail are appended to
+# DEAD_LETTER_PATH instead of blocking the rows behind them.
+
+FLUSH_INTERVAL = 0.05
+MAX_BATCH = 1024
+RETRY_DELAY = 0.5
+CLOSE_TIMEOUT = 10.0
+DEAD_LETTER_PATH = "data/grievance_dead_letter.jsonl"
+COLUMNS = ["ticket", "complaint", "department", "priority", "status", "created"]
+
+
+def _transient(e):
+    return isinstance(e, sqlite3.OperationalError) and any(w in str(e).lower() for w in ("locked", "busy"))
+
+
+class GrievanceWriter:
+    def __init__(self, store, index=None, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH,
+                 dead_letter=DEAD_LETTER_PATH):
+        self.store = store
+        self.index = index
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.dead_letter = dead_letter
+
+        self._queue = queue.Queue()
+        self._pending = {}              # ticket -> (row, vector), until committed
+        self._cond = threading.Condition()
+        self._submitted = 0
+        self._committed = 0
+        self._closed = False
+        self.stats = {"rows": 0, "commits": 0, "retries": 0, "failed": 0}
+
+        self._thread = threading.Thread(target=self._run, name="grievance-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, ticket, complaint, department, priority, created=None, vector=None):
+        """Queue one complaint; returns its ticket without waiting for the disk.
+        `vector` may be passed when the caller has already transformed the text."""
+        row = (ticket, complaint, department, priority, "Submitted",
+               time.time() if created is None else created)
+        if vector is None and self.index is not None:
+            vector = self.index.vectorizer.transform([complaint])
+        item = (row, None if vector is None else sp.csr_matrix(vector, dtype=np.float32))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Grievance writer is closed")
+            self._pending[ticket] = item
+            self._submitted += 1
+            self._queue.put(item)
+        return ticket
+
+    def pending(self, ticket):
+        """A submitted complaint that is not committed yet, as a dict, or None."""
+        item = self._pending.get(ticket)
+        if item is None:
+            return None
+        return dict(zip(COLUMNS, item[0]))
+
+    def similar(self, vector, threshold=THRESHOLD, department=None, since=None):
+        """[(ticket, score)] of queued complaints above threshold, like
+        DuplicateIndex.search() for the rows it has not received yet."""
+        with self._cond:
+            items = [item for item in self._pending.values() if item[1] is not None]
+        if department is not None:
+            items = [item for item in items if item[0][2] == department]
+        if since is not None:
+            items = [item for item in items if item[0][5] >= since]
+        q = sp.csr_matrix(vector, dtype=np.float32)
+        if not items or not q.nnz:
+            return []
+        scores = (sp.vstack([item[1] for item in items], format="csr") @ q.T).toarray().ravel()
+        return [(item[0][0], round(float(min(s, 1.0)), 4))
+                for item, s in zip(items, scores) if s > threshold]
+
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far is committed."""
+        with self._cond:
+            target = self._submitted
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Stop accepting rows and commit everything still queued (waits at
+        most `timeout` seconds, None for no limit)."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"⚠️ Grievance writer closed with {len(self._pending)} complaints not yet stored")
+
+    # -----------------------------------------
+    # BACKGROUND THREAD
+    # -----------------------------------------
+
+    def _take(self):
+        """Block for one row, then collect more for up to flush_interval."""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch, deadline = [first], time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            try:
+                row = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if row is None:
+                return batch, True
+            batch.append(row)
+        return batch, False
+
+    def _store(self, rows):
+        """Row ids of `rows`, None for a row that could not be stored."""
+        while True:
+            try:
+                return self.store.append_many(rows)
+            except Exception as e:
+                if not _transient(e):
+                    error = e
+                    break
+                self.stats["retries"] += 1
+                print(f"⚠️ Could not store {len(rows)} complaints, retrying: {e}")
+                time.sleep(RETRY_DELAY)
+
+        if len(rows) > 1:
+            # set aside only the rows that fail on their own
+            return [self._store([row])[0] for row in rows]
+        self._dead_letter(rows[0], error)
+        return [None]
+
+    def _dead_letter(self, row, error):
+        self.stats["failed"] += 1
+        print(f"❌ Could not store complaint {row[0]}, moved to {self.dead_letter}: {error}")
+        try:
+            os.makedirs(os.path.dirname(self.dead_letter) or ".", exist_ok=True)
+            with open(self.dead_letter, "a", encoding="utf-8") as f:
+                f.write(json.dumps({**dict(zip(COLUMNS, row)), "error": str(error)}, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write {self.dead_letter}: {e}")
+
+    def _commit(self, batch):
+        ids = self._store([row for row, _ in batch])
+        stored = [(i, item) for i, item in zip(ids, batch) if i is not None]
+
+        if self.index is not None and stored:
+            try:
+                vectors = None
+                if all(vec is not None for _, (_, vec) in stored):
+                    vectors = sp.vstack([vec for _, (_, vec) in stored], format="csr")
+                self.index.add_many([(i, r[1], r[0], r[2], r[5]) for i, (r, _) in stored], vectors)
+            except Exception as e:
+                # rows are safe in the store; the index catches up on its next sync()
+                print(f"⚠️ Could not index {len(stored)} complaints: {e}")
+
+        with self._cond:
+            for item in batch:
+                if self._pending.get(item[0][0]) is item:
+                    del self._pending[item[0][0]]
+            self._committed += len(batch)
+            self.stats["rows"] += len(stored)
+            self.stats["commits"] += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        # close() enqueues its marker under the same lock as submit(), so
+        # nothing can be queued behind it
+        done = False
+        while not done:
+            batch, done = self._take()
+            if batch:
+                self._commit(batch)
@@ -0,0 +1,91 @@
+from collections import deque
+
+# -----------------------------------------------------------
+# MULTI-KEYWORD MATCHER (AHO-CORASICK)
+# -----------------------------------------------------------
+# All keywords are compiled into one automaton, so a message is scanned once
+# no matter how many keywords there are. Matching is plain substring
+# matching, exactly like `keyword in text` for every keyword.
+#
+#   matcher = KeywordMatcher([("paddy", ("crop", "paddy")), ("వరి", ("crop", "paddy"))])
+#   matcher.labels("paddy fertilizer")   -> {("crop", "paddy")}
+
+
+class KeywordMatcher:
+    def __init__(self, keywords=()):
+        """`keywords`: iterable of (keyword, label); one label may have many keywords."""
+        self._goto = [{}]
+        self._out = [()]
+        self._fail = [0]
+        self._alphabet = set()
+        self.size = 0
+        for keyword, label in keywords:
+            self.add(keyword, label)
+        self.build()
+
+    def add(self, keyword, label):
+        if not keyword:
+            raise ValueError("Empty keyword")
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._out.append(())
+            state = nxt
+        if label not in self._out[state]:
+            self._out[state] += (label,)
+        self._alphabet.update(keyword)
+        self.size += 1
+
+    def build(self):
+        """Compute failure links (call again after add())."""
+        self._fail = [0] * len(self._goto)
+        outputs = [tuple(o) for o in self._out]
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                fail = self._goto[f].get(ch, 0)
+                self._fail[nxt] = fail if fail != nxt else 0
+                # a state also matches everything its failure state matches
+                outputs[nxt] += tuple(l for l in outputs[self._fail[nxt]] if l not in outputs[nxt])
+        self._matches = outputs
+        return self
+
+    def iter_matches(self, text):
+        """(end position, label) for every keyword occurrence, in text order."""
+        goto, fail, out, alphabet = self._goto, self._fail, self._matches, self._alphabet
+        state = 0
+        for i, ch in enumerate(text):
+            if ch not in alphabet:
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for label in out[state]:
+                yield i + 1, label
+
+    def labels(self, text):
+        """Set of labels whose keywords occur in text."""
+        goto, fail, out, alphabet = self._goto, self._fail, self._matches, self._alphabet
+        found = set()
+        state = 0
+        for ch in text:
+            if ch not in alphabet:
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
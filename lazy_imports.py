@@ -0,0 +1,138 @@
+import importlib
+import subprocess
+import sys
+import threading
+import time
+from functools import wraps
+
+# -----------------------------------------------------------
+# LAZY IMPORT LAYER
+# -----------------------------------------------------------
+# Heavy dependencies (TensorFlow, pdfplumber, scikit-learn) and module-level
+# initialisers (PDF parsing, TF-IDF fitting) are only paid for by the route
+# that actually uses them. Every deferred import / initialiser records how
+# long it took so cold start can be broken down per module.
+
+timings = {}
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def import_module(name):
+    if name in sys.modules:
+        return sys.modules[name]
+
+    with _lock:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        timings.setdefault(f"import {name}", time.perf_counter() - start)
+    return module
+
+
+def lazy_module(name):
+    return LazyModule(name)
+
+
+def lazy_init(func):
+    """Run an initialiser once, on first call, and cache its result."""
+    result = []
+
+    @wraps(func)
+    def wrapper():
+        if not result:
+            with _lock:
+                if not result:
+                    start = time.perf_counter()
+                    result.append(func())
+                    timings[f"init {func.__module__}.{func.__name__}"] = time.perf_counter() - start
+        return result[0]
+
+    wrapper.reset = result.clear
+    return wrapper
+
+
+def timing_report():
+    lines = [f"{name:<55} {secs * 1000:10.1f} ms"
+             for name, secs in sorted(timings.items(), key=lambda kv: -kv[1])]
+    return "\n".join(lines) if lines else "No deferred imports have run yet."
+
+
+# -----------------------------------------------------------
+# COLD START PROFILE (--profile-startup)
+# -----------------------------------------------------------
+
+STARTUP_MODULES = [
+    "streamlit",
+    "numpy",
+    "pandas",
+    "joblib",
+    "PIL.Image",
+    "sklearn.feature_extraction.text",
+    "pdfplumber",
+    "tensorflow",
+    "utils.lazy_imports",
+    "utils.chatbot",
+    "utils.grievance_ai",
+]
+
+
+def profile_import(name, top=5):
+    """Import `name` in a fresh interpreter and parse `-X importtime` output."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {name}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"module": name, "error": proc.stderr.strip().splitlines()[-1]}
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, mod = line[len("import time:"):].split("|")
+        rows.append((mod.strip(), int(self_us), int(cumulative_us)))
+
+    total = max((cum for _, _, cum in rows), default=0)
+    heaviest = sorted(rows, key=lambda r: -r[1])[:top]
+    return {"module": name, "total_ms": total / 1000,
+            "heaviest": [(mod, self_us / 1000) for mod, self_us, _ in heaviest]}
+
+
+def profile_startup(modules=None):
+    report = []
+    for name in modules or STARTUP_MODULES:
+        res = profile_import(name)
+        if "error" in res:
+            report.append(f"{name:<40} FAILED  ({res['error']})")
+            continue
+        report.append(f"{name:<40} {res['total_ms']:10.1f} ms")
+        for mod, ms in res["heaviest"]:
+            report.append(f"    {mod:<36} {ms:10.1f} ms self")
+    return "\n".join(report)
+
+
+if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        extra = [a for a in sys.argv[1:] if not a.startswith("--")]
+        print(profile_startup(extra or None))
+    else:
+        print("Usage: python -m utils.lazy_imports --profile-startup [module ...]")
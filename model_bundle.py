@@ -0,0 +1,322 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import joblib
+
+from utils.forest_compiler import compile_forest, load_compiled, load_predictor, save_compiled
+from utils.pest_runtime import export_keras, load_pest_model
+
+# -----------------------------------------------------------
+# VERSIONED MODEL BUNDLES
+# -----------------------------------------------------------
+# Every training run writes a self-contained bundle directory:
+#
+#   models/bundles/<task>/<version>/manifest.json
+#   models/bundles/<task>/<version>/<part files>
+#   models/bundles/<task>/CURRENT          <- active version
+#
+# <version> is a hash of the bundle's content, so two tasks can never
+# overwrite each other's encoders. CURRENT is replaced atomically; a running
+# app picks the new version up on its next request without a restart and
+# only loads the parts a page asks for.
+
+BUNDLE_ROOT = "models/bundles"
+KEEP_VERSIONS = 3
+LEGACY = "legacy"
+
+# Flat files in models/ from before bundles existed
+LEGACY_PARTS = {
+    "crop": {
+        "model": "models/crop_model.pkl",
+        "crop_encoder": "models/crop_encoder.pkl",
+        "soil_encoder": "models/soil_encoder.pkl",
+    },
+    "water": {
+        "model": "models/water_model.pkl",
+        "district_encoder": "models/water_encoder.pkl",
+    },
+    "market": {
+        "model": "models/market_model.pkl",
+        "crop_encoder": "models/crop_encoder.pkl",
+    },
+    "pest": {
+        "model": "models/pest_model.h5",
+    },
+}
+
+
+# -----------------------------------------
+# HASHING
+# -----------------------------------------
+
+def file_hash(path, chunk=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def tree_hash(folder):
+    """Cheap fingerprint of a directory tree (names, sizes, mtimes)."""
+    h = hashlib.sha256()
+    for base, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            st = os.stat(os.path.join(base, name))
+            rel = os.path.relpath(os.path.join(base, name), folder)
+            h.update(f"{rel}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def _content_hash(folder):
+    h = hashlib.sha256()
+    for base, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(base, name)
+            h.update(os.path.relpath(path, folder).encode())
+            h.update(file_hash(path).encode())
+    return h.hexdigest()
+
+
+# -----------------------------------------
+# WRITING
+# -----------------------------------------
+
+def _is_forest(obj):
+    return hasattr(obj, "estimators_") and hasattr(obj, "n_outputs_")
+
+
+def _is_keras(obj):
+    return type(obj).__module__.startswith(("keras", "tensorflow"))
+
+
+def _save_part(folder, name, obj):
+    if _is_forest(obj):
+        # pickle for retraining/inspection, compiled copy for serving
+        joblib.dump(obj, os.path.join(folder, f"{name}.pkl"))
+        save_compiled(compile_forest(obj), os.path.join(folder, f"{name}.forest"), source=f"{name}.pkl")
+        return {"type": "forest", "file": f"{name}.forest", "pickle": f"{name}.pkl"}
+
+    if _is_keras(obj):
+        # .h5 for Keras, exported arrays for the TensorFlow-free runtime
+        obj.save(os.path.join(folder, f"{name}.h5"))
+        export_keras(obj, os.path.join(folder, f"{name}.cnn"))
+        return {"type": "keras", "file": f"{name}.h5", "numpy": f"{name}.cnn"}
+
+    if isinstance(obj, (list, dict, str, int, float)):
+        with open(os.path.join(folder, f"{name}.json"), "w") as f:
+            json.dump(obj, f, indent=2)
+        return {"type": "json", "file": f"{name}.json"}
+
+    joblib.dump(obj, os.path.join(folder, f"{name}.pkl"))
+    return {"type": "joblib", "file": f"{name}.pkl"}
+
+
+def _atomic_write(path, text):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _publish(task, tmp, manifest, root):
+    """Name the bundle built in `tmp` after its content and make it CURRENT."""
+    task_dir = os.path.join(root, task)
+    try:
+        manifest["version"] = version = _content_hash(tmp)[:16]
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        final = os.path.join(task_dir, version)
+        if os.path.exists(final):
+            shutil.rmtree(tmp)      # identical bundle already published
+        else:
+            os.replace(tmp, final)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    _atomic_write(os.path.join(task_dir, "CURRENT"), version)
+    prune_bundles(task, root=root)
+    return manifest
+
+
+def write_bundle(task, parts, features=None, data_hash=None, config=None, root=BUNDLE_ROOT):
+    """Save `parts` ({name: object}) as a new bundle and make it CURRENT."""
+    task_dir = os.path.join(root, task)
+    os.makedirs(task_dir, exist_ok=True)
+
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=task_dir)
+    try:
+        entries = {name: _save_part(tmp, name, obj) for name, obj in parts.items()}
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    manifest = {
+        "task": task,
+        "version": None,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "features": list(features) if features is not None else None,
+        "data_hash": data_hash,
+        "config": config or {},
+        "parts": entries,
+    }
+    return _publish(task, tmp, manifest, root)
+
+
+def extend_bundle(task, add, root=BUNDLE_ROOT):
+    """Publish a new version of the CURRENT bundle with extra files:
+    add(folder) writes them into a copy of it. Published bundles are never
+    changed in place; the new one keeps the data hash and config, so
+    training does not consider it stale."""
+    manifest = read_manifest(task, root=root)
+    if manifest is None:
+        raise FileNotFoundError(f"No {task} bundle to extend")
+
+    task_dir = os.path.join(root, task)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=task_dir)
+    try:
+        shutil.copytree(os.path.join(task_dir, manifest["version"]), tmp, dirs_exist_ok=True)
+        os.remove(os.path.join(tmp, "manifest.json"))
+        add(tmp)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    manifest = {**manifest, "parent": manifest["version"], "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    return _publish(task, tmp, manifest, root)
+
+
+def prune_bundles(task, keep=KEEP_VERSIONS, root=BUNDLE_ROOT):
+    task_dir = os.path.join(root, task)
+    current = current_version(task, root)
+    versions = sorted(
+        (d for d in os.listdir(task_dir)
+         if not d.startswith(".") and os.path.isdir(os.path.join(task_dir, d))),
+        key=lambda d: os.path.getmtime(os.path.join(task_dir, d)),
+        reverse=True,
+    )
+    for old in [v for v in versions if v != current][max(keep - 1, 0):]:
+        shutil.rmtree(os.path.join(task_dir, old), ignore_errors=True)
+
+
+# -----------------------------------------
+# READING
+# -----------------------------------------
+
+def current_version(task, root=BUNDLE_ROOT):
+    try:
+        with open(os.path.join(root, task, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(task, version=None, root=BUNDLE_ROOT):
+    version = version or current_version(task, root)
+    if version is None:
+        return None
+    with open(os.path.join(root, task, version, "manifest.json")) as f:
+        return json.load(f)
+
+
+def part_path(task, name, version=None, root=BUNDLE_ROOT):
+    manifest = read_manifest(task, version, root)
+    if manifest is None:
+        return LEGACY_PARTS.get(task, {}).get(name)
+    entry = manifest["parts"][name]
+    return os.path.join(root, task, manifest["version"], entry.get("pickle", entry["file"]))
+
+
+def _load_legacy(task, name):
+    path = LEGACY_PARTS.get(task, {}).get(name)
+    if path is None:
+        return None
+    if path.endswith(".h5"):
+        return load_pest_model(path)
+    if name == "model":
+        return load_predictor(path)
+    return joblib.load(path)
+
+
+def load_part(task, name, version, root=BUNDLE_ROOT):
+    if version == LEGACY:
+        return _load_legacy(task, name)
+
+    manifest = read_manifest(task, version, root)
+    entry = manifest["parts"].get(name)
+    if entry is None:
+        return None
+
+    path = os.path.join(root, task, version, entry["file"])
+    kind = entry["type"]
+    if kind == "forest":
+        return load_compiled(path)
+    if kind == "keras":
+        return load_pest_model(path)
+    if kind == "json":
+        with open(path) as f:
+            return json.load(f)
+    return joblib.load(path)
+
+
+def forest_pickles(tasks=("crop", "water", "market"), root=BUNDLE_ROOT):
+    """Pickled forests of the active bundles (used by the benchmarks)."""
+    return [p for p in (part_path(t, "model", root=root) for t in tasks) if p and os.path.exists(p)]
+
+
+# -----------------------------------------
+# PROCESS-WIDE REGISTRY
+# -----------------------------------------
+
+_MISSING = object()
+
+
+class ModelRegistry:
+    """Loads bundle parts on first use and swaps to a new CURRENT version
+    on the next request after it is published."""
+
+    def __init__(self, root=BUNDLE_ROOT):
+        self.root = root
+        self._parts = {}
+        self._lock = threading.RLock()
+
+    def version(self, task):
+        return current_version(task, self.root) or LEGACY
+
+    def get(self, task, name, version=None):
+        version = version or self.version(task)
+        key = (task, version, name)
+        part = self._parts.get(key, _MISSING)
+        if part is _MISSING:
+            with self._lock:
+                part = self._parts.get(key, _MISSING)
+                if part is _MISSING:
+                    part = self._parts[key] = load_part(task, name, version, self.root)
+                    # a newer version is live: forget the old one
+                    for old in [k for k in self._parts if k[0] == task and k[1] != version]:
+                        del self._parts[old]
+        return part
+
+    def load(self, task, names):
+        """All requested parts from one consistent version."""
+        version = self.version(task)
+        return {name: self.get(task, name, version) for name in names}
+
+    def invalidate(self, task=None):
+        with self._lock:
+            for key in [k for k in self._parts if task is None or k[0] == task]:
+                del self._parts[key]
+
+    def loaded(self):
+        return sorted(self._parts)
@@ -0,0 +1,162 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.model_bundle import file_hash
+
+# -----------------------------------------------------------
+# PDF KNOWLEDGE BASE INGESTION
+# -----------------------------------------------------------
+# Every PDF in rag_docs/ is parsed once and its text kept in a per-file
+# cache. Only new or changed PDFs (different size and mtime, and failing
+# that a different sha256) are parsed again, each in its own worker process.
+# Pages are streamed straight into the cache file as they are extracted.
+#
+#   data/.cache/rag_text/manifest.json     {pdf name: size, mtime, sha256, ...}
+#   data/.cache/rag_text/<sha256>.txt      lowercased text, one page per line block
+
+RAG_DIR = "rag_docs"
+CACHE_DIR = "data/.cache/rag_text"
+
+# results of the last ingest() in this process, for reporting
+last_report = []
+
+
+def parse_pdf(path, out_path):
+    """Extract a PDF page by page into out_path (runs in a worker process)."""
+    import pdfplumber
+
+    start = time.perf_counter()
+    pages = 0
+    tmp = f"{out_path}.tmp-{os.getpid()}"
+    try:
+        with pdfplumber.open(path) as pdf, open(tmp, "w", encoding="utf-8") as out:
+            for page in pdf.pages:
+                content = page.extract_text()
+                if content:
+                    out.write(content.lower())
+                    out.write("\n")
+                pages += 1
+                page.flush_cache()      # drop the page's parsed objects right away
+        os.replace(tmp, out_path)
+        return {"pages": pages, "seconds": time.perf_counter() - start, "error": None}
+    except Exception as e:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return {"pages": pages, "seconds": time.perf_counter() - start,
+                "error": f"{e.__class__.__name__}: {e}"}
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "manifest.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_manifest(cache_dir, manifest):
+    tmp = os.path.join(cache_dir, f"manifest.json.tmp-{os.getpid()}")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(cache_dir, "manifest.json"))
+
+
+def _cached(entry, path, st):
+    """Cache entry still valid for this file? (may update its mtime)
+    Failures are cached too: an unreadable PDF is retried once it changes."""
+    if not entry or entry["size"] != st.st_size:
+        return False
+    if not entry.get("error") and not os.path.exists(entry["text"]):
+        return False
+    if entry["mtime_ns"] != st.st_mtime_ns:
+        if file_hash(path) != entry["sha256"]:
+            return False
+        entry["mtime_ns"] = st.st_mtime_ns      # touched, not changed
+    return True
+
+
+def ingest(folder=RAG_DIR, cache_dir=CACHE_DIR, workers=None):
+    """Bring the text cache up to date; returns one report row per PDF."""
+    global last_report
+
+    if not os.path.isdir(folder):
+        last_report = []
+        return last_report
+
+    os.makedirs(cache_dir, exist_ok=True)
+    old = _read_manifest(cache_dir)
+    manifest, report, todo = {}, [], []
+
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        path = os.path.join(folder, name)
+        st = os.stat(path)
+        entry = old.get(name)
+        if _cached(entry, path, st):
+            manifest[name] = entry
+            report.append({"file": name, "status": "cached", "pages": entry["pages"],
+                           "seconds": 0.0, "error": entry.get("error")})
+            continue
+
+        digest = file_hash(path)
+        text = os.path.join(cache_dir, f"{digest[:16]}.txt")
+        manifest[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest,
+                          "text": text, "pages": 0}
+        todo.append((name, path, text))
+
+    if todo:
+        # spawn: the app process is multi-threaded, so don't fork it
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers or min(len(todo), os.cpu_count() or 1),
+                                 mp_context=ctx) as pool:
+            futures = {name: pool.submit(parse_pdf, path, text) for name, path, text in todo}
+            for name, future in futures.items():
+                result = future.result()
+                manifest[name].update(pages=result["pages"], error=result["error"])
+                report.append({"file": name, "status": "error" if result["error"] else "parsed",
+                               **result})
+                if result["error"]:
+                    print(f"⚠️ Could not read {name}: {result['error']}")
+
+    # text of PDFs that were removed or replaced
+    live = {entry["text"] for entry in manifest.values()}
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.endswith(".txt") and path not in live:
+            os.remove(path)
+
+    _write_manifest(cache_dir, manifest)
+    last_report = sorted(report, key=lambda r: r["file"])
+    return last_report
+
+
+def iter_texts(folder=RAG_DIR, cache_dir=CACHE_DIR, workers=None):
+    """Text of every readable PDF, one string per file."""
+    ingest(folder, cache_dir, workers)
+    for entry in _read_manifest(cache_dir).values():
+        if not entry.get("error"):
+            with open(entry["text"], encoding="utf-8") as f:
+                yield f.read()
+
+
+def load_text(folder=RAG_DIR, cache_dir=CACHE_DIR, workers=None):
+    return "\n".join(iter_texts(folder, cache_dir, workers))
+
+
+# -----------------------------------------------------------
+# COMMAND LINE: python -m utils.pdf_ingest [folder]
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    rows = ingest(sys.argv[1] if len(sys.argv) > 1 else RAG_DIR)
+    for r in rows:
+        mark = "⚠️" if r["error"] else "✅"
+        print(f"{mark} {r['file']:<40} {r['status']:<7} {r['pages']:>5} pages {r['seconds']:7.2f} s"
+              + (f"  {r['error']}" if r["error"] else ""))
+    print(f"{len(rows)} PDFs in {time.perf_counter() - start:.2f} s")
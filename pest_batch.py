@@ -0,0 +1,193 @@
+import csv
+import io
+import os
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from utils.prediction_cache import content_key
+
+# -----------------------------------------------------------
+# MULTI-IMAGE / ZIP / FOLDER PEST DETECTION
+# -----------------------------------------------------------
+# Images are decoded and resized in a thread pool (PIL releases the GIL)
+# straight into a preallocated uint8 batch. While chunk k runs through the
+# model the pool is already decoding chunk k+1 into the second buffer.
+# Each chunk is converted to float32 in one pass and predicted with one call.
+
+IMG_SIZE = (150, 150)
+CHUNK = 32
+TOP_K = 3
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+COLUMNS = ["file", "pest", "confidence", "top", "error"]
+
+
+# -----------------------------------------
+# 1. COLLECT IMAGES
+# -----------------------------------------
+
+def _is_image(name):
+    base = os.path.basename(name)
+    return name.lower().endswith(IMAGE_EXTS) and not base.startswith(".") and "__MACOSX" not in name
+
+
+def zip_images(source):
+    with zipfile.ZipFile(source) as zf:
+        for info in zf.infolist():
+            if not info.is_dir() and _is_image(info.filename):
+                yield info.filename, zf.read(info)
+
+
+def folder_images(folder):
+    for base, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            if _is_image(name):
+                path = os.path.join(base, name)
+                with open(path, "rb") as f:
+                    yield os.path.relpath(path, folder), f.read()
+
+
+def upload_images(uploads):
+    """(name, bytes) for Streamlit uploads; zip files are expanded."""
+    for up in uploads:
+        if up.name.lower().endswith(".zip"):
+            yield from zip_images(up)
+        else:
+            yield up.name, up.getvalue()
+
+
+# -----------------------------------------
+# 2. DECODE + BATCHED PREDICT
+# -----------------------------------------
+
+def decode_into(buf, slot, data):
+    """Decode one image into buf[slot]; returns an error message or None."""
+    try:
+        img = Image.open(io.BytesIO(data)).convert("RGB").resize(IMG_SIZE)
+        buf[slot] = np.asarray(img)
+        return None
+    except Exception as e:
+        return f"Could not read image ({e.__class__.__name__})"
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def predict_images(items, model, labels, chunk_size=CHUNK, workers=None, top_k=TOP_K):
+    """Yield one result row per (name, bytes) item, in input order."""
+    h, w = IMG_SIZE
+    buffers = [np.empty((chunk_size, h, w, 3), dtype=np.uint8) for _ in range(2)]
+    batch = np.empty((chunk_size, h, w, 3), dtype=np.float32)
+    top_k = min(top_k, len(labels))
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        def submit(i, chunk):
+            buf = buffers[i % 2]
+            return chunk, [pool.submit(decode_into, buf, j, data) for j, (_, data) in enumerate(chunk)]
+
+        chunks = enumerate(_chunks(items, chunk_size))
+        first = next(chunks, None)
+        pending = submit(*first) if first else None
+
+        i = 0
+        while pending:
+            chunk, futures = pending
+            errors = [f.result() for f in futures]
+
+            # start decoding the next chunk before running this one
+            nxt = next(chunks, None)
+            pending = submit(*nxt) if nxt else None
+
+            ok = [j for j, err in enumerate(errors) if err is None]
+            probs = None
+            if ok:
+                n = len(chunk)
+                np.divide(buffers[i % 2][:n], np.float32(255), out=batch[:n])
+                probs = np.asarray(model.predict(batch[:n], verbose=0))
+
+            for j, (name, _) in enumerate(chunk):
+                if errors[j]:
+                    yield {"file": name, "pest": "", "confidence": np.nan, "top": "", "error": errors[j]}
+                    continue
+                order = np.argsort(-probs[j], kind="stable")[:top_k]
+                yield {
+                    "file": name,
+                    "pest": labels[order[0]],
+                    "confidence": round(float(probs[j, order[0]]) * 100, 2),
+                    "top": ", ".join(f"{labels[k]} ({probs[j, k] * 100:.1f}%)" for k in order),
+                    "error": "",
+                }
+            i += 1
+
+
+def cached_predict_images(items, model, labels, cache, version, **kwargs):
+    """predict_images() that only decodes/predicts images missing from `cache`
+    (including near-identical copies when the cache is perceptual)."""
+    items = list(items)
+    keys = [content_key(data) for _, data in items]
+    phashes = [None] * len(items)
+    rows = [None] * len(items)
+    misses = []
+    for i, (name, data) in enumerate(items):
+        if not cache.has(keys[i], version):
+            phashes[i] = cache.phash(data)
+        row = cache.get(keys[i], version, phashes[i])
+        if row is None:
+            misses.append(i)
+        else:
+            rows[i] = {**row, "file": name}
+
+    for i, row in zip(misses, predict_images([items[i] for i in misses], model, labels, **kwargs)):
+        cache.put(keys[i], version, row, phashes[i])
+        rows[i] = row
+    return rows
+
+
+def to_csv(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+# -----------------------------------------------------------
+# COMMAND LINE: python -m utils.pest_batch <folder|file.zip> [out.csv]
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    import time
+
+    from utils.model_bundle import ModelRegistry
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.pest_batch <folder|file.zip> [out.csv]")
+        sys.exit(1)
+
+    src = sys.argv[1]
+    items = zip_images(src) if src.lower().endswith(".zip") else folder_images(src)
+
+    models = ModelRegistry().load("pest", ["model", "labels"])
+    labels = models["labels"] or sorted(os.listdir("data/pest_images"))
+
+    start = time.perf_counter()
+    rows = list(predict_images(items, models["model"], labels))
+    secs = time.perf_counter() - start
+
+    out = sys.argv[2] if len(sys.argv) > 2 else "pest_predictions.csv"
+    with open(out, "w", newline="") as f:
+        f.write(to_csv(rows))
+
+    print(f"✅ {len(rows)} images in {secs:.2f}s ({len(rows) / max(secs, 1e-9):.1f} images/s) -> {out}")
@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from utils.pest_batch import IMG_SIZE, decode_into
+from utils.pest_runtime import cnn_path, load_cnn, save_cnn, variants_report_path
+from utils.pest_shards import read_shards
+from utils.train_pest_model import DATA_PATH, split_files
+
+# -----------------------------------------------------------
+# SMALLER PEST MODELS: INT8 WEIGHTS + STRUCTURED PRUNING
+# -----------------------------------------------------------
+# Post-training only, on the NumPy export of a trained model (no TensorFlow):
+#
+#   int8      every conv/dense kernel stored as int8 with one float32 scale
+#             per output channel (symmetric, max-abs) - ~4x smaller on disk
+#             and in (memory-mapped) resident memory; the kernels are
+#             widened to float32 block by block for the matmuls, so int8
+#             alone does not make inference faster
+#   pruneNN   drops NN% of the last conv's filters and of the hidden Dense
+#             units (lowest weight norm first). Fewer filters also shrink the
+#             Flatten -> Dense matrix, so this cuts FLOPs and latency too.
+#
+# The harness scores every variant on the validation split used in training
+# and records the smallest one within MAX_ACCURACY_DROP of the baseline in
+# variants.json; PEST_VARIANT=best (or a variant name) serves it.
+#
+#   python -m utils.pest_quantize            # new version of the pest bundle
+#   python -m utils.pest_quantize model.h5   # next to a model outside bundles
+#
+# Published bundles are never modified: for the current pest bundle the
+# variants go into a copy of it, published as a new version (see
+# model_bundle.extend_bundle).
+
+VARIANTS = {
+    "int8": {"prune": 0.0, "int8": True},
+    "prune25": {"prune": 0.25, "int8": False},
+    "prune50": {"prune": 0.5, "int8": False},
+    "prune25-int8": {"prune": 0.25, "int8": True},
+    "prune50-int8": {"prune": 0.5, "int8": True},
+    "prune75-int8": {"prune": 0.75, "int8": True},
+}
+
+MAX_ACCURACY_DROP = 0.01
+LATENCY_RUNS = 20
+BATCH = 32
+
+
+# -----------------------------------------
+# 1. QUANTIZATION
+# -----------------------------------------
+
+def quantize(kernel):
+    """Symmetric per-output-channel int8: kernel ~= q * scale."""
+    kernel = np.asarray(kernel, dtype=np.float32)
+    scale = np.abs(kernel).max(axis=0) / 127
+    scale[scale == 0] = 1
+    q = np.clip(np.rint(kernel / scale), -127, 127).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+def quantize_layers(specs, arrays):
+    specs = [dict(s) for s in specs]
+    arrays = dict(arrays)
+    for spec in specs:
+        if spec.get("kernel"):
+            name = spec["kernel"]
+            arrays[name], arrays[f"{name}_scale"] = quantize(arrays[name])
+            spec["scale"] = f"{name}_scale"
+    return specs, arrays
+
+
+# -----------------------------------------
+# 2. STRUCTURED PRUNING
+# -----------------------------------------
+
+def _keep(scores, fraction):
+    n = max(1, int(round(len(scores) * (1 - fraction))))
+    return np.sort(np.argsort(-scores, kind="stable")[:n])
+
+
+def prune_layers(specs, arrays, fraction):
+    """Prune the conv feeding Flatten and the hidden Dense layer after it.
+
+    Expects ... conv2d, [maxpool ...], flatten, dense, dense (the layout
+    train_pest_model.py builds)."""
+    kinds = [s["type"] for s in specs]
+    f = kinds.index("flatten")
+    conv = max(i for i in range(f) if kinds[i] == "conv2d")
+    if any(k not in ("maxpool",) for k in kinds[conv + 1:f]):
+        raise ValueError("Only max pooling may sit between the last conv and Flatten")
+    d1, d2 = [i for i in range(f + 1, len(kinds)) if kinds[i] == "dense"][:2]
+
+    arrays = {k: np.asarray(v, dtype=np.float32) for k, v in arrays.items()}
+    c_spec, d1_spec, d2_spec = specs[conv], specs[d1], specs[d2]
+    kc, w1, w2 = arrays[c_spec["kernel"]], arrays[d1_spec["kernel"]], arrays[d2_spec["kernel"]]
+
+    # Flatten is NHWC: row = position * channels + channel
+    channels = kc.shape[1]
+    hidden = w1.shape[1]
+    w1 = w1.reshape(-1, channels, hidden)
+
+    # conv filters: own weight norm x the Dense rows they feed
+    keep_c = _keep(np.linalg.norm(kc, axis=0) * np.linalg.norm(w1, axis=(0, 2)), fraction)
+    kc = kc[:, keep_c]
+    w1 = w1[:, keep_c].reshape(-1, hidden)
+    if c_spec.get("bias"):
+        arrays[c_spec["bias"]] = arrays[c_spec["bias"]][keep_c]
+
+    # hidden units: incoming x outgoing weight norm
+    keep_h = _keep(np.linalg.norm(w1, axis=0) * np.linalg.norm(w2, axis=1), fraction)
+    w1 = w1[:, keep_h]
+    w2 = w2[keep_h]
+    if d1_spec.get("bias"):
+        arrays[d1_spec["bias"]] = arrays[d1_spec["bias"]][keep_h]
+
+    arrays[c_spec["kernel"]] = np.ascontiguousarray(kc)
+    arrays[d1_spec["kernel"]] = np.ascontiguousarray(w1)
+    arrays[d2_spec["kernel"]] = np.ascontiguousarray(w2)
+    return specs, arrays
+
+
+def make_variant(base, name):
+    opts = VARIANTS[name]
+    specs, arrays = base.layers, dict(base.arrays)
+    if opts["prune"]:
+        specs, arrays = prune_layers(specs, arrays, opts["prune"])
+    if opts["int8"]:
+        specs, arrays = quantize_layers(specs, arrays)
+    return specs, arrays
+
+
+# -----------------------------------------
+# 3. EVALUATION
+# -----------------------------------------
+
+def load_split(data_path=DATA_PATH):
+    shards = read_shards(data_path=data_path)
+    if shards is not None:
+        images, labels = shards.arrays("validation")
+        return np.divide(images, np.float32(255)), np.asarray(labels)
+
+    files = split_files(data_path, subset="validation")
+    x = np.empty((len(files), *IMG_SIZE, 3), dtype=np.uint8)
+    for i, (path, _) in enumerate(files):
+        with open(path, "rb") as f:
+            err = decode_into(x, i, f.read())
+        if err:
+            raise ValueError(f"{path}: {err}")
+    return np.divide(x, np.float32(255)), np.array([label for _, label in files])
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(base, n)) for base, _, names in os.walk(path) for n in names)
+
+
+def evaluate(model, x, y):
+    pred = np.concatenate([np.argmax(model.predict(x[i:i + BATCH]), axis=1)
+                           for i in range(0, len(x), BATCH)])
+
+    single = x[:1]
+    model.predict(single)
+    times = []
+    for _ in range(LATENCY_RUNS):
+        start = time.perf_counter()
+        model.predict(single)
+        times.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.predict(x[:BATCH])
+    ips = min(BATCH, len(x)) / (time.perf_counter() - start)
+
+    return {
+        "accuracy": float(np.mean(pred == y)),
+        "p50_ms": float(np.percentile(times, 50)),
+        "images_per_s": float(ips),
+    }
+
+
+def build_variants(h5_path, names=None, data_path=DATA_PATH, out_dir=None):
+    """Write every variant next to the baseline export (or into `out_dir`)
+    and report on them."""
+    base_path = cnn_path(h5_path)
+    base = load_cnn(base_path, mmap=False)
+    x, y = load_split(data_path)
+    target = os.path.join(out_dir, os.path.basename(h5_path)) if out_dir else h5_path
+
+    results = {"baseline": {**evaluate(base, x, y), "bytes": dir_size(base_path)}}
+    for name in names or VARIANTS:
+        path = cnn_path(target, name)
+        specs, arrays = make_variant(base, name)
+        save_cnn(specs, arrays, base.input_shape, path)
+        results[name] = {**evaluate(load_cnn(path), x, y), "bytes": dir_size(path)}
+
+    floor = results["baseline"]["accuracy"] - MAX_ACCURACY_DROP
+    ok = [n for n in results if n != "baseline" and results[n]["accuracy"] >= floor]
+    report = {
+        "validation_images": len(y),
+        "max_accuracy_drop": MAX_ACCURACY_DROP,
+        "recommended": min(ok, key=lambda n: results[n]["bytes"]) if ok else None,
+        "variants": results,
+    }
+    with open(variants_report_path(target), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def print_report(report):
+    base = report["variants"]["baseline"]
+    print(f"{'variant':<14}{'top-1':>8}{'Δ':>8}{'size MB':>10}{'p50 ms':>9}{'img/s':>9}")
+    for name, r in report["variants"].items():
+        print(f"{name:<14}{r['accuracy']:8.2%}{r['accuracy'] - base['accuracy']:+8.2%}"
+              f"{r['bytes'] / 1e6:10.2f}{r['p50_ms']:9.1f}{r['images_per_s']:9.1f}")
+    print(f"✅ Recommended (within {report['max_accuracy_drop']:.0%} of baseline): "
+          f"{report['recommended'] or 'none - keep the baseline'}")
+
+
+# -----------------------------------------------------------
+# COMMAND LINE: python -m utils.pest_quantize [model.h5] [--variants ...]
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    from utils.model_bundle import extend_bundle, part_path
+
+    parser = argparse.ArgumentParser(description="Build and evaluate smaller pest model variants")
+    parser.add_argument("h5", nargs="?", help="defaults to the current pest bundle")
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS))
+    parser.add_argument("--data", default=DATA_PATH)
+    args = parser.parse_args()
+
+    h5 = args.h5 or part_path("pest", "model")
+    if not h5 or not os.path.exists(os.path.join(cnn_path(h5), "manifest.json")):
+        parser.error("no exported pest model; train it first: python -m utils.train pest")
+
+    if args.h5:
+        print_report(build_variants(h5, args.variants, args.data))
+    else:
+        reports = []
+        bundle = extend_bundle("pest", lambda folder: reports.append(
+            build_variants(h5, args.variants, args.data, out_dir=folder)))
+        print_report(reports[0])
+        print(f"✅ Published pest bundle {bundle['version']} (variants of {bundle['parent']})")
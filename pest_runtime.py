@@ -0,0 +1,354 @@
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# -----------------------------------------------------------
+# PEST CNN WITHOUT TENSORFLOW
+# -----------------------------------------------------------
+# Serving only needs a forward pass of the small Sequential CNN from
+# train_pest_model.py, so the Keras weights are exported once to a
+# directory of .npy arrays (memory-mapped on load, like compiled forests)
+# and run with NumPy:
+#
+#   Conv2D     -> im2col (sliding_window_view) + one matmul per layer
+#   MaxPool2D  -> reshape + max
+#   Flatten    -> reshape (NHWC order, same as Keras)
+#   Dense      -> matmul
+#
+# Everything stays float32. Set PEST_BACKEND=tensorflow to serve the .h5
+# through Keras instead.
+#
+# Kernels may also be stored as int8 with a float32 scale per output channel
+# (see pest_quantize.py). They stay int8 (memory-mapped) after loading; a
+# layer converts QUANT_BLOCK kernel rows at a time to float32 for its matmul
+# and multiplies the result by the scales, so no float copy of a whole
+# kernel is ever made.
+# PEST_VARIANT=<name> serves model.<name>.cnn instead of model.cnn, and
+# PEST_VARIANT=best the variant recommended in variants.json.
+
+FORMAT_VERSION = 1
+BATCH = 16
+QUANT_BLOCK = 2048
+
+
+def backend():
+    return os.environ.get("PEST_BACKEND", "numpy").lower()
+
+
+def variant():
+    return os.environ.get("PEST_VARIANT", "").lower()
+
+
+def cnn_path(h5_path, variant=None):
+    stem = os.path.splitext(h5_path)[0]
+    return f"{stem}.{variant}.cnn" if variant else f"{stem}.cnn"
+
+
+def variants_report_path(h5_path):
+    return os.path.join(os.path.dirname(h5_path), "variants.json")
+
+
+# -----------------------------------------
+# EXPORT (needs TensorFlow, run once)
+# -----------------------------------------
+
+def _activation(cfg):
+    act = cfg.get("activation", "linear")
+    if act not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {act}")
+    return act
+
+
+def keras_layers(model):
+    """(layer spec, {array name: weights}) for every layer of a Sequential model."""
+    specs, arrays = [], {}
+    for i, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        cfg = layer.get_config()
+
+        if cfg.get("data_format", "channels_last") != "channels_last":
+            raise ValueError(f"{layer.name}: only channels_last is supported")
+
+        if kind == "Conv2D":
+            if tuple(cfg.get("dilation_rate", (1, 1))) != (1, 1) or cfg.get("groups", 1) != 1:
+                raise ValueError(f"{layer.name}: dilated/grouped convolutions are not supported")
+            weights = layer.get_weights()
+            kh, kw, cin, cout = weights[0].shape
+            # stored as the (C*kh*kw, O) matrix the im2col matmul needs
+            arrays[f"{i}_kernel"] = weights[0].transpose(2, 0, 1, 3).reshape(cin * kh * kw, cout)
+            spec = {"type": "conv2d", "kernel": f"{i}_kernel", "kernel_size": [kh, kw],
+                    "strides": list(cfg["strides"]), "padding": cfg["padding"],
+                    "activation": _activation(cfg)}
+            if len(weights) > 1:
+                arrays[f"{i}_bias"] = weights[1]
+                spec["bias"] = f"{i}_bias"
+        elif kind == "MaxPooling2D":
+            spec = {"type": "maxpool", "pool_size": list(cfg["pool_size"]),
+                    "strides": list(cfg["strides"] or cfg["pool_size"]), "padding": cfg["padding"]}
+        elif kind == "Flatten":
+            spec = {"type": "flatten"}
+        elif kind == "Dense":
+            weights = layer.get_weights()
+            arrays[f"{i}_kernel"] = weights[0]
+            spec = {"type": "dense", "kernel": f"{i}_kernel", "activation": _activation(cfg)}
+            if len(weights) > 1:
+                arrays[f"{i}_bias"] = weights[1]
+                spec["bias"] = f"{i}_bias"
+        elif kind == "Rescaling":
+            spec = {"type": "rescale", "scale": float(cfg["scale"]), "offset": float(cfg["offset"])}
+        elif kind in ("Dropout", "InputLayer"):
+            continue        # no-ops at inference time
+        else:
+            raise ValueError(f"Unsupported layer for the NumPy runtime: {kind}")
+        specs.append(spec)
+    return specs, arrays
+
+
+def save_cnn(specs, arrays, input_shape, path):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    for name, arr in arrays.items():
+        arr = np.asarray(arr)
+        if arr.dtype != np.int8:
+            arr = arr.astype(np.float32)
+        np.save(os.path.join(tmp, f"{name}.npy"), arr, allow_pickle=False)
+
+    manifest = {
+        "format": "cnn",
+        "format_version": FORMAT_VERSION,
+        "input_shape": list(input_shape),
+        "layers": specs,
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    old = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def export_keras(model, path):
+    """Dump a Keras model (object or .h5 path) to a NumPy runtime directory."""
+    if isinstance(model, str):
+        import tensorflow as tf
+        model = tf.keras.models.load_model(model)
+
+    specs, arrays = keras_layers(model)
+    return save_cnn(specs, arrays, model.input_shape[1:], path)
+
+
+# -----------------------------------------
+# INFERENCE
+# -----------------------------------------
+
+def _softmax(x):
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x):
+    return np.divide(1, 1 + np.exp(-x), out=x)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "softmax": _softmax,
+    "sigmoid": _sigmoid,
+}
+
+
+def _same_padding(size, k, s):
+    out = -(-size // s)
+    total = max((out - 1) * s + k - size, 0)
+    return total // 2, total - total // 2
+
+
+def _pad_same(x, kh, kw, strides, value=0.0):
+    ph = _same_padding(x.shape[1], kh, strides[0])
+    pw = _same_padding(x.shape[2], kw, strides[1])
+    if ph == (0, 0) and pw == (0, 0):
+        return x
+    return np.pad(x, ((0, 0), ph, pw, (0, 0)), constant_values=value)
+
+
+def _matmul(x, kernel, scale=None):
+    """x @ kernel, for an int8 kernel x @ (kernel * scale) per output channel."""
+    if scale is None:
+        return x @ kernel
+    out = x[:, :QUANT_BLOCK] @ kernel[:QUANT_BLOCK].astype(np.float32)
+    for lo in range(QUANT_BLOCK, kernel.shape[0], QUANT_BLOCK):
+        out += x[:, lo:lo + QUANT_BLOCK] @ kernel[lo:lo + QUANT_BLOCK].astype(np.float32)
+    out *= scale
+    return out
+
+
+def conv2d(x, kernel, bias, kernel_size, strides, padding, scale=None):
+    """`kernel` is the (C*kh*kw, O) matrix written by keras_layers()."""
+    kh, kw = kernel_size
+    cin = x.shape[3]
+    if padding == "same":
+        x = _pad_same(x, kh, kw, strides)
+
+    # (N, Ho, Wo, C, kh, kw) view -> (N*Ho*Wo, C*kh*kw) patches -> one matmul
+    win = sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::strides[0], ::strides[1]]
+    n, ho, wo = win.shape[:3]
+    cols = win.reshape(n * ho * wo, cin * kh * kw)
+    out = _matmul(cols, kernel, scale)
+    if bias is not None:
+        out += bias
+    return out.reshape(n, ho, wo, kernel.shape[1])
+
+
+def maxpool2d(x, pool, strides, padding):
+    ph, pw = pool
+    if padding == "same":
+        x = _pad_same(x, ph, pw, strides, value=-np.inf)
+
+    if tuple(pool) == tuple(strides):
+        n, h, w, c = x.shape
+        h, w = h // ph, w // pw
+        return x[:, :h * ph, :w * pw].reshape(n, h, ph, w, pw, c).max(axis=(2, 4))
+
+    win = sliding_window_view(x, (ph, pw), axis=(1, 2))[:, ::strides[0], ::strides[1]]
+    return win.max(axis=(-2, -1))
+
+
+class NumpyCNN:
+    """predict()-compatible forward pass over exported Keras weights."""
+
+    def __init__(self, manifest, arrays):
+        self.input_shape = tuple(manifest["input_shape"])
+        self.layers = manifest["layers"]
+        self.arrays = arrays
+
+    def forward(self, x):
+        for spec in self.layers:
+            kind = spec["type"]
+            if kind == "conv2d":
+                x = conv2d(x, self.arrays[spec["kernel"]], self.arrays.get(spec.get("bias")),
+                           spec["kernel_size"], spec["strides"], spec["padding"],
+                           self.arrays.get(spec.get("scale")))
+                x = ACTIVATIONS[spec["activation"]](x)
+            elif kind == "maxpool":
+                x = maxpool2d(x, spec["pool_size"], spec["strides"], spec["padding"])
+            elif kind == "flatten":
+                x = x.reshape(x.shape[0], -1)
+            elif kind == "dense":
+                x = _matmul(x, self.arrays[spec["kernel"]], self.arrays.get(spec.get("scale")))
+                if spec.get("bias"):
+                    x += self.arrays[spec["bias"]]
+                x = ACTIVATIONS[spec["activation"]](x)
+            elif kind == "rescale":
+                x = x * np.float32(spec["scale"]) + np.float32(spec["offset"])
+        return x
+
+    def predict(self, x, batch_size=BATCH, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == len(self.input_shape):
+            x = x[np.newaxis]
+        out = [self.forward(x[i:i + batch_size]) for i in range(0, len(x), batch_size)]
+        return np.concatenate(out) if len(out) > 1 else out[0]
+
+    __call__ = predict
+
+
+def load_cnn(path, mmap=True):
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != "cnn" or manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported CNN format")
+
+    def load(name):
+        return np.load(os.path.join(path, f"{name}.npy"),
+                       mmap_mode="r" if mmap else None, allow_pickle=False)
+
+    arrays = {}
+    for spec in manifest["layers"]:
+        for key in ("kernel", "bias", "scale"):
+            if spec.get(key):
+                arrays[spec[key]] = load(spec[key])
+    return NumpyCNN(manifest, arrays)
+
+
+def _selected_variant(h5_path):
+    name = variant()
+    if name == "best":
+        try:
+            with open(variants_report_path(h5_path)) as f:
+                name = json.load(f).get("recommended") or ""
+        except FileNotFoundError:
+            name = ""
+    if name and not os.path.exists(os.path.join(cnn_path(h5_path, name), "manifest.json")):
+        print(f"⚠️ Pest model variant '{name}' not found, serving the baseline model")
+        name = ""
+    return name
+
+
+class KerasPredictor:
+    """predict() for the TensorFlow backend through one tf.function with a
+    fixed (None, H, W, C) float32 signature: traced once, never per call, and
+    without Keras predict()'s per-call data-adapter setup."""
+
+    def __init__(self, model):
+        import tensorflow as tf
+
+        self.model = model
+        self.input_shape = tuple(model.input_shape[1:])
+        self._predict = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec((None, *self.input_shape), tf.float32)],
+        )
+
+    def predict(self, x, batch_size=BATCH, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == len(self.input_shape):
+            x = x[np.newaxis]
+        out = [self._predict(x[i:i + batch_size]).numpy() for i in range(0, len(x), batch_size)]
+        return np.concatenate(out) if len(out) > 1 else out[0]
+
+    __call__ = predict
+
+
+def load_pest_model(h5_path):
+    """NumPy runtime when an export sits next to the .h5 (and PEST_BACKEND allows it)."""
+    if backend() != "tensorflow":
+        name = _selected_variant(h5_path)
+        path = cnn_path(h5_path, name)
+        if os.path.exists(os.path.join(path, "manifest.json")):
+            return load_cnn(path)
+
+    import tensorflow as tf
+    return KerasPredictor(tf.keras.models.load_model(h5_path))
+
+
+# -----------------------------------------------------------
+# COMMAND LINE: python -m utils.pest_runtime [model.h5]
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    from utils.model_bundle import part_path
+
+    h5 = sys.argv[1] if len(sys.argv) > 1 else part_path("pest", "model")
+    if not h5 or not os.path.exists(h5):
+        print("⚠️ No pest model found. Train it first: python -m utils.train pest")
+        sys.exit(1)
+
+    out = cnn_path(h5)
+    manifest = export_keras(h5, out)
+    print(f"✅ {h5} -> {out} ({len(manifest['layers'])} layers)")
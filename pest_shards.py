@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.pest_batch import IMG_SIZE, decode_into
+from utils.train_pest_model import DATA_PATH, class_names, split_files
+
+# -----------------------------------------------------------
+# PRE-DECODED PEST IMAGE SHARDS
+# -----------------------------------------------------------
+# Every arranged image is decoded and resized once (same PIL path as the app
+# uses for serving) into fixed-size uint8 shards. Readers memory-map them, so
+# evaluation, benchmarks and training get pixels without decoding a JPEG.
+#
+#   data/.cache/pest_shards/manifest.json
+#   data/.cache/pest_shards/images-<hash>.npy   (rows, 150, 150, 3) uint8
+#   data/.cache/pest_shards/labels.npy          class index per row
+#   data/.cache/pest_shards/files.json          source path per row
+#
+# Rows are the training split followed by the validation split (see
+# train_pest_model.split_files), so each subset is one contiguous range.
+# A shard is named after the paths, sizes and mtimes of its source files:
+# an interrupted build keeps every finished shard and a rerun only decodes
+# what changed.
+
+SHARD_DIR = "data/.cache/pest_shards"
+SHARD_SIZE = 512
+FORMAT_VERSION = 1
+
+
+def _state(path):
+    st = os.stat(path)
+    return f"{path}:{st.st_size}:{st.st_mtime_ns}\n"
+
+
+def _digest(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(_state(path).encode())
+    return h.hexdigest()[:16]
+
+
+def _decode_file(out, i, path):
+    with open(path, "rb") as f:
+        err = decode_into(out, i, f.read())
+    if err:
+        raise ValueError(f"{path}: {err}")
+
+
+def _atomic_save(path, arr):
+    tmp = f"{path}.tmp-{os.getpid()}.npy"
+    np.save(tmp, arr, allow_pickle=False)
+    os.replace(tmp, path)
+
+
+# -----------------------------------------
+# BUILD
+# -----------------------------------------
+
+def build_shards(data_path=DATA_PATH, out_dir=SHARD_DIR, shard_size=SHARD_SIZE, workers=None):
+    train = split_files(data_path, "training")
+    val = split_files(data_path, "validation")
+    files = train + val
+    paths = [p for p, _ in files]
+
+    os.makedirs(out_dir, exist_ok=True)
+    shards, built = [], 0
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for start in range(0, len(files), shard_size):
+            chunk = paths[start:start + shard_size]
+            name = f"images-{_digest(chunk)}.npy"
+            path = os.path.join(out_dir, name)
+            shards.append({"file": name, "rows": len(chunk)})
+            if os.path.exists(path):
+                continue
+
+            tmp = f"{path}.tmp-{os.getpid()}.npy"
+            out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.uint8,
+                                            shape=(len(chunk), *IMG_SIZE, 3))
+            try:
+                list(pool.map(_decode_file, [out] * len(chunk), range(len(chunk)), chunk))
+                out.flush()
+            except BaseException:
+                del out
+                os.remove(tmp)
+                raise
+            del out
+            os.replace(tmp, path)
+            built += 1
+
+    _atomic_save(os.path.join(out_dir, "labels.npy"), np.array([l for _, l in files], dtype=np.int16))
+    with open(os.path.join(out_dir, "files.json"), "w") as f:
+        json.dump([os.path.relpath(p, data_path) for p in paths], f)
+
+    manifest = {
+        "format": "pest-shards",
+        "format_version": FORMAT_VERSION,
+        "img_size": list(IMG_SIZE),
+        "classes": class_names(data_path),
+        "source": os.path.abspath(data_path),
+        "source_hash": _digest(paths),
+        "rows": len(files),
+        "training_rows": len(train),
+        "shards": shards,
+    }
+    tmp = os.path.join(out_dir, f"manifest.json.tmp-{os.getpid()}")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, "manifest.json"))
+
+    # shards of older builds
+    keep = {s["file"] for s in shards}
+    for name in os.listdir(out_dir):
+        if name.startswith("images-") and name not in keep:
+            os.remove(os.path.join(out_dir, name))
+
+    return manifest, built
+
+
+# -----------------------------------------
+# READ
+# -----------------------------------------
+
+class PestShards:
+    def __init__(self, out_dir, manifest):
+        self.classes = manifest["classes"]
+        self.training_rows = manifest["training_rows"]
+        self.images = [np.load(os.path.join(out_dir, s["file"]), mmap_mode="r") for s in manifest["shards"]]
+        self.labels = np.load(os.path.join(out_dir, "labels.npy"))
+        self.offsets = np.cumsum([0] + [s["rows"] for s in manifest["shards"]])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def _range(self, subset):
+        if subset == "training":
+            return 0, self.training_rows
+        if subset == "validation":
+            return self.training_rows, len(self)
+        return 0, len(self)
+
+    def views(self, subset=None):
+        """(images, labels) per shard for one subset - memory-mapped, no copy."""
+        lo, hi = self._range(subset)
+        out = []
+        for images, start in zip(self.images, self.offsets):
+            a, b = max(lo - start, 0), min(hi - start, len(images))
+            if a < b:
+                out.append((images[a:b], self.labels[start + a:start + b]))
+        return out
+
+    def arrays(self, subset=None):
+        """One (images, labels) pair for a subset (copies if it spans shards)."""
+        views = self.views(subset)
+        if len(views) == 1:
+            return views[0]
+        return np.concatenate([v[0] for v in views]), np.concatenate([v[1] for v in views])
+
+
+def read_shards(out_dir=SHARD_DIR, data_path=None):
+    """Shards in out_dir, or None if missing or (given data_path) out of date."""
+    try:
+        with open(os.path.join(out_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if manifest.get("format") != "pest-shards" or manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    if data_path is not None:
+        paths = [p for p, _ in split_files(data_path, "training") + split_files(data_path, "validation")]
+        if _digest(paths) != manifest["source_hash"]:
+            return None
+    return PestShards(out_dir, manifest)
+
+
+# -----------------------------------------------------------
+# COMMAND LINE: python -m utils.pest_shards [image folder]
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    manifest, built = build_shards(sys.argv[1] if len(sys.argv) > 1 else DATA_PATH)
+    print(f"✅ {manifest['rows']} images in {len(manifest['shards'])} shards "
+          f"({built} rebuilt) -> {SHARD_DIR}")
@@ -0,0 +1,167 @@
+import hashlib
+import io
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# -----------------------------------------------------------
+# PREDICTION CACHE (CONTENT-HASHED, LRU)
+# -----------------------------------------------------------
+# Keyed by sha256 of the uploaded bytes plus the model bundle version, so a
+# re-uploaded photo (or a Streamlit rerun) skips decode + CNN entirely, and
+# publishing a new pest bundle invalidates every old entry.
+#
+# With perceptual=True a miss falls back to a 64-bit difference hash (dHash)
+# of the image, so a re-saved or re-compressed copy of a cached photo within
+# HAMMING_LIMIT bits reuses its result. The near-hit is then also stored
+# under the copy's own key, so the copy is an exact hit from then on.
+#
+# Bounded by entry count and by the (approximate) size of cached results;
+# least recently used entries are evicted first.
+
+MAX_ENTRIES = 1024
+MAX_BYTES = 16 * 1024 * 1024
+HAMMING_LIMIT = 4
+
+
+def content_key(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def dhash(data, size=8):
+    """64-bit difference hash: is each pixel brighter than its right neighbour?"""
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(data)).convert("L").resize((size + 1, size))
+    px = np.asarray(img, dtype=np.int16)
+    bits = (px[:, 1:] > px[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def sizeof(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(sizeof(k) + sizeof(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(sizeof(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class PredictionCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES,
+                 perceptual=False, hamming_limit=HAMMING_LIMIT):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.perceptual = perceptual
+        self.hamming_limit = hamming_limit
+
+        self.version = None
+        self._entries = OrderedDict()       # key -> (result, size, phash)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.near_hits = self.misses = self.evictions = 0
+
+    # -----------------------------------------
+    # LOOKUP / STORE
+    # -----------------------------------------
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self._bytes = 0
+            self.version = version
+
+    def _near(self, phash):
+        best, best_dist = None, self.hamming_limit + 1
+        for key, (_, _, other) in self._entries.items():
+            if other is not None:
+                dist = (phash ^ other).bit_count()
+                if dist < best_dist:
+                    best, best_dist = key, dist
+        return best
+
+    def _insert(self, key, result, size, phash):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (result, size, phash)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, old_size, _) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def get(self, key, version, phash=None):
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+            near = self._near(phash) if phash is not None else None
+            if near is None:
+                self.misses += 1
+                return None
+            self.near_hits += 1
+            result, size, _ = self._entries[near]
+            self._entries.move_to_end(near)
+            self._insert(key, result, size, phash)
+            return result
+
+    def put(self, key, version, result, phash=None):
+        size = sizeof(result)
+        with self._lock:
+            self._check_version(version)
+            self._insert(key, result, size, phash)
+
+    def has(self, key, version):
+        """Exact entry present? (not counted as a lookup)"""
+        with self._lock:
+            return version == self.version and key in self._entries
+
+    def phash(self, data):
+        """dHash of an image for near-hit lookups; None when not perceptual
+        or the bytes are not a readable image."""
+        if not self.perceptual:
+            return None
+        try:
+            return dhash(data)
+        except Exception:
+            return None
+
+    def lookup(self, data, version, compute):
+        """Cached result for these bytes, else compute(data) and remember it."""
+        key = content_key(data)
+        phash = None if self.has(key, version) else self.phash(data)
+        result = self.get(key, version, phash)
+        if result is None:
+            result = compute(data)
+            self.put(key, version, result, phash)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # -----------------------------------------
+    # METRICS
+    # -----------------------------------------
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+            }
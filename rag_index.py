@@ -0,0 +1,158 @@
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+# -----------------------------------------------------------
+# BM25 INDEX OVER THE PDF KNOWLEDGE BASE
+# -----------------------------------------------------------
+# The text is split into passages (sentences) and tokenised once. Postings
+# are stored per term as flat arrays (CSR layout) holding the passage id and
+# its precomputed BM25 weight, so a query only touches the postings of its
+# own terms:
+#
+#   score(q, d) = sum over terms t in q of  idf(t) * tf(t,d) * (k1 + 1)
+#                                           / (tf(t,d) + k1 * (1 - b + b * len(d) / avglen))
+#
+# A passage is only returned when it contains at least MIN_MATCH of the
+# query's terms (otherwise one shared word like "crop" would make RAG answer
+# every question ahead of the chatbot's built-in replies) and scores at least
+# RELATIVE_CUTOFF of the best passage. Both rules also let a query skip the
+# postings of common terms (see search()).
+
+K1 = 1.5
+B = 0.75
+TOP_K = 3
+MIN_MATCH = 0.6
+RELATIVE_CUTOFF = 0.5
+
+# \w alone splits Telugu words at vowel signs (combining marks)
+TOKEN_RE = re.compile(r"[\w\u0C00-\u0C7F]+")
+SENTENCE_RE = re.compile(r"[.!?\u0964]+|\n\s*\n")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "the",
+    "to", "what", "when", "where", "which", "who", "why", "will", "with", "you",
+    "your", "about", "tell", "please", "much", "many", "get", "give",
+}
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def split_passages(text):
+    passages = (" ".join(s.split()) for s in SENTENCE_RE.split(text))
+    return [p for p in passages if TOKEN_RE.search(p)]
+
+
+class BM25Index:
+    def __init__(self, passages, k1=K1, b=B):
+        self.passages = passages
+        self.vocab = {}
+
+        term_ids, doc_ids, tfs = [], [], []
+        lengths = np.zeros(len(passages), dtype=np.float64)
+        for doc, passage in enumerate(passages):
+            counts = Counter(tokenize(passage))
+            lengths[doc] = sum(counts.values())
+            for term, tf in counts.items():
+                term_ids.append(self.vocab.setdefault(term, len(self.vocab)))
+                doc_ids.append(doc)
+                tfs.append(tf)
+
+        term_ids = np.array(term_ids, dtype=np.int64)
+        doc_ids = np.array(doc_ids, dtype=np.int32)
+        tfs = np.array(tfs, dtype=np.float64)
+
+        # group postings by term
+        order = np.argsort(term_ids, kind="stable")
+        doc_ids, tfs = doc_ids[order], tfs[order]
+        df = np.bincount(term_ids, minlength=len(self.vocab))
+        self.indptr = np.concatenate([[0], np.cumsum(df)])
+
+        n = max(len(passages), 1)
+        idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+        avglen = lengths.mean() if len(passages) else 1.0
+        norm = k1 * (1 - b + b * lengths[doc_ids] / max(avglen, 1e-9))
+        term_of = np.repeat(np.arange(len(self.vocab)), df)
+
+        self.docs = doc_ids
+        self.weights = (idf[term_of] * tfs * (k1 + 1) / (tfs + norm)).astype(np.float32)
+        self.max_weight = np.zeros(len(self.vocab), dtype=np.float32)
+        np.maximum.at(self.max_weight, term_of, self.weights)
+
+    def __len__(self):
+        return len(self.passages)
+
+    def _postings(self, term_id):
+        lo, hi = self.indptr[term_id], self.indptr[term_id + 1]
+        return self.docs[lo:hi], self.weights[lo:hi]
+
+    def _df(self, term_id):
+        return self.indptr[term_id + 1] - self.indptr[term_id]
+
+    def _score(self, generate, lookup):
+        """Score every passage in the postings of `generate` on all terms."""
+        postings = [self._postings(i) for i in generate]
+        candidates, inverse = np.unique(np.concatenate([p[0] for p in postings]), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate([p[1] for p in postings]))
+        matched = np.bincount(inverse)
+
+        for i in lookup:
+            docs, weights = self._postings(i)        # doc ids are sorted
+            pos = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+            hit = docs[pos] == candidates
+            scores[hit] += weights[pos[hit]]
+            matched += hit
+        return candidates, scores, matched
+
+    def search(self, query, k=TOP_K, min_match=MIN_MATCH, cutoff=RELATIVE_CUTOFF):
+        """[(passage, score)] best first; empty if nothing is relevant enough."""
+        terms = set(tokenize(query))
+        need = max(1, math.ceil(min_match * len(terms)))
+        ids = sorted((self.vocab[t] for t in terms if t in self.vocab), key=self._df)
+        if len(ids) < need:
+            return []
+
+        # 1. the rarest term's passages, fully scored, give a lower bound on
+        #    the best score and so on the cutoff
+        candidates, scores, matched = self._score(ids[:1], ids[1:])
+        ok = matched >= need
+        threshold = cutoff * scores[ok].max() if ok.any() else 0.0
+
+        # 2. candidates only need to come from either
+        #    - the n - need + 1 rarest terms (a passage with `need` of the n
+        #      query terms contains at least one of them), or
+        #    - the terms that can still lift a passage over the threshold
+        #      (MaxScore: terms whose best weights sum below it can't)
+        by_weight = sorted(ids, key=lambda i: self.max_weight[i])
+        bound = np.cumsum([self.max_weight[i] for i in by_weight])
+        essential = by_weight[int(np.searchsorted(bound, threshold, side="left")):]
+        rarest = ids[:len(ids) - need + 1]
+        generate = min(rarest, essential, key=lambda g: sum(self._df(i) for i in g))
+
+        if set(generate) != {ids[0]}:
+            candidates, scores, matched = self._score(generate, [i for i in ids if i not in generate])
+
+        keep = (matched >= need) & (scores >= threshold)
+        if keep.any():
+            keep &= scores >= cutoff * scores[keep].max()
+        candidates, scores = candidates[keep], scores[keep]
+        if not len(candidates):
+            return []
+
+        if len(candidates) > k:
+            # keep every passage tied with the k-th score, so ties are broken
+            # by passage id below and not by argpartition
+            kth = -np.partition(-scores, k - 1)[k - 1]
+            top = scores >= kth
+            candidates, scores = candidates[top], scores[top]
+        order = np.lexsort((candidates, -scores))[:k]
+        return [(self.passages[candidates[i]], float(scores[i])) for i in order]
+
+
+def build_index(text):
+    return BM25Index(split_passages(text))
@@ -1,4 +1,4 @@
-import pandas as pd
+from utils.datasets import load_dataset
 
-df = pd.read_csv("data/groundwater.csv")
+df = load_dataset("groundwater")
 print(df.columns.tolist())
@@ -0,0 +1,136 @@
+import math
+import os
+import secrets
+import socket
+import threading
+import time
+
+# -----------------------------------------------------------
+# GRIEVANCE TICKET IDS
+# -----------------------------------------------------------
+# Snowflake-style 63-bit ids, written as "GRV-" + 13 Crockford base32 chars:
+#
+#   | 41 bits: ms since 2024-01-01 | 10 bits: node | 12 bits: sequence |
+#
+# Ids from one process are strictly increasing, and sorting tickets sorts
+# them by submission time. Each process gets its node number when it issues
+# its first ticket: TICKET_NODE (0-1023) if set, else a lease from the store
+# (see GrievanceStore.lease_node), renewed once half of it has run out. A
+# node is only handed to another process after its lease expired, and a
+# process that finds its lease taken over leases a new node before issuing
+# another id. A forked child takes its own lease. A ticket also tells when
+# it was filed (ticket_time), i.e. which time partition of the store it
+# lives in, without a lookup.
+#
+# Tickets from before this scheme ("GRV-" + 6 digits) are not ids;
+# parse_ticket() returns None for them and the store finds them by text.
+
+PREFIX = "GRV-"
+EPOCH_MS = 1704067200000            # 2024-01-01T00:00:00Z
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+LENGTH = 13
+_DECODE = {c: i for i, c in enumerate(ALPHABET)}
+_DECODE.update({c.lower(): i for c, i in list(_DECODE.items())})
+_DECODE.update({"O": 0, "o": 0, "I": 1, "i": 1, "L": 1, "l": 1})     # misread characters
+
+
+def encode(n):
+    chars = []
+    for _ in range(LENGTH):
+        n, r = divmod(n, 32)
+        chars.append(ALPHABET[r])
+    return PREFIX + "".join(reversed(chars))
+
+
+def parse_ticket(ticket):
+    """Integer id of a ticket, or None (legacy or mistyped ticket)."""
+    body = ticket.strip()
+    if body[:len(PREFIX)].upper() == PREFIX:
+        body = body[len(PREFIX):]
+    body = body.replace("-", "")
+    if len(body) != LENGTH:
+        return None
+    n = 0
+    for c in body:
+        d = _DECODE.get(c)
+        if d is None:
+            return None
+        n = n * 32 + d
+    return n if n < 1 << 63 else None
+
+
+def normalize_ticket(ticket):
+    """Canonical spelling of a ticket as typed by a user."""
+    n = parse_ticket(ticket)
+    return ticket.strip() if n is None else encode(n)
+
+
+def ticket_time(ticket):
+    """Unix time at which a ticket was issued, or None for legacy tickets."""
+    n = parse_ticket(ticket)
+    if n is None:
+        return None
+    return (EPOCH_MS + (n >> (NODE_BITS + SEQUENCE_BITS))) / 1000
+
+
+def _check_node(node, source):
+    try:
+        node = int(node)
+    except (TypeError, ValueError):
+        raise ValueError(f"{source} must be a whole number, got {node!r}") from None
+    if not 0 <= node < 1 << NODE_BITS:
+        raise ValueError(f"{source} must be between 0 and {(1 << NODE_BITS) - 1}, got {node}")
+    return node
+
+
+class TicketGenerator:
+    def __init__(self, node=None, lease=None):
+        """`lease(holder, node)`: (node, expires) of a node leased to `holder`,
+        renewing `node` while `holder` still holds it (GrievanceStore.lease_node).
+        Without it (and without `node` / TICKET_NODE) the node is random."""
+        self.fixed_node = None if node is None else _check_node(node, "node")
+        self.lease = lease
+        self._reset()
+        # a forked worker must not continue the parent's node and sequence
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self.node = self.fixed_node
+        if self.node is None and os.environ.get("TICKET_NODE"):
+            self.node = _check_node(os.environ["TICKET_NODE"], "TICKET_NODE")
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self._renew_at = math.inf if self.node is not None else -math.inf
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _take_node(self, now):
+        if self.lease is None:
+            self.node, self._renew_at = secrets.randbelow(1 << NODE_BITS), math.inf
+            return
+        self.node, expires = self.lease(self.holder, self.node)
+        self._renew_at = now + (expires - now) / 2
+
+    def next_id(self):
+        with self._lock:
+            now = time.time()
+            if now >= self._renew_at:
+                self._take_node(now)
+            ms = max(int(now * 1000) - EPOCH_MS, self._last_ms)
+            if ms == self._last_ms:
+                self._sequence += 1
+                if self._sequence >> SEQUENCE_BITS:
+                    # 4096 ids in this millisecond: borrow the next one
+                    # (also keeps ids increasing if the clock steps back)
+                    ms += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._last_ms = ms
+            return (ms << (NODE_BITS + SEQUENCE_BITS)) | (self.node << SEQUENCE_BITS) | self._sequence
+
+    def next_ticket(self):
+        return encode(self.next_id())
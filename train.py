@@ -0,0 +1,137 @@
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib import import_module
+
+from utils.model_bundle import file_hash, read_manifest, tree_hash
+
+# -----------------------------------------------------------
+# UNIFIED INCREMENTAL TRAINING
+# -----------------------------------------------------------
+#   python -m utils.train                 # rebuild whatever changed
+#   python -m utils.train crop market     # only these tasks
+#   python -m utils.train --force         # rebuild everything
+#
+# A task is skipped when the hash of its input data and its CONFIG match
+# the manifest of the bundle currently being served. The rest train
+# concurrently in a process pool; each job gets a core budget that is
+# passed to the forest's n_jobs (or TensorFlow's thread pools).
+
+# task -> training module and its relative share of the CPU
+TASKS = {
+    "crop": {"module": "utils.train_models", "weight": 2},
+    "water": {"module": "utils.train_water_model", "weight": 1},
+    "market": {"module": "utils.train_market_model", "weight": 2},
+    "pest": {"module": "utils.train_pest_model", "weight": 4},
+    "grievance": {"module": "utils.train_grievance_model", "weight": 1},
+}
+
+REPORT_PATH = "models/train_report.json"
+
+
+def data_hash(path):
+    return tree_hash(path) if os.path.isdir(path) else file_hash(path)
+
+
+def plan(tasks, force=False):
+    """Split tasks into (to_train, skipped) with the reason for each."""
+    to_train, skipped = {}, {}
+    for task in tasks:
+        module = import_module(TASKS[task]["module"])
+
+        if not os.path.exists(module.DATA_PATH):
+            skipped[task] = f"no data at {module.DATA_PATH}"
+            continue
+
+        current = read_manifest(task)
+        new_hash = data_hash(module.DATA_PATH)
+
+        if force:
+            to_train[task] = "forced"
+        elif current is None:
+            to_train[task] = "no bundle yet"
+        elif current.get("data_hash") != new_hash:
+            to_train[task] = "data changed"
+        elif current.get("config") != module.CONFIG:
+            to_train[task] = "config changed"
+        else:
+            skipped[task] = f"unchanged (bundle {current['version']})"
+    return to_train, skipped
+
+
+def core_budgets(tasks, total_cores):
+    weights = {t: TASKS[t]["weight"] for t in tasks}
+    total_weight = sum(weights.values()) or 1
+    return {t: max(1, round(total_cores * w / total_weight)) for t, w in weights.items()}
+
+
+def run_task(task, n_jobs):
+    start = time.perf_counter()
+    try:
+        bundle = import_module(TASKS[task]["module"]).train(n_jobs=n_jobs)
+        return {"status": "trained", "version": bundle["version"],
+                "seconds": time.perf_counter() - start}
+    except Exception:
+        return {"status": "failed", "error": traceback.format_exc(),
+                "seconds": time.perf_counter() - start}
+
+
+def train_all(tasks=None, force=False, cores=None, workers=None):
+    tasks = list(tasks or TASKS)
+    cores = cores or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    to_train, skipped = plan(tasks, force)
+    budgets = core_budgets(to_train, cores)
+
+    report = {t: {"status": "skipped", "reason": why} for t, why in skipped.items()}
+    if to_train:
+        workers = workers or min(len(to_train), cores)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_task, t, budgets[t]): t for t in to_train}
+            for fut in as_completed(futures):
+                task = futures[fut]
+                report[task] = {**fut.result(), "reason": to_train[task], "cores": budgets[task]}
+
+    total = time.perf_counter() - started
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump({"total_seconds": total, "cores": cores, "tasks": report}, f, indent=2)
+    return report, total
+
+
+def print_report(report, total):
+    print("\n================ TRAINING REPORT ================")
+    for task in TASKS:
+        if task not in report:
+            continue
+        r = report[task]
+        if r["status"] == "skipped":
+            print(f"⏭  {task:<8} skipped   {r['reason']}")
+        elif r["status"] == "trained":
+            print(f"✅ {task:<8} {r['seconds']:7.1f}s  {r['cores']} cores  {r['reason']} -> bundle {r['version']}")
+        else:
+            print(f"❌ {task:<8} {r['seconds']:7.1f}s  failed ({r['reason']})")
+            print(r["error"])
+    print(f"Total: {total:.1f}s  (report saved to {REPORT_PATH})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the Smart Rural AI models.")
+    parser.add_argument("tasks", nargs="*", help=f"tasks to consider: {', '.join(TASKS)} (default: all)")
+    parser.add_argument("--force", action="store_true", help="retrain even if nothing changed")
+    parser.add_argument("--cores", type=int, help="total CPU cores to use (default: all)")
+    parser.add_argument("--workers", type=int, help="trainings to run at once (default: one per task)")
+    args = parser.parse_args()
+
+    unknown = [t for t in args.tasks if t not in TASKS]
+    if unknown:
+        parser.error(f"unknown task(s): {', '.join(unknown)}")
+
+    report, total = train_all(args.tasks, args.force, args.cores, args.workers)
+    print_report(report, total)
+    sys.exit(1 if any(r["status"] == "failed" for r in report.values()) else 0)
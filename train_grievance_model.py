@@ -0,0 +1,31 @@
+import pandas as pd
+
+from utils.grievance_classifier import fit_classifier
+from utils.model_bundle import file_hash, write_bundle
+
+DATA_PATH = "data/grievances.csv"
+
+# Changing any of these makes `python -m utils.train` rebuild the bundle
+# (TfidfVectorizer parameters)
+CONFIG = {}
+
+
+def train(n_jobs=None):
+    df = pd.read_csv(DATA_PATH, usecols=["complaint", "department"]).dropna()
+
+    vectorizer, centroids = fit_classifier(df["complaint"], df["department"], CONFIG)
+
+    bundle = write_bundle(
+        "grievance",
+        {"vectorizer": vectorizer, "centroids": centroids},
+        data_hash=file_hash(DATA_PATH),
+        config=CONFIG,
+    )
+
+    print(f"Grievance model trained on {len(df)} complaints, "
+          f"{len(centroids.departments)} departments! (bundle {bundle['version']})")
+    return bundle
+
+
+if __name__ == "__main__":
+    train()
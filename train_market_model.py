@@ -1,28 +1,48 @@
-import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import LabelEncoder
-import joblib
 
-df = pd.read_csv("data/market_prices.csv")
+from utils.datasets import load_dataset
+from utils.model_bundle import file_hash, write_bundle
 
-df = df.dropna()
+DATA_PATH = "data/market_prices.csv"
 
-# Encode crop name
-le = LabelEncoder()
-df["Crop_Code"] = le.fit_transform(df["Crop"])
+# Changing any of these makes `python -m utils.train` rebuild the bundle
+CONFIG = {}
 
-X = df[[
-    "Nitrogen","Phosphorus","Potassium",
-    "Temperature","Humidity","pH_Value",
-    "Rainfall","Crop_Code"
-]]
 
-y = df["Yield"]
+def train(n_jobs=None):
+    df = load_dataset("market")   # cached, memory-mapped copy of DATA_PATH
 
-model = RandomForestRegressor()
-model.fit(X, y)
+    df = df.dropna()
 
-joblib.dump(model, "models/market_model.pkl")
-joblib.dump(le, "models/crop_encoder.pkl")
+    # Encode crop name
+    le = LabelEncoder()
+    df["Crop_Code"] = le.fit_transform(df["Crop"])
 
-print("Market/Yield model trained successfully!")
+    X = df[[
+        "Nitrogen","Phosphorus","Potassium",
+        "Temperature","Humidity","pH_Value",
+        "Rainfall","Crop_Code"
+    ]]
+
+    y = df["Yield"]
+
+    model = RandomForestRegressor(**CONFIG, n_jobs=n_jobs)
+    model.fit(X, y)
+    model.n_jobs = None   # single-row serving is faster without a thread pool
+
+    # Own crop encoder inside the market bundle (the crop bundle has a different label set)
+    bundle = write_bundle(
+        "market",
+        {"model": model, "crop_encoder": le},
+        features=X.columns,
+        data_hash=file_hash(DATA_PATH),
+        config=CONFIG,
+    )
+
+    print(f"Market/Yield model trained successfully! (bundle {bundle['version']})")
+    return bundle
+
+
+if __name__ == "__main__":
+    train()
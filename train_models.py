@@ -1,52 +1,70 @@
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
-import joblib
-
-# ---------------- LOAD DATA ----------------
-crop = pd.read_csv("data/crop_data.csv")
-
-print("Original columns:")
-print(crop.columns)
-
-# ---------------- RENAME COLUMNS (FIX SPELLING) ----------------
-crop = crop.rename(columns={
-    "Temparature": "Temperature",
-    "Phosphorous": "Phosphorus"
-})
-
-print("Renamed columns:")
-print(crop.columns)
-
-# ---------------- ENCODE CATEGORICAL DATA ----------------
-soil_encoder = LabelEncoder()
-crop["Soil Type"] = soil_encoder.fit_transform(crop["Soil Type"])
-
-crop_encoder = LabelEncoder()
-crop["Crop Type"] = crop_encoder.fit_transform(crop["Crop Type"])
-
-# ---------------- FEATURES & TARGET ----------------
-X = crop[
-    [
-        "Temperature",
-        "Humidity",
-        "Moisture",
-        "Soil Type",
-        "Nitrogen",
-        "Potassium",
-        "Phosphorus"
+
+from utils.datasets import load_dataset
+from utils.model_bundle import file_hash, write_bundle
+
+DATA_PATH = "data/crop_data.csv"
+
+# Changing any of these makes `python -m utils.train` rebuild the bundle
+CONFIG = {"n_estimators": 100, "random_state": 42}
+
+
+def train(n_jobs=None):
+    # ---------------- LOAD DATA ----------------
+    crop = load_dataset("crop")   # cached, memory-mapped copy of DATA_PATH
+
+    print("Original columns:")
+    print(crop.columns)
+
+    # ---------------- RENAME COLUMNS (FIX SPELLING) ----------------
+    crop = crop.rename(columns={
+        "Temparature": "Temperature",
+        "Phosphorous": "Phosphorus"
+    })
+
+    print("Renamed columns:")
+    print(crop.columns)
+
+    # ---------------- ENCODE CATEGORICAL DATA ----------------
+    soil_encoder = LabelEncoder()
+    crop["Soil Type"] = soil_encoder.fit_transform(crop["Soil Type"])
+
+    crop_encoder = LabelEncoder()
+    crop["Crop Type"] = crop_encoder.fit_transform(crop["Crop Type"])
+
+    # ---------------- FEATURES & TARGET ----------------
+    X = crop[
+        [
+            "Temperature",
+            "Humidity",
+            "Moisture",
+            "Soil Type",
+            "Nitrogen",
+            "Potassium",
+            "Phosphorus"
+        ]
     ]
-]
 
-y = crop["Crop Type"]
+    y = crop["Crop Type"]
+
+    # ---------------- TRAIN MODEL ----------------
+    model = RandomForestClassifier(**CONFIG, n_jobs=n_jobs)
+    model.fit(X, y)
+    model.n_jobs = None   # single-row serving is faster without a thread pool
+
+    # ---------------- SAVE MODEL BUNDLE ----------------
+    bundle = write_bundle(
+        "crop",
+        {"model": model, "crop_encoder": crop_encoder, "soil_encoder": soil_encoder},
+        features=X.columns,
+        data_hash=file_hash(DATA_PATH),
+        config=CONFIG,
+    )
 
-# ---------------- TRAIN MODEL ----------------
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X, y)
+    print(f"✅ Crop recommendation model trained successfully (bundle {bundle['version']})")
+    return bundle
 
-# ---------------- SAVE MODELS ----------------
-joblib.dump(model, "models/crop_model.pkl")
-joblib.dump(crop_encoder, "models/crop_encoder.pkl")
-joblib.dump(soil_encoder, "models/soil_encoder.pkl")
 
-print("✅ Crop recommendation model trained successfully")
+if __name__ == "__main__":
+    train()
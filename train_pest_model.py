@@ -1,59 +1,203 @@
-import tensorflow as tf
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 import os
 
-data_dir = "data/pest_images/"
-
-# Image size & parameters
-img_size = (150, 150)
-batch_size = 32
-
-# Data generator
-datagen = ImageDataGenerator(
-    rescale=1/255.0,
-    validation_split=0.2
-)
-
-train_gen = datagen.flow_from_directory(
-    data_dir,
-    target_size=img_size,
-    batch_size=batch_size,
-    subset="training",
-    class_mode="categorical"
-)
-
-val_gen = datagen.flow_from_directory(
-    data_dir,
-    target_size=img_size,
-    batch_size=batch_size,
-    subset="validation",
-    class_mode="categorical"
-)
-
-# Build CNN model
-model = tf.keras.models.Sequential([
-    tf.keras.layers.Conv2D(32, (3,3), activation='relu', input_shape=(150,150,3)),
-    tf.keras.layers.MaxPooling2D(2,2),
-
-    tf.keras.layers.Conv2D(64, (3,3), activation='relu'),
-    tf.keras.layers.MaxPooling2D(2,2),
-
-    tf.keras.layers.Conv2D(128, (3,3), activation='relu'),
-    tf.keras.layers.MaxPooling2D(2,2),
-
-    tf.keras.layers.Flatten(),
-    tf.keras.layers.Dense(128, activation='relu'),
-    tf.keras.layers.Dense(train_gen.num_classes, activation='softmax')
-])
-
-model.compile(optimizer='adam',
-              loss='categorical_crossentropy',
-              metrics=['accuracy'])
-
-# Train
-model.fit(train_gen, validation_data=val_gen, epochs=10)
-
-# Save model
-model.save("models/pest_model.h5")
-
-print("🎉 Pest model trained and saved successfully!")
+import numpy as np
+
+from utils.model_bundle import tree_hash, write_bundle
+from utils.pest_batch import IMG_SIZE, decode_into
+
+DATA_PATH = "data/pest_images/"
+CACHE_DIR = "data/.cache"
+
+# Changing any of these makes `python -m utils.train` rebuild the bundle
+CONFIG = {
+    "img_size": [150, 150],
+    "batch_size": 32,
+    "validation_split": 0.2,
+    "epochs": 10,
+    "input": "files",       # "files", or "shards" (pre-decoded, see pest_shards.py)
+    "cache": "memory",      # decoded images: "memory" or "disk" (under CACHE_DIR)
+    "seed": 42,
+}
+
+# same extensions flow_from_directory picks up (all decoded through PIL)
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".ppm", ".tif", ".tiff")
+
+# Kaggle source folder kept next to the class folders (arrange_pest_dataset.py)
+SOURCE_DIRS = ("train",)
+
+
+def class_names(data_path=DATA_PATH):
+    return sorted(d for d in os.listdir(data_path)
+                  if os.path.isdir(os.path.join(data_path, d)) and d not in SOURCE_DIRS)
+
+
+def split_files(data_path=DATA_PATH, subset="validation", validation_split=None):
+    """(path, class index) pairs of one subset, split exactly like
+    ImageDataGenerator: per class, sorted files, the first share is validation."""
+    if validation_split is None:
+        validation_split = CONFIG["validation_split"]
+
+    out = []
+    for idx, cls in enumerate(class_names(data_path)):
+        files = []
+        for base, _, names in sorted(os.walk(os.path.join(data_path, cls)), key=lambda w: w[0]):
+            files += [os.path.join(base, n) for n in sorted(names) if n.lower().endswith(IMAGE_EXTS)]
+        cut = int(validation_split * len(files))
+        out += [(f, idx) for f in (files[:cut] if subset == "validation" else files[cut:])]
+    return out
+
+
+# -----------------------------------------
+# tf.data INPUT PIPELINE
+# -----------------------------------------
+# Files are decoded and resized in parallel once, cached as uint8 (4x less
+# than float32), then shuffled, batched, scaled to [0, 1] per batch and
+# prefetched so the next batch is ready while the model trains. Decoding and
+# resizing go through PIL exactly as the app does at serving time
+# (pest_batch.decode_into), which also reads the TIFF / PPM / BMP files
+# tf.io.decode_image cannot.
+#
+# With "input": "shards" the pixels come memory-mapped from the shards built
+# by arrange_pest_dataset.py instead (same PIL path, so the same pixels);
+# nothing is decoded or cached.
+
+def read_image(path):
+    """(H, W, 3) uint8 pixels of one image file, as served."""
+    path = path.decode() if isinstance(path, bytes) else path
+    buf = np.empty((1, *IMG_SIZE, 3), dtype=np.uint8)
+    with open(path, "rb") as f:
+        err = decode_into(buf, 0, f.read())
+    if err:
+        raise ValueError(f"{path}: {err}")
+    return buf[0]
+
+
+def decoded_files(files, subset, data_hash=None):
+    import tensorflow as tf
+
+    img_size = tuple(CONFIG["img_size"])
+    paths = [f for f, _ in files]
+    labels = [label for _, label in files]
+
+    def decode(path, label):
+        img = tf.numpy_function(read_image, [path], tf.uint8)
+        return tf.ensure_shape(img, (*img_size, 3)), label
+
+    ds = tf.data.Dataset.from_tensor_slices((paths, labels))
+    ds = ds.map(decode, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+
+    if CONFIG["cache"] == "disk":
+        # keyed by the data hash so changed images never hit a stale cache
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        return ds.cache(os.path.join(CACHE_DIR, f"pest-{subset}-pil-{(data_hash or tree_hash(DATA_PATH))[:16]}"))
+    return ds.cache()
+
+
+def decoded_shards(shards, subset):
+    import tensorflow as tf
+
+    views = shards.views(subset)
+
+    def rows():
+        for images, labels in views:
+            yield from zip(images, labels.astype("int32"))
+
+    ds = tf.data.Dataset.from_generator(rows, output_signature=(
+        tf.TensorSpec((*CONFIG["img_size"], 3), tf.uint8),
+        tf.TensorSpec((), tf.int32),
+    ))
+    return ds.apply(tf.data.experimental.assert_cardinality(sum(len(v[1]) for v in views)))
+
+
+def make_dataset(decoded, size, num_classes, shuffle=False):
+    import tensorflow as tf
+
+    def scale(images, labels):
+        return tf.cast(images, tf.float32) / 255.0, tf.one_hot(labels, num_classes)
+
+    if shuffle:
+        decoded = decoded.shuffle(size, seed=CONFIG["seed"], reshuffle_each_iteration=True)
+    ds = decoded.batch(CONFIG["batch_size"])
+    ds = ds.map(scale, num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def datasets(data_path=DATA_PATH, data_hash=None):
+    """(train_ds, val_ds, labels) with the same split as ImageDataGenerator."""
+    labels = class_names(data_path)
+    train_files = split_files(data_path, "training")
+    val_files = split_files(data_path, "validation")
+
+    if CONFIG["input"] == "shards":
+        from utils.pest_shards import read_shards
+
+        shards = read_shards(data_path=data_path)
+        if shards is None:
+            raise FileNotFoundError("Pest shards are missing or stale: run python -m utils.arrange_pest_dataset")
+        train_dec, val_dec = decoded_shards(shards, "training"), decoded_shards(shards, "validation")
+    else:
+        train_dec = decoded_files(train_files, "training", data_hash)
+        val_dec = decoded_files(val_files, "validation", data_hash)
+
+    train_ds = make_dataset(train_dec, len(train_files), len(labels), shuffle=True)
+    val_ds = make_dataset(val_dec, len(val_files), len(labels))
+    return train_ds, val_ds, labels
+
+
+def build_model(num_classes):
+    import tensorflow as tf
+
+    model = tf.keras.models.Sequential([
+        tf.keras.layers.Conv2D(32, (3,3), activation='relu', input_shape=(150,150,3)),
+        tf.keras.layers.MaxPooling2D(2,2),
+
+        tf.keras.layers.Conv2D(64, (3,3), activation='relu'),
+        tf.keras.layers.MaxPooling2D(2,2),
+
+        tf.keras.layers.Conv2D(128, (3,3), activation='relu'),
+        tf.keras.layers.MaxPooling2D(2,2),
+
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(128, activation='relu'),
+        tf.keras.layers.Dense(num_classes, activation='softmax')
+    ])
+
+    model.compile(optimizer='adam',
+                  loss='categorical_crossentropy',
+                  metrics=['accuracy'])
+    return model
+
+
+def train(n_jobs=None):
+    # TensorFlow is only imported by the process that actually trains
+    import tensorflow as tf
+
+    if n_jobs:
+        tf.config.threading.set_intra_op_parallelism_threads(n_jobs)
+        tf.config.threading.set_inter_op_parallelism_threads(min(n_jobs, 2))
+    tf.keras.utils.set_random_seed(CONFIG["seed"])
+
+    data_hash = tree_hash(DATA_PATH)
+    train_ds, val_ds, labels = datasets(DATA_PATH, data_hash)
+
+    # Build CNN model
+    model = build_model(len(labels))
+
+    # Train
+    model.fit(train_ds, validation_data=val_ds, epochs=CONFIG["epochs"])
+
+    # Save model + class names (in output order) as one bundle
+    bundle = write_bundle(
+        "pest",
+        {"model": model, "labels": labels},
+        features=[*CONFIG["img_size"], 3],
+        data_hash=data_hash,
+        config=CONFIG,
+    )
+
+    print(f"🎉 Pest model trained and saved successfully! (bundle {bundle['version']})")
+    return bundle
+
+
+if __name__ == "__main__":
+    train()
@@ -1,32 +1,51 @@
-import pandas as pd
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestRegressor
-import joblib
 
-df = pd.read_csv("data/groundwater.csv")
+from utils.datasets import load_dataset
+from utils.model_bundle import file_hash, write_bundle
 
-# Clean the dataset
-df = df.dropna(subset=["Name of District", "Net Ground Water Availability for future use"])
+DATA_PATH = "data/groundwater.csv"
 
-df = df.rename(columns={
-    "Name of District": "District",
-    "Net Ground Water Availability for future use": "Net_Groundwater"
-})
+# Changing any of these makes `python -m utils.train` rebuild the bundle
+CONFIG = {}
 
-# Encode district names
-le = LabelEncoder()
-df["District_Code"] = le.fit_transform(df["District"])
 
-# Features and target
-X = df[["District_Code"]]
-y = df["Net_Groundwater"]
+def train(n_jobs=None):
+    df = load_dataset("groundwater")   # cached, memory-mapped copy of DATA_PATH
 
-# Train model
-model = RandomForestRegressor()
-model.fit(X, y)
+    # Clean the dataset
+    df = df.dropna(subset=["Name of District", "Net Ground Water Availability for future use"])
 
-# Save model + encoder
-joblib.dump(model, "models/water_model.pkl")
-joblib.dump(le, "models/water_encoder.pkl")
+    df = df.rename(columns={
+        "Name of District": "District",
+        "Net Ground Water Availability for future use": "Net_Groundwater"
+    })
 
-print("Water forecasting model trained successfully!")
+    # Encode district names
+    le = LabelEncoder()
+    df["District_Code"] = le.fit_transform(df["District"])
+
+    # Features and target
+    X = df[["District_Code"]]
+    y = df["Net_Groundwater"]
+
+    # Train model
+    model = RandomForestRegressor(**CONFIG, n_jobs=n_jobs)
+    model.fit(X, y)
+    model.n_jobs = None   # single-row serving is faster without a thread pool
+
+    # Save model + encoder as one bundle
+    bundle = write_bundle(
+        "water",
+        {"model": model, "district_encoder": le},
+        features=X.columns,
+        data_hash=file_hash(DATA_PATH),
+        config=CONFIG,
+    )
+
+    print(f"Water forecasting model trained successfully! (bundle {bundle['version']})")
+    return bundle
+
+
+if __name__ == "__main__":
+    train()
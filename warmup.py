@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+# -----------------------------------------------------------
+# MODEL WARM-UP + READINESS
+# -----------------------------------------------------------
+# The first predict() in a fresh process pays for loading, page-faulting the
+# memory-mapped arrays, allocator growth and (TensorFlow) graph tracing.
+# warm_up() pays it at startup instead: each model gets dummy batches of the
+# sizes we serve, then the process reports ready. READY_FILE (if set) is
+# written at that point, for container readiness probes.
+
+BATCH_SIZES = (1, 32)
+
+_ready = threading.Event()
+_lock = threading.Lock()
+report = {}
+
+
+def dummy_input(model, batch):
+    if hasattr(model, "n_features_in_"):
+        return np.zeros((batch, model.n_features_in_), dtype=np.float32)
+    return np.zeros((batch, *model.input_shape[-3:]), dtype=np.float32)
+
+
+def run_model(model, x):
+    # classifiers are served through predict_proba (crop top-k), the rest predict
+    if getattr(model, "classes_", None) is not None:
+        return model.predict_proba(x)
+    return model.predict(x)
+
+
+def warm_task(registry, task, names=("model",), batch_sizes=BATCH_SIZES):
+    start = time.perf_counter()
+    model = registry.load(task, names)["model"]
+    load_s = time.perf_counter() - start
+
+    calls = {}
+    for batch in batch_sizes:
+        x = dummy_input(model, batch)
+        start = time.perf_counter()
+        run_model(model, x)
+        calls[batch] = (time.perf_counter() - start) * 1000
+    return {"load_s": load_s, "first_call_ms": calls}
+
+
+def warm_up(registry, parts, batch_sizes=BATCH_SIZES):
+    """Warm every task in `parts` ({task: part names}), then mark the process ready."""
+    with _lock:
+        for task, names in parts.items():
+            try:
+                report[task] = warm_task(registry, task, names, batch_sizes)
+            except Exception as e:
+                # a missing model must not keep the other pages from serving
+                report[task] = {"error": f"{e.__class__.__name__}: {e}"}
+
+        _ready.set()
+        ready_file = os.environ.get("READY_FILE")
+        if ready_file:
+            with open(ready_file, "w") as f:
+                f.write(f"{os.getpid()}\n")
+    return report
+
+
+def start(registry, parts, batch_sizes=BATCH_SIZES):
+    """warm_up() in a background thread."""
+    thread = threading.Thread(target=warm_up, args=(registry, parts, batch_sizes),
+                              name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def ready():
+    return _ready.is_set()
+
+
+def wait(timeout=None):
+    return _ready.wait(timeout)